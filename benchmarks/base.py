@@ -15,6 +15,7 @@
 from cProfile import Profile
 import logging
 import os.path
+import socket
 import sys
 from threading import Thread
 import time
@@ -22,6 +23,7 @@ from optparse import OptionParser
 import uuid
 
 from greplin import scales
+import six
 
 dirname = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(dirname)
@@ -66,6 +68,42 @@ except ImportError as exc:
     log.exception("Error importing twisted")
     pass
 
+
+class CountingSocket(socket.socket):
+    """
+    Counts calls that send or receive on driver sockets, so the benchmarks can
+    report syscalls per request. Python 2 binds these methods per instance, so
+    counting is only done on Python 3.
+    """
+
+    sends = 0
+    recvs = 0
+
+    @classmethod
+    def reset(cls):
+        cls.sends = cls.recvs = 0
+
+    def send(self, *args, **kwargs):
+        CountingSocket.sends += 1
+        return super(CountingSocket, self).send(*args, **kwargs)
+
+    def sendmsg(self, *args, **kwargs):
+        CountingSocket.sends += 1
+        return super(CountingSocket, self).sendmsg(*args, **kwargs)
+
+    def sendall(self, *args, **kwargs):
+        CountingSocket.sends += 1
+        return super(CountingSocket, self).sendall(*args, **kwargs)
+
+    def recv(self, *args, **kwargs):
+        CountingSocket.recvs += 1
+        return super(CountingSocket, self).recv(*args, **kwargs)
+
+    def recv_into(self, *args, **kwargs):
+        CountingSocket.recvs += 1
+        return super(CountingSocket, self).recv_into(*args, **kwargs)
+
+
 KEYSPACE = "testkeyspace" + str(int(time.time()))
 TABLE = "testtable"
 
@@ -126,6 +164,9 @@ def teardown(options):
 
 def benchmark(thread_class):
     options, args = parse_options()
+    if six.PY3:
+        # the driver creates its sockets through the socket module
+        socket.socket = CountingSocket
     for conn_class in options.supported_reactors:
         setup(options)
         log.info("==== %s ====" % (conn_class.__name__,))
@@ -159,6 +200,7 @@ def benchmark(thread_class):
         threads = []
 
         log.debug("Beginning {0}...".format('reads' if options.read else 'inserts'))
+        CountingSocket.reset()
         start = time.time()
         try:
             for i in range(options.threads):
@@ -176,6 +218,7 @@ def benchmark(thread_class):
                     thread.join(timeout=0.5)
 
             end = time.time()
+            sends, recvs = CountingSocket.sends, CountingSocket.recvs
         finally:
             cluster.shutdown()
             teardown(options)
@@ -183,6 +226,9 @@ def benchmark(thread_class):
         total = end - start
         log.info("Total time: %0.2fs" % total)
         log.info("Average throughput: %0.2f/sec" % (options.num_ops / total))
+        if six.PY3:
+            log.info("Socket calls per request: %0.3f send, %0.3f recv",
+                     float(sends) / options.num_ops, float(recvs) / options.num_ops)
         if options.enable_metrics:
             stats = scales.getStats()['cassandra']
             log.info("Connection errors: %d", stats['connection_errors'])
@@ -0,0 +1,142 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Microbenchmark for PreparedStatement.bind (no server required).
+
+Binds rows of a table with a two-column partition key, from tuples and from
+dicts, and reads the routing key of each bound statement, as the token-aware
+policy does. The "legacy" rows replay the bind loop used before bind plans,
+which serialized through the column cqltypes and re-derived everything from the
+column metadata on every call.
+
+    python benchmarks/bind.py [--num-binds 100000] [--columns 10] [--protocol-version 4]
+"""
+
+from __future__ import print_function
+
+from datetime import datetime
+from optparse import OptionParser
+import os.path
+import struct
+import sys
+import time
+import uuid
+
+dirname = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(dirname, '..'))
+
+from cassandra import cqltypes
+from cassandra.cython_deps import HAVE_CYTHON
+from cassandra.protocol import ColumnMetadata
+from cassandra.query import BoundStatement, PreparedStatement, UNSET_VALUE
+
+COLUMN_TYPES = [
+    (cqltypes.Int32Type, 42),
+    (cqltypes.UTF8Type, u'some text value'),
+    (cqltypes.LongType, 1234567890123),
+    (cqltypes.DoubleType, 3.14159),
+    (cqltypes.UUIDType, uuid.uuid4()),
+    (cqltypes.DateType, datetime(2017, 6, 1, 12, 30, 5, 123456)),
+    (cqltypes.BooleanType, True),
+    (cqltypes.lookup_casstype('ListType(Int32Type)'), [1, 2, 3]),
+    (cqltypes.lookup_casstype('MapType(UTF8Type, Int32Type)'), {u'a': 1, u'b': 2}),
+]
+
+
+def make_statement(num_columns, protocol_version):
+    col_meta = []
+    row = []
+    for i in range(num_columns):
+        cqltype, value = COLUMN_TYPES[i % len(COLUMN_TYPES)]
+        col_meta.append(ColumnMetadata('ks', 'tbl', 'c%d' % i, cqltype))
+        row.append(value)
+    prepared = PreparedStatement(col_meta, b'id', [0, 1], 'INSERT ...', 'ks', protocol_version, None)
+    return prepared, tuple(row), dict((c.name, v) for c, v in zip(col_meta, row))
+
+
+def legacy_bind(prepared, values):
+    """ BoundStatement.bind and routing_key as they were before bind plans """
+    bound = BoundStatement(prepared)
+    proto_version = prepared.protocol_version
+    col_meta = prepared.column_metadata
+    if isinstance(values, dict):
+        values_dict = values
+        values = []
+        for col in col_meta:
+            try:
+                values.append(values_dict[col.name])
+            except KeyError:
+                if proto_version >= 4:
+                    values.append(UNSET_VALUE)
+                else:
+                    raise
+    if len(values) > len(col_meta):
+        raise ValueError()
+    if proto_version < 4 and prepared.routing_key_indexes and len(values) < len(prepared.routing_key_indexes):
+        raise ValueError()
+    bound.raw_values = values
+    bound.values = []
+    for value, col_spec in zip(values, col_meta):
+        if value is None:
+            bound.values.append(None)
+        elif value is UNSET_VALUE:
+            bound.values.append(UNSET_VALUE)
+        else:
+            try:
+                bound.values.append(col_spec.type.serialize(value, proto_version))
+            except (TypeError, struct.error):
+                raise TypeError()
+    routing_indexes = prepared.routing_key_indexes
+    return b"".join(struct.pack(">H%dsB" % len(p), len(p), p, 0)
+                    for p in (bound.values[i] for i in routing_indexes))
+
+
+def plan_bind(prepared, values):
+    return prepared.bind(values).routing_key
+
+
+def run(bind, prepared, values, num_binds):
+    start = time.time()
+    for _ in range(num_binds):
+        bind(prepared, values)
+    return time.time() - start
+
+
+def main():
+    parser = OptionParser()
+    parser.add_option('-n', '--num-binds', type='int', default=100000,
+                      help='number of statements to bind per run [default: %default]')
+    parser.add_option('-c', '--columns', type='int', default=10,
+                      help='number of bind parameters [default: %default]')
+    parser.add_option('-p', '--protocol-version', type='int', default=4,
+                      help='native protocol version [default: %default]')
+    options, args = parser.parse_args()
+
+    prepared, row, row_dict = make_statement(options.columns, options.protocol_version)
+    assert legacy_bind(prepared, row) == plan_bind(prepared, row) == plan_bind(prepared, row_dict)
+
+    print("%d columns, protocol v%d, Cython serializers: %s" %
+          (options.columns, options.protocol_version, HAVE_CYTHON))
+    print("%-8s %-12s %12s %12s" % ("input", "bind", "us/bind", "binds/s"))
+    for input_name, values in (("tuple", row), ("dict", row_dict)):
+        for bind_name, bind in (("legacy", legacy_bind), ("plan", plan_bind)):
+            elapsed = run(bind, prepared, values, options.num_binds)
+            print("%-8s %-12s %12.2f %12.0f" % (input_name, bind_name,
+                                                elapsed / options.num_binds * 1e6,
+                                                options.num_binds / elapsed))
+
+
+if __name__ == "__main__":
+    main()
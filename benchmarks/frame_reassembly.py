@@ -0,0 +1,161 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Microbenchmark for frame reassembly in Connection.process_io_buffer.
+
+Feeds a synthetic stream of response frames through a Connection in
+reactor-sized reads (no server required) and reports time and the number of
+bytes copied in user space per MB received, beyond the socket read itself.
+The "bytesio" rows replay the previous BytesIO-based reassembly for comparison.
+
+    python benchmarks/frame_reassembly.py [--read-size 4096] [--mb 64]
+"""
+
+from __future__ import print_function
+
+import io
+from optparse import OptionParser
+import os.path
+import struct
+import sys
+import time
+
+dirname = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(dirname, '..'))
+
+from cassandra import ProtocolVersion
+from cassandra.connection import (Connection, PROTOCOL_VERSION_MASK, ProtocolError, _Frame, defunct_on_error,
+                                  frame_header_v3, int_from_buf_item)
+
+header = struct.Struct('>BBhBi')
+
+
+def make_stream(body_size, total_size):
+    frame = header.pack(0x84, 0, 0, 0x08, body_size) + b'x' * body_size
+    return frame * max(1, total_size // len(frame))
+
+
+class _BytesIOConnection(Connection):
+    """
+    Connection with the BytesIO reassembly used before _ReceiveBuffer, instrumented
+    to count the bytes it copies. On CPython 3 ``getvalue()`` and ``BytesIO(initial)``
+    can share memory, so the counts are an upper bound there.
+    """
+
+    copied = 0
+
+    def __init__(self, *args, **kwargs):
+        Connection.__init__(self, *args, **kwargs)
+        self._iobuf = io.BytesIO()
+
+    def receive(self, data):
+        self.copied += len(data)
+        self._iobuf.write(data)
+
+    @defunct_on_error
+    def _read_frame_header(self):
+        buf = self._iobuf.getvalue()
+        self.copied += len(buf)
+        pos = len(buf)
+        if pos:
+            version = int_from_buf_item(buf[0]) & PROTOCOL_VERSION_MASK
+            if version > ProtocolVersion.MAX_SUPPORTED:
+                raise ProtocolError("This version of the driver does not support protocol version %d" % version)
+            if pos >= 9:
+                flags, stream, op, body_len = frame_header_v3.unpack_from(buf, 1)
+                self._current_frame = _Frame(version, flags, stream, op, 9, body_len + 9)
+        return pos
+
+    def _reset_frame(self):
+        remaining = self._iobuf.read()
+        self.copied += 2 * len(remaining)
+        self._iobuf = io.BytesIO(remaining)
+        self._iobuf.seek(0, 2)
+        self._current_frame = None
+
+    def process_io_buffer(self):
+        while True:
+            if not self._current_frame:
+                pos = self._read_frame_header()
+            else:
+                pos = self._iobuf.tell()
+
+            if not self._current_frame or pos < self._current_frame.end_pos:
+                return
+            else:
+                frame = self._current_frame
+                self._iobuf.seek(frame.body_offset)
+                msg = self._iobuf.read(frame.end_pos - frame.body_offset)
+                self.copied += len(msg)
+                self.process_msg(frame, msg)
+                self._reset_frame()
+
+
+def run_bytesio(stream, read_size):
+    conn = _BytesIOConnection('127.0.0.1')
+    conn.process_msg = lambda frame, body: None
+    def recv(size, pos=[0]):
+        # stands in for socket.recv
+        chunk = stream[pos[0]:pos[0] + size]
+        pos[0] += len(chunk)
+        return chunk
+
+    start = time.time()
+    while True:
+        data = recv(read_size)
+        if not data:
+            break
+        conn.receive(data)
+        conn.process_io_buffer()
+    return time.time() - start, conn.copied
+
+
+def run_receive_buffer(stream, read_size):
+    conn = Connection('127.0.0.1')
+    conn.process_msg = lambda frame, body: None
+    view = memoryview(stream)
+
+    def recv_into(buf, size, pos=[0]):
+        # stands in for socket.recv_into
+        chunk = view[pos[0]:pos[0] + size]
+        n = len(chunk)
+        buf[:n] = chunk
+        pos[0] += n
+        return n
+
+    start = time.time()
+    while conn._iobuf.read_into(recv_into, read_size):
+        conn.process_io_buffer()
+    return time.time() - start, conn._iobuf.copied
+
+
+def main():
+    parser = OptionParser()
+    parser.add_option('--read-size', type='int', default=4096, help='bytes per socket read')
+    parser.add_option('--mb', type='int', default=64, help='MB of frames to feed per case')
+    options, args = parser.parse_args()
+
+    total = options.mb * 1024 * 1024
+    print("%-14s %-12s %10s %14s" % ("body size", "buffer", "MB/s", "copied/MB"))
+    for body_size in (100, 4096, 64 * 1024, 4 * 1024 * 1024):
+        stream = make_stream(body_size, total)
+        mb = len(stream) / float(1024 * 1024)
+        for name, run in (('bytesio', run_bytesio), ('receive_buffer', run_receive_buffer)):
+            elapsed, copied = min(run(stream, options.read_size) for _ in range(3))
+            print("%-14d %-12s %10.1f %14.0f" % (body_size, name, mb / elapsed, copied / mb))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Microbenchmark for serving result rows as JSON (no server required).
+
+Decodes synthetic result pages of int, bigint, double and text columns into
+JSON documents. "dumps" decodes dict rows and passes each of them to
+json.dumps, as a service would; "parser" writes the documents while decoding
+with json_protocol_handler (Cython extensions only).
+
+    python benchmarks/json_rows.py [--rows 5000] [--columns 10] [--pages 20]
+"""
+
+from __future__ import print_function
+
+import json
+from optparse import OptionParser
+import os.path
+import sys
+import time
+
+dirname = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(dirname, '..'))
+
+from cassandra.cython_deps import HAVE_CYTHON
+from cassandra.protocol import ProtocolHandler, json_protocol_handler
+from cassandra.query import dict_factory
+
+from row_parsing import make_rows_body, decode
+
+
+def dumps(body):
+    rows = decode(ProtocolHandler._for_row_factory(dict_factory), body).results[1]
+    return [json.dumps(row).encode('utf8') for row in rows]
+
+
+def main():
+    parser = OptionParser()
+    parser.add_option('-r', '--rows', type='int', default=5000,
+                      help='rows per page [default: %default]')
+    parser.add_option('-c', '--columns', type='int', default=10,
+                      help='columns of the table [default: %default]')
+    parser.add_option('-p', '--pages', type='int', default=20,
+                      help='pages decoded per run [default: %default]')
+    options, args = parser.parse_args()
+
+    body = make_rows_body(options.rows, options.columns)
+    paths = [("dumps", dumps)]
+    if HAVE_CYTHON:
+        handler = json_protocol_handler()
+        paths.append(("parser", lambda body: decode(handler, body).results[1]))
+        assert [json.loads(d.decode('utf8')) for d in paths[1][1](body)] == \
+            [json.loads(d.decode('utf8')) for d in dumps(body)]
+    else:
+        print("Cython extensions not available, only the json.dumps path is measured")
+
+    print("%-8s %14s" % ("path", "rows/s"))
+    for name, path in paths:
+        start = time.time()
+        for _ in range(options.pages):
+            path(body)
+        elapsed = time.time() - start
+        print("%-8s %14.0f" % (name, options.rows * options.pages / elapsed))
+
+
+if __name__ == "__main__":
+    main()
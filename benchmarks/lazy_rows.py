@@ -0,0 +1,84 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Microbenchmark for reading a few columns of wide rows (no server required).
+
+Decodes synthetic result pages of a table with int, bigint, double and text
+columns, and reads some of the columns of every row, with the default
+ProtocolHandler, LazyProtocolHandler and LazyRowProtocolHandler (Cython
+extensions required for the latter two).
+
+    python benchmarks/lazy_rows.py [--rows 5000] [--columns 50] [--read 1,3] [--pages 20]
+"""
+
+from __future__ import print_function
+
+from optparse import OptionParser
+import os.path
+import sys
+import time
+
+dirname = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(dirname, '..'))
+
+from cassandra.protocol import ProtocolHandler, LazyProtocolHandler, LazyRowProtocolHandler
+
+from row_parsing import make_rows_body, decode
+
+
+def read_columns(handler, body, columns):
+    total = 0
+    for row in decode(handler, body).results[1]:
+        for i in columns:
+            total += row[i] is not None
+    return total
+
+
+def main():
+    parser = OptionParser()
+    parser.add_option('-r', '--rows', type='int', default=5000,
+                      help='rows per page [default: %default]')
+    parser.add_option('-c', '--columns', type='int', default=50,
+                      help='columns of the table [default: %default]')
+    parser.add_option('--read', default='1,3',
+                      help='comma-separated counts of columns read per row [default: %default]')
+    parser.add_option('-p', '--pages', type='int', default=20,
+                      help='pages decoded per run [default: %default]')
+    options, args = parser.parse_args()
+
+    if LazyRowProtocolHandler is None:
+        print("Cython extensions not available")
+        return
+
+    body = make_rows_body(options.rows, options.columns)
+    handlers = [("default", ProtocolHandler), ("lazy", LazyProtocolHandler), ("lazy rows", LazyRowProtocolHandler)]
+    expected = decode(ProtocolHandler, body).results[1]
+    assert list(decode(LazyRowProtocolHandler, body).results[1]) == expected
+
+    print("%d columns" % options.columns)
+    print("%-6s %-12s %14s" % ("read", "handler", "rows/s"))
+    for num_read in [int(n) for n in options.read.split(',')] + [options.columns]:
+        # spread the columns read over the row
+        columns = [i * options.columns // num_read for i in range(num_read)]
+        for name, handler in handlers:
+            start = time.time()
+            for _ in range(options.pages):
+                read_columns(handler, body, columns)
+            elapsed = time.time() - start
+            print("%-6d %-12s %14.0f" % (num_read, name, options.rows * options.pages / elapsed))
+
+
+if __name__ == "__main__":
+    main()
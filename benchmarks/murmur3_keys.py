@@ -0,0 +1,79 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Microbenchmark for hashing batches of partition keys to Murmur3 tokens
+(no server required).
+
+"from_key" builds a Murmur3Token per key, as routing a query does; "murmur3"
+calls the C extension per key; "many" hashes the list of keys at once with
+murmur3_many, and "fixed" hashes a contiguous buffer of the keys with
+murmur3_many_fixed (the keys are then all of the same size). "python" is the
+pure-Python fallback, run on a tenth of the keys.
+
+    python benchmarks/murmur3_keys.py [--keys 1000000] [--key-size 16]
+"""
+
+from __future__ import print_function
+
+from optparse import OptionParser
+import os
+import sys
+import time
+
+dirname = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(dirname, '..'))
+
+from cassandra.metadata import Murmur3Token
+from cassandra.murmur3 import _murmur3_many
+
+try:
+    from cassandra.cmurmur3 import murmur3, murmur3_many, murmur3_many_fixed
+except ImportError:
+    murmur3 = None  # NOQA
+
+
+def main():
+    parser = OptionParser()
+    parser.add_option('-k', '--keys', type='int', default=1000000,
+                      help='keys hashed per run [default: %default]')
+    parser.add_option('-s', '--key-size', type='int', default=16,
+                      help='size of the keys in bytes [default: %default]')
+    options, args = parser.parse_args()
+
+    data = os.urandom(options.keys * options.key_size)
+    keys = [data[i:i + options.key_size] for i in range(0, len(data), options.key_size)]
+
+    paths = []
+    if murmur3 is not None:
+        paths.append(("from_key", lambda: [Murmur3Token.from_key(key) for key in keys], 1))
+        paths.append(("murmur3", lambda: [murmur3(key) for key in keys], 1))
+        paths.append(("many", lambda: murmur3_many(keys), 1))
+        paths.append(("fixed", lambda: murmur3_many_fixed(data, options.key_size), 1))
+        assert list(murmur3_many(keys)) == list(murmur3_many_fixed(data, options.key_size)) == \
+            [murmur3(key) for key in keys]
+    else:
+        print("The cmurmur3 extension is not available, only the Python path is measured")
+    paths.append(("python", lambda: _murmur3_many(keys[:len(keys) // 10]), 10))
+
+    print("%-8s %14s" % ("path", "keys/s"))
+    for name, path, fraction in paths:
+        start = time.time()
+        path()
+        elapsed = time.time() - start
+        print("%-8s %14.0f" % (name, options.keys / fraction / elapsed))
+
+
+if __name__ == "__main__":
+    main()
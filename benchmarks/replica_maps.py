@@ -0,0 +1,78 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Microbenchmark for building the replica maps of NetworkTopologyStrategy
+keyspaces (no server required).
+
+Builds the token-to-replicas map of a synthetic ring of random vnode tokens,
+with hosts spread over datacenters and racks, for growing numbers of nodes
+per datacenter up to --nodes (about 10k to 100k tokens by default).
+
+    python benchmarks/replica_maps.py [--dcs 3] [--racks 3] [--nodes 400] [--vnodes 256] [--rf 3]
+"""
+
+from __future__ import print_function
+
+from optparse import OptionParser
+import os.path
+import random
+import sys
+import time
+
+dirname = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(dirname, '..'))
+
+from cassandra.metadata import NetworkTopologyStrategy, Murmur3Token, MIN_LONG, MAX_LONG
+from cassandra.policies import SimpleConvictionPolicy
+from cassandra.pool import Host
+
+
+def make_ring(num_dcs, num_racks, num_nodes, num_vnodes):
+    token_to_host_owner = {}
+    for i in range(num_nodes):
+        host = Host('127.%d.%d.%d' % (i // 65536, i // 256 % 256, i % 256), SimpleConvictionPolicy)
+        host.set_location_info('dc%d' % (i % num_dcs), 'rack%d' % (i // num_dcs % num_racks))
+        for _ in range(num_vnodes):
+            token_to_host_owner[Murmur3Token(random.randint(MIN_LONG, MAX_LONG))] = host
+    return token_to_host_owner, sorted(token_to_host_owner)
+
+
+def main():
+    parser = OptionParser()
+    parser.add_option('-d', '--dcs', type='int', default=3,
+                      help='datacenters [default: %default]')
+    parser.add_option('-k', '--racks', type='int', default=3,
+                      help='racks per datacenter [default: %default]')
+    parser.add_option('-n', '--nodes', type='int', default=400,
+                      help='largest number of nodes [default: %default]')
+    parser.add_option('-v', '--vnodes', type='int', default=256,
+                      help='tokens per node [default: %default]')
+    parser.add_option('-r', '--rf', type='int', default=3,
+                      help='replication factor in each datacenter [default: %default]')
+    options, args = parser.parse_args()
+
+    random.seed(0)
+    strategy = NetworkTopologyStrategy(dict(('dc%d' % i, options.rf) for i in range(options.dcs)))
+
+    print("%8s %8s %10s" % ("nodes", "tokens", "seconds"))
+    for num_nodes in sorted(set([max(options.nodes // 10, 1), options.nodes // 4, options.nodes // 2, options.nodes])):
+        token_to_host_owner, ring = make_ring(options.dcs, options.racks, num_nodes, options.vnodes)
+        start = time.time()
+        strategy.make_token_replica_map(token_to_host_owner, ring)
+        print("%8d %8d %10.2f" % (num_nodes, len(ring), time.time() - start))
+
+
+if __name__ == "__main__":
+    main()
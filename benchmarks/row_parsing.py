@@ -0,0 +1,111 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Microbenchmark for decoding ROWS results into the rows of a row factory (no
+server required).
+
+Decodes synthetic result pages of a narrow and a wide table with int, bigint,
+double and text columns. "two pass" is the previous path, which decodes tuples
+and passes them through the row factory, as ResponseFuture did. "fused" builds
+the factory's rows while decoding (Cython extensions only).
+
+    python benchmarks/row_parsing.py [--rows 5000] [--narrow 3] [--wide 50] [--pages 20]
+"""
+
+from __future__ import print_function
+
+from optparse import OptionParser
+import os.path
+import sys
+import time
+
+dirname = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(dirname, '..'))
+
+from cassandra.marshal import int32_pack, int64_pack, double_pack, uint16_pack
+from cassandra.protocol import ProtocolHandler, ResultMessage, RESULT_KIND_ROWS
+from cassandra.query import tuple_factory, named_tuple_factory, dict_factory
+
+# type code and a serialized value for each kind of column, in turn
+CELLS = [(0x0009, int32_pack(42)),
+         (0x0002, int64_pack(1234567890123)),
+         (0x0007, double_pack(3.14159)),
+         (0x000D, b'some text value')]
+
+
+def write_string(s):
+    return uint16_pack(len(s)) + s
+
+
+def make_rows_body(num_rows, num_columns):
+    body = [int32_pack(RESULT_KIND_ROWS), int32_pack(0x0001), int32_pack(num_columns),
+            write_string(b'ks'), write_string(b'tbl')]
+    row = []
+    for i in range(num_columns):
+        type_code, cell = CELLS[i % len(CELLS)]
+        body.append(write_string(('c%d' % i).encode('ascii')))
+        body.append(uint16_pack(type_code))
+        row.append(int32_pack(len(cell)) + cell)
+    body.append(int32_pack(num_rows))
+    body.append(b''.join(row) * num_rows)
+    return b''.join(body)
+
+
+def decode(handler, body):
+    return handler.decode_message(4, {}, 0, 0, ResultMessage.opcode, body, None, None)
+
+
+def two_pass(row_factory, body):
+    return row_factory(*decode(ProtocolHandler, body).results)
+
+
+def fused(row_factory, body):
+    return decode(ProtocolHandler._for_row_factory(row_factory), body).results[1]
+
+
+def main():
+    parser = OptionParser()
+    parser.add_option('-r', '--rows', type='int', default=5000,
+                      help='rows per page [default: %default]')
+    parser.add_option('-n', '--narrow', type='int', default=3,
+                      help='columns of the narrow table [default: %default]')
+    parser.add_option('-w', '--wide', type='int', default=50,
+                      help='columns of the wide table [default: %default]')
+    parser.add_option('-p', '--pages', type='int', default=20,
+                      help='pages decoded per run [default: %default]')
+    options, args = parser.parse_args()
+
+    paths = [("two pass", two_pass)]
+    if ProtocolHandler._for_row_factory(named_tuple_factory) is not ProtocolHandler:
+        paths.append(("fused", fused))
+    else:
+        print("Cython extensions not available, only the two pass path is measured")
+
+    print("%-8s %-20s %-10s %14s" % ("columns", "row factory", "path", "rows/s"))
+    for num_columns in (options.narrow, options.wide):
+        body = make_rows_body(options.rows, num_columns)
+        for row_factory in (tuple_factory, named_tuple_factory, dict_factory):
+            for name, path in paths:
+                assert path(row_factory, body) == two_pass(row_factory, body)
+                start = time.time()
+                for _ in range(options.pages):
+                    path(row_factory, body)
+                elapsed = time.time() - start
+                print("%-8d %-20s %-10s %14.0f" % (num_columns, row_factory.__name__, name,
+                                                    options.rows * options.pages / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Microbenchmark for request timer churn in the reactors' TimerManager.
+
+Simulates sustained load on a virtual clock (no server required): every request
+adds a timeout Timer, as ResponseFuture does, and cancels it when its response
+arrives a little later, except for a --slow-fraction of requests that time out.
+The event loop services timers every --interval seconds.
+Reports wall time per request and the most timers held at once. The "heap" rows
+replay the previous heap-based TimerManager for comparison.
+
+    python benchmarks/timer_churn.py [--rate 50000] [--timeout 10] [--duration 20]
+"""
+
+from __future__ import print_function
+
+from collections import deque
+from heapq import heappush, heappop
+from optparse import OptionParser
+import os.path
+import sys
+import time
+
+dirname = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(dirname, '..'))
+
+import cassandra.connection
+from cassandra.connection import Timer, TimerManager
+
+
+class _Clock(object):
+    """ Stands in for the time module in cassandra.connection """
+
+    def __init__(self):
+        self.now = 1500000000.0
+
+    def time(self):
+        return self.now
+
+
+class _HeapTimerManager(object):
+    """ The heap-based TimerManager used before the timing wheel """
+
+    def __init__(self):
+        self._queue = []
+        self._new_timers = []
+
+    def add_timer(self, timer):
+        self._new_timers.append((timer.end, timer))
+
+    def service_timeouts(self):
+        queue = self._queue
+        if self._new_timers:
+            new_timers = self._new_timers
+            while new_timers:
+                heappush(queue, new_timers.pop())
+
+        if queue:
+            now = cassandra.connection.time.time()
+            while queue:
+                timer = queue[0][1]
+                if timer.finish(now):
+                    heappop(queue)
+                else:
+                    return timer.end
+
+    def __len__(self):
+        return len(self._queue)
+
+
+def held(manager):
+    if isinstance(manager, _HeapTimerManager):
+        return len(manager)
+    return sum(manager._level_counts)
+
+
+def run(manager_class, clock, options):
+    manager = manager_class()
+    in_flight = deque()
+    per_interval = int(options.rate * options.interval)
+    latency_intervals = max(int(options.latency / options.interval), 1)
+    steps = int(options.duration / options.interval)
+    callback = lambda: None
+
+    slow_every = int(1 / options.slow_fraction) if options.slow_fraction else 0
+
+    max_held = 0
+    start = time.time()
+    for step in range(steps):
+        clock.now += options.interval
+        timers = [Timer(options.timeout, callback) for _ in range(per_interval)]
+        for timer in timers:
+            manager.add_timer(timer)
+        in_flight.append(timers)
+        if len(in_flight) > latency_intervals:
+            for i, timer in enumerate(in_flight.popleft()):
+                if not slow_every or i % slow_every:
+                    timer.cancel()
+        manager.service_timeouts()
+        if step % 100 == 0:
+            max_held = max(max_held, held(manager))
+    elapsed = time.time() - start
+    return elapsed, steps * per_interval, max_held
+
+
+def main():
+    parser = OptionParser()
+    parser.add_option('--rate', type='int', default=50000, help='requests per second')
+    parser.add_option('--timeout', type='float', default=10.0, help='request timeout in seconds')
+    parser.add_option('--latency', type='float', default=0.002, help='seconds until each response cancels its timer')
+    parser.add_option('--slow-fraction', type='float', default=0.001,
+                      help='fraction of requests that are not answered and time out')
+    parser.add_option('--interval', type='float', default=0.001, help='seconds between timer servicing')
+    parser.add_option('--duration', type='float', default=20.0, help='simulated seconds of load')
+    options, args = parser.parse_args()
+
+    clock = _Clock()
+    real_time = cassandra.connection.time
+    cassandra.connection.time = clock
+    try:
+        print("%-8s %12s %14s %12s" % ("manager", "requests", "us/request", "max held"))
+        for name, manager_class in (('heap', _HeapTimerManager), ('wheel', TimerManager)):
+            elapsed, requests, max_held = run(manager_class, clock, options)
+            print("%-8s %12d %14.2f %12d" % (name, requests, elapsed * 1e6 / requests, max_held))
+    finally:
+        cassandra.connection.time = real_time
+
+
+if __name__ == "__main__":
+    main()
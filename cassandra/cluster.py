@@ -19,19 +19,19 @@ This module houses the main classes you will interact with,
 from __future__ import absolute_import
 
 import atexit
-from collections import defaultdict, Mapping
+from collections import defaultdict, deque, Mapping
 from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait as wait_futures
 from copy import copy
 from functools import partial, wraps
 from itertools import groupby, count
 import logging
-from random import random
+from random import random, shuffle
 import six
 from six.moves import filter, range, queue as Queue
 import socket
 import sys
 import time
-from threading import Lock, RLock, Thread, Event
+from threading import Lock, RLock, Thread, Event, Condition
 
 import weakref
 from weakref import WeakValueDictionary
@@ -40,6 +40,12 @@ try:
 except ImportError:
     from cassandra.util import WeakSet  # NOQA
 
+try:
+    import asyncio
+    from cassandra.io.asyncioreactor import in_loop_thread
+except ImportError:
+    asyncio = None  # NOQA
+
 from cassandra import (ConsistencyLevel, AuthenticationFailed,
                        OperationTimedOut, UnsupportedOperation,
                        SchemaTargetType, DriverException, ProtocolVersion)
@@ -57,10 +63,12 @@ from cassandra.protocol import (QueryMessage, ResultMessage,
                                 IsBootstrappingErrorMessage,
                                 BatchMessage, RESULT_KIND_PREPARED,
                                 RESULT_KIND_SET_KEYSPACE, RESULT_KIND_ROWS,
-                                RESULT_KIND_SCHEMA_CHANGE, ProtocolHandler)
-from cassandra.metadata import Metadata, protect_name, murmur3
+                                RESULT_KIND_SCHEMA_CHANGE, ProtocolHandler,
+                                NumpyProtocolHandler)
+from cassandra.metadata import (Metadata, protect_name, murmur3, Murmur3Token, MD5Token,
+                                MIN_LONG, MAX_LONG)
 from cassandra.policies import (TokenAwarePolicy, DCAwareRoundRobinPolicy, SimpleConvictionPolicy,
-                                ExponentialReconnectionPolicy, HostDistance,
+                                ExponentialReconnectionPolicy, HostDistance, LoadBalancingPolicy,
                                 RetryPolicy, IdentityTranslator, NoSpeculativeExecutionPlan,
                                 NoSpeculativeExecutionPolicy)
 from cassandra.pool import (Host, _ReconnectionHandler, _HostReconnectionHandler,
@@ -1888,6 +1896,21 @@ class Session(object):
     .. versionadded:: 2.0.0
     """
 
+    default_prefetch_pages = 0
+    """
+    While the rows of a page of results are iterated, up to this many of
+    the following pages are fetched in the background, so that iteration
+    does not wait one round trip per page. This can be overridden per result
+    with :attr:`.ResultSet.prefetch_pages`.
+
+    Pages are requested one after the other, since each request needs the
+    paging state of the previous page, and no more than this many are held
+    in memory besides the current one. The default of 0 fetches each page
+    once the previous one is exhausted.
+
+    .. versionadded:: 3.12.0
+    """
+
     use_client_timestamp = True
     """
     When using protocol version 3 or higher, write timestamps may be supplied
@@ -2065,11 +2088,154 @@ class Session(object):
 
         """
         future = self._create_response_future(query, parameters, trace, custom_payload, timeout, execution_profile, paging_state)
-        future._protocol_handler = self.client_protocol_handler
+        future._protocol_handler = self.client_protocol_handler._for_row_factory(future.row_factory)
         self._on_request(future)
         future.send_request()
         return future
 
+    def execute_aio(self, query, parameters=None, trace=False, custom_payload=None, timeout=_NOT_SET, execution_profile=EXEC_PROFILE_DEFAULT, paging_state=None, loop=None):
+        """
+        Execute the given query and return an :class:`asyncio.Future` which
+        resolves to a :class:`.ResultSet`, or raises the request error, when awaited.
+
+        `loop` is the event loop the future is bound to. If not specified, the current
+        event loop is used.
+
+        See :meth:`Session.execute` for other parameter definitions.
+
+        Results are handed to `loop` from the driver event loop thread. When the
+        session uses :class:`~cassandra.io.asyncioreactor.AsyncioConnection` running on
+        the same loop, responses are delivered in place without a thread hop.
+
+        Example usage::
+
+            >>> rows = await session.execute_aio("SELECT * FROM mycf")
+            >>> for row in rows.current_rows:
+            ...     process(row)
+
+        Note that iterating past the first page of the returned :class:`.ResultSet`
+        fetches further pages synchronously. On the loop thread, page explicitly instead
+        by passing :attr:`.ResultSet.paging_state` to a subsequent call.
+
+        .. versionadded:: 3.12.0
+        """
+        if asyncio is None:
+            raise DriverException("Session.execute_aio requires the asyncio module (Python 3.4+)")
+
+        loop = loop or asyncio.get_event_loop()
+        aio_future = asyncio.Future(loop=loop)
+        response_future = self.execute_async(query, parameters, trace, custom_payload, timeout, execution_profile, paging_state)
+
+        def resolve(fn, value):
+            if not aio_future.done():
+                fn(value)
+
+        def deliver(fn, value):
+            # avoid a thread hop if the response was processed on the target loop
+            if in_loop_thread(loop):
+                resolve(fn, value)
+            else:
+                loop.call_soon_threadsafe(resolve, fn, value)
+
+        response_future.add_callbacks(
+            callback=lambda rows: deliver(aio_future.set_result,
+                                          ResultSet(response_future, rows, response_future.prefetch_pages)),
+            errback=lambda exc: deliver(aio_future.set_exception, exc))
+        return aio_future
+
+    def execute_columnar(self, query, parameters=None, timeout=_NOT_SET, custom_payload=None, execution_profile=EXEC_PROFILE_DEFAULT, paging_state=None, dataframe=False):
+        """
+        Execute the given query, fetch all the pages of its result, and return the rows as
+        one dict of contiguous NumPy arrays by column name. If `dataframe` is :const:`True`,
+        a :class:`pandas.DataFrame` of these arrays is returned instead.
+
+        Pages are decoded by :data:`~cassandra.protocol.NumpyProtocolHandler`, or by
+        :attr:`.client_protocol_handler` if it derives from it (see
+        :func:`~cassandra.protocol.raw_scalar_protocol_handler`), whatever the row factory.
+        Numeric columns are returned as masked arrays, masking null values, and other
+        columns (text, collections, ...) as object arrays. See
+        :meth:`.ResultSet.all_columns`.
+
+        This requires the Cython extensions and NumPy, as well as pandas for `dataframe`.
+
+        See :meth:`Session.execute` for other parameter definitions.
+
+        Example usage::
+
+            >>> columns = session.execute_columnar("SELECT id, value FROM readings")
+            >>> columns['value'].mean()
+
+        .. versionadded:: 3.12.0
+        """
+        if NumpyProtocolHandler is None:
+            raise DriverException("Session.execute_columnar requires the Cython extensions and NumPy")
+
+        future = self._create_response_future(query, parameters, False, custom_payload, timeout, execution_profile, paging_state)
+        future.row_factory = tuple_factory
+        protocol_handler = self.client_protocol_handler
+        if not issubclass(protocol_handler, NumpyProtocolHandler):
+            protocol_handler = NumpyProtocolHandler
+        future._protocol_handler = protocol_handler
+        self._on_request(future)
+        future.send_request()
+        return future.result().all_columns(dataframe)
+
+    def scan_table(self, keyspace, table, columns=None, splits_per_host=1, concurrency=None, timeout=_NOT_SET, execution_profile=EXEC_PROFILE_DEFAULT):
+        """
+        Read all the rows of a table, and return a generator of these rows.
+
+        The token ring (see :attr:`.Metadata.token_map`) is split into token ranges,
+        at least `splits_per_host` per host of the ring, and the rows of each range are
+        selected by a query sent to one of its replicas first, so that the scan spreads
+        over the whole cluster rather than being paged through one coordinator. At most
+        `concurrency` of these queries run at a time, defaulting to the number of hosts
+        of the ring. Rows are returned as they are fetched: the order of the rows of
+        different ranges is not specified.
+
+        Only a page of rows (see :attr:`~.Session.default_fetch_size`) is held per running
+        query, the next one being fetched when the generator gets to this page, so that
+        memory use is bounded by `concurrency` whatever the size of the table.
+
+        `columns` is a sequence of the names of the columns to select, all of them by default.
+
+        This requires token metadata (see :attr:`.Cluster.token_metadata_enabled`), and the
+        ``Murmur3Partitioner`` or ``RandomPartitioner``.
+
+        See :meth:`Session.execute` for other parameter definitions.
+
+        Example usage::
+
+            >>> for row in session.scan_table('ks', 'users', ['id', 'name'], splits_per_host=4):
+            ...     process_user(row)
+
+        .. versionadded:: 3.12.0
+        """
+        if splits_per_host <= 0:
+            raise ValueError("splits_per_host must be greater than 0")
+        if concurrency is not None and concurrency <= 0:
+            raise ValueError("concurrency must be greater than 0")
+
+        metadata = self.cluster.metadata
+        token_map = metadata.token_map
+        if not token_map or not token_map.ring:
+            raise DriverException("Session.scan_table requires token metadata")
+        try:
+            table_meta = metadata.keyspaces[keyspace].tables[table]
+        except KeyError:
+            raise ValueError("Unknown table '%s.%s'" % (keyspace, table))
+
+        num_hosts = len(set(token_map.token_to_host_owner.values()))
+        ranges = _scan_ranges(token_map, keyspace, splits_per_host * num_hosts)
+
+        partition_key = ', '.join(protect_name(c.name) for c in table_meta.partition_key)
+        query_string = "SELECT %s FROM %s.%s WHERE token(%s) > %%s AND token(%s) <= %%s" % (
+            ', '.join(protect_name(c) for c in columns) if columns else '*',
+            protect_name(keyspace), protect_name(table), partition_key, partition_key)
+
+        scan = _TableScan(self, query_string, keyspace, ranges, concurrency or num_hosts,
+                          timeout, execution_profile)
+        return iter(scan)
+
     def _create_response_future(self, query, parameters, trace, custom_payload, timeout, execution_profile=EXEC_PROFILE_DEFAULT, paging_state=None):
         """ Returns the ResponseFuture before calling send_request() on it """
 
@@ -2152,10 +2318,12 @@ class Session(object):
         message.paging_state = paging_state
 
         spec_exec_plan = spec_exec_policy.new_plan(query.keyspace or self.keyspace, query) if query.is_idempotent and spec_exec_policy else None
-        return ResponseFuture(
+        future = ResponseFuture(
             self, message, query, timeout, metrics=self._metrics,
             prepared_statement=prepared_statement, retry_policy=retry_policy, row_factory=row_factory,
             load_balancer=load_balancing_policy, start_time=start_time, speculative_execution_plan=spec_exec_plan)
+        future.prefetch_pages = self.default_prefetch_pages
+        return future
 
     def _get_execution_profile(self, ep):
         profiles = self.cluster.profile_manager.profiles
@@ -3296,6 +3464,12 @@ class ResponseFuture(object):
     A list of hosts tried, including all speculative executions, retries, and pages
     """
 
+    prefetch_pages = 0
+    """
+    The number of pages that the :class:`.ResultSet` of this future fetches
+    ahead while it is iterated. See :attr:`.Session.default_prefetch_pages`.
+    """
+
     session = None
     row_factory = None
     message = None
@@ -3577,7 +3751,10 @@ class ResponseFuture(object):
                         self._paging_state = response.paging_state
                         self._col_types = response.col_types
                         self._col_names = results[0]
-                        results = self.row_factory(*results)
+                        if response.row_factory is self.row_factory:
+                            results = results[1]
+                        else:
+                            results = self.row_factory(*results)
                     self._set_final_result(results)
             elif isinstance(response, ErrorMessage):
                 retry_policy = self._retry_policy
@@ -3839,7 +4016,7 @@ class ResponseFuture(object):
         """
         self._event.wait()
         if self._final_result is not _NOT_SET:
-            return ResultSet(self, self._final_result)
+            return ResultSet(self, self._final_result, self.prefetch_pages)
         else:
             raise self._final_exception
 
@@ -4025,19 +4202,34 @@ class ResultSet(object):
     like you might see on a normal call to ``session.execute()``.
     """
 
-    def __init__(self, response_future, initial_response):
+    prefetch_pages = 0
+    """
+    The number of pages fetched in the background while the rows of the
+    current page are iterated (see :attr:`.Session.default_prefetch_pages`).
+    Set it before iterating to override the session's default for this
+    result.
+
+    .. versionadded:: 3.12.0
+    """
+
+    _prefetcher = None
+
+    def __init__(self, response_future, initial_response, prefetch_pages=0):
         self.response_future = response_future
         self.column_names = response_future._col_names
         self.column_types = response_future._col_types
         self._set_current_rows(initial_response)
         self._page_iter = None
         self._list_mode = False
+        self.prefetch_pages = prefetch_pages
 
     @property
     def has_more_pages(self):
         """
         True if the last response indicated more pages; False otherwise
         """
+        if self._prefetcher:
+            return self._prefetcher.has_more_pages
         return self.response_future.has_more_pages
 
     @property
@@ -4052,13 +4244,15 @@ class ResultSet(object):
         if self._list_mode:
             return iter(self._current_rows)
         self._page_iter = iter(self._current_rows)
+        if self.prefetch_pages > 0 and not self._prefetcher and self.response_future.has_more_pages:
+            self._prefetcher = _PagePrefetcher(self.response_future, self.prefetch_pages)
         return self
 
     def next(self):
         try:
             return next(self._page_iter)
         except StopIteration:
-            if not self.response_future.has_more_pages:
+            if not self.has_more_pages:
                 if not self._list_mode:
                     self._current_rows = []
                 raise
@@ -4076,7 +4270,13 @@ class ResultSet(object):
         and inspecting :meth:`~.current_page`. It is not necessary to call this when iterating
         through results; paging happens implicitly in iteration.
         """
-        if self.response_future.has_more_pages:
+        if self._prefetcher:
+            page = self._prefetcher.next_page()
+            if page is None:
+                self._current_rows = []
+            else:
+                self._set_current_rows(page)
+        elif self.response_future.has_more_pages:
             self.response_future.start_fetching_next_page()
             result = self.response_future.result()
             self._current_rows = result._current_rows  # ResultSet has already _set_current_rows to the appropriate form
@@ -4102,7 +4302,7 @@ class ResultSet(object):
             return
         if self._page_iter:
             raise RuntimeError("Cannot use %s when results have been iterated." % operator)
-        if self.response_future.has_more_pages:
+        if self.has_more_pages:
             log.warning("Using %s on paged results causes entire result set to be materialized.", operator)
         self._fetch_all()  # done regardless of paging status in case the row factory produces a generator
         self._list_mode = True
@@ -4120,6 +4320,38 @@ class ResultSet(object):
 
     __bool__ = __nonzero__
 
+    def all_columns(self, dataframe=False):
+        """
+        Fetches all the remaining pages of a result decoded by
+        :data:`~cassandra.protocol.NumpyProtocolHandler` (with :func:`~cassandra.query.tuple_factory`),
+        and returns their rows as one dict of NumPy arrays by column name.
+
+        Each page's arrays are appended into buffers grown geometrically, and each
+        column is returned as a single contiguous array: a masked array for numeric
+        columns, masking null values, and an object array for the others. If `dataframe`
+        is :const:`True`, a :class:`pandas.DataFrame` of these arrays is returned instead.
+
+        Pages already consumed by iterating the result set cannot be included. See also
+        :meth:`.Session.execute_columnar`.
+
+        .. versionadded:: 3.12.0
+        """
+        if self._page_iter is not None:
+            raise RuntimeError("Cannot fetch all columns when results have been iterated.")
+
+        buffers = _ColumnBuffers(self.column_names or [])
+        while True:
+            for page in self.current_rows:
+                if not isinstance(page, Mapping):
+                    raise DriverException("Result pages are not decoded into columns; "
+                                          "use NumpyProtocolHandler with tuple_factory")
+                buffers.append(page)
+            if not self.has_more_pages:
+                break
+            self.fetch_next_page()
+
+        return buffers.dataframe() if dataframe else buffers.columns()
+
     def get_query_trace(self, max_wait_sec=None):
         """
         Gets the last query trace from the associated future.
@@ -4162,4 +4394,303 @@ class ResultSet(object):
         The driver treats paging state as opaque, but it may contain primary key data, so applications may want to
         avoid sending this to untrusted parties.
         """
+        if self._prefetcher:
+            # the future is ahead of the current page
+            return self._prefetcher.paging_state
         return self.response_future._paging_state
+
+
+class _PagePrefetcher(object):
+    """
+    Fetches the pages following the current one of a paged ResponseFuture in
+    the background, holding at most `depth` of them until they are consumed.
+    """
+
+    def __init__(self, response_future, depth):
+        self.response_future = response_future
+        self.depth = depth
+        # paging state of the page being consumed
+        self.paging_state = response_future._paging_state
+        # (response, paging state) of fetched pages, or the exception a fetch failed with
+        self._pages = deque()
+        self._fetching = False
+        # reentrant, as a fetch failing on the spot calls _on_error in place
+        self._condition = Condition(RLock())
+
+        # the callbacks are called on the spot for the current page, which is skipped
+        self._started = False
+        response_future.add_callbacks(self._on_page, self._on_error)
+        self._started = True
+        with self._condition:
+            self._fetch()
+
+    @property
+    def has_more_pages(self):
+        with self._condition:
+            return bool(self._pages) or self._fetching or self.response_future.has_more_pages
+
+    def _fetch(self):
+        # called with the condition held
+        if (not self._fetching and len(self._pages) < self.depth and
+                (not self._pages or not isinstance(self._pages[-1], Exception)) and
+                self.response_future.has_more_pages):
+            self._fetching = True
+            try:
+                self.response_future.start_fetching_next_page()
+            except Exception as exc:
+                self._on_error(exc)
+
+    def _on_page(self, response):
+        if not self._started:
+            return
+        with self._condition:
+            self._fetching = False
+            self._pages.append((response, self.response_future._paging_state))
+            self._fetch()
+            self._condition.notify_all()
+
+    def _on_error(self, exc):
+        if not self._started:
+            return
+        with self._condition:
+            self._fetching = False
+            self._pages.append(exc)
+            self._condition.notify_all()
+
+    def next_page(self):
+        """
+        Waits for the next page and returns its response, or returns None if
+        there are no more pages. Raises the error the page failed with, if any.
+        """
+        with self._condition:
+            while not self._pages:
+                if not self._fetching:
+                    return None
+                self._condition.wait()
+            page = self._pages.popleft()
+            if isinstance(page, Exception):
+                raise page
+            response, self.paging_state = page
+            self._fetch()
+        return response
+
+
+class _ColumnBuffers(object):
+    """
+    Appends the NumPy arrays of result pages into one buffer per column (and
+    one per mask, for masked arrays). Buffers at least double when they grow,
+    so that values are copied a bounded number of times whatever the number
+    of pages.
+    """
+
+    def __init__(self, column_names):
+        self.column_names = column_names
+        self.size = 0
+        self.capacity = 0
+        self.buffers = None
+        self.masks = {}
+
+    def append(self, page):
+        import numpy as np
+
+        num_rows = len(page[self.column_names[0]]) if self.column_names else 0
+        if self.buffers is None:
+            self.buffers = {}
+            for name in self.column_names:
+                self.buffers[name] = np.empty(num_rows, dtype=page[name].dtype)
+                if isinstance(page[name], np.ma.MaskedArray):
+                    self.masks[name] = np.zeros(num_rows, dtype=bool)
+            self.capacity = num_rows
+        elif self.size + num_rows > self.capacity:
+            self._grow(max(2 * self.capacity, self.size + num_rows))
+
+        end = self.size + num_rows
+        for name in self.column_names:
+            self.buffers[name][self.size:end] = np.ma.getdata(page[name])
+            if name in self.masks:
+                self.masks[name][self.size:end] = np.ma.getmaskarray(page[name])
+        self.size = end
+
+    def _grow(self, capacity):
+        import numpy as np
+
+        for buffers in (self.buffers, self.masks):
+            for name, buf in buffers.items():
+                grown = np.empty(capacity, dtype=buf.dtype)
+                grown[:self.size] = buf[:self.size]
+                buffers[name] = grown
+        self.capacity = capacity
+
+    def columns(self):
+        import numpy as np
+
+        columns = {}
+        if self.buffers is None:
+            return columns
+        if self.capacity > self.size:
+            # copy rather than slice, not to keep the unused capacity alive
+            self.buffers = dict((name, buf[:self.size].copy()) for name, buf in self.buffers.items())
+            self.masks = dict((name, mask[:self.size].copy()) for name, mask in self.masks.items())
+            self.capacity = self.size
+        for name in self.column_names:
+            if name in self.masks:
+                columns[name] = np.ma.MaskedArray(self.buffers[name], mask=self.masks[name])
+            else:
+                columns[name] = self.buffers[name]
+        return columns
+
+    def dataframe(self):
+        try:
+            import pandas
+        except ImportError:
+            raise DriverException("Returning a DataFrame requires pandas")
+        return pandas.DataFrame(self.columns(), columns=self.column_names)
+
+
+# bounds of the token ranges of the partitioners a table can be scanned with, as
+# (start, end) of the range starting at the minimum token, which no key hashes to
+_scan_token_bounds = {
+    Murmur3Token: (MIN_LONG, MAX_LONG),
+    MD5Token: (-1, 2 ** 127)
+}
+
+
+def _scan_ranges(token_map, keyspace, splits):
+    """
+    Splits the ring of `token_map` into at least `splits` token ranges, splitting
+    the ranges between ring tokens in proportion to their width, and returns a list
+    of ``(start, end, replicas)``, ``start`` being exclusive and ``end`` inclusive.
+
+    Ranges are ordered by split so that consecutive ranges have different replicas.
+    """
+    token_class = token_map.token_class
+    try:
+        min_token, max_token = _scan_token_bounds[token_class]
+    except KeyError:
+        raise DriverException("Session.scan_table does not support the partitioner of %s" % (token_class.__name__,))
+
+    ring = [token.value for token in token_map.ring]
+    # the range wrapping around the ring is split at the minimum token
+    bounds = [(min_token, ring[0])] + list(zip(ring, ring[1:])) + [(ring[-1], max_token)]
+    width = max_token - min_token
+
+    ranges = []
+    for start, end in bounds:
+        if start >= end:
+            continue
+        # the range start token is owned by the previous range, so it is bisected to the owner of this one
+        replicas = token_map.get_replicas(keyspace, token_class(start))
+        count = max(1, (splits * (end - start) + width // 2) // width)
+        split_start = start
+        for i in range(1, count + 1):
+            split_end = start + (end - start) * i // count
+            ranges.append((i, split_start, split_end, replicas))
+            split_start = split_end
+
+    ranges.sort(key=lambda r: r[0])
+    return [(start, end, replicas) for _, start, end, replicas in ranges]
+
+
+class _ReplicasFirstPolicy(LoadBalancingPolicy):
+    """
+    Wraps the load balancing policy of a query to first yield the local replicas
+    of its token range, as :class:`.TokenAwarePolicy` does for routing keys.
+    """
+
+    def __init__(self, child_policy, replicas):
+        self._child_policy = child_policy
+        self._replicas = list(replicas)
+        shuffle(self._replicas)
+
+    def distance(self, *args, **kwargs):
+        return self._child_policy.distance(*args, **kwargs)
+
+    def make_query_plan(self, working_keyspace=None, query=None):
+        child = self._child_policy
+        replicas = self._replicas
+        for replica in replicas:
+            if replica.is_up and child.distance(replica) == HostDistance.LOCAL:
+                yield replica
+
+        for host in child.make_query_plan(working_keyspace, query):
+            if host not in replicas or child.distance(host) == HostDistance.REMOTE:
+                yield host
+
+
+class _TableScan(object):
+    """
+    Runs the query of each token range of a table scan, `concurrency` of them
+    at a time, and yields their rows. A running query holds one page at a time:
+    its next page is fetched when the consumer gets to the current one.
+    """
+
+    def __init__(self, session, query_string, keyspace, ranges, concurrency, timeout, execution_profile):
+        self.session = session
+        self.query_string = query_string
+        self.keyspace = keyspace
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.execution_profile = execution_profile
+        self._ranges = iter(ranges)
+        self._running = 0
+        # (response future, rows) of fetched pages, or the exception a query failed with
+        self._pages = deque()
+        # reentrant, as the callbacks of a query failing on the spot are called in place
+        self._condition = Condition(RLock())
+
+    def __iter__(self):
+        with self._condition:
+            for _ in range(self.concurrency):
+                if not self._execute_next():
+                    break
+
+        while True:
+            with self._condition:
+                while not self._pages:
+                    if not self._running:
+                        return
+                    self._condition.wait()
+                page = self._pages.popleft()
+            if isinstance(page, Exception):
+                raise page
+
+            response_future, rows = page
+            if response_future.has_more_pages:
+                response_future.start_fetching_next_page()
+            else:
+                with self._condition:
+                    self._running -= 1
+                    self._execute_next()
+            for row in rows:
+                yield row
+
+    def _execute_next(self):
+        # called with the condition held
+        try:
+            start, end, replicas = next(self._ranges)
+        except StopIteration:
+            return False
+
+        session = self.session
+        statement = SimpleStatement(self.query_string, keyspace=self.keyspace, is_idempotent=True)
+        future = session._create_response_future(statement, (start, end), False, None,
+                                                 self.timeout, self.execution_profile)
+        future._load_balancer = _ReplicasFirstPolicy(future._load_balancer, replicas)
+        future._make_query_plan()
+        future._protocol_handler = session.client_protocol_handler._for_row_factory(future.row_factory)
+        self._running += 1
+        # called for each page of the query
+        future.add_callbacks(self._on_page, self._on_error, callback_args=(future,))
+        session._on_request(future)
+        future.send_request()
+        return True
+
+    def _on_page(self, rows, response_future):
+        with self._condition:
+            self._pages.append((response_future, rows))
+            self._condition.notify_all()
+
+    def _on_error(self, exc):
+        with self._condition:
+            self._pages.append(exc)
+            self._condition.notify_all()
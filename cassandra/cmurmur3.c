@@ -211,8 +211,146 @@ murmur3(PyObject *self, PyObject *args)
     return (PyObject *) PyLong_FromLongLong(result);
 }
 
+// array.array type, and typecode of its 64-bit integers (NULL if there is none)
+static PyObject *array_type = NULL;
+#if PY_MAJOR_VERSION >= 3
+static const char *int64_typecode = "q";
+#else
+static const char *int64_typecode = (sizeof(long) == 8) ? "l" : NULL;
+#endif
+
+// Returns the n hashes of a buffer as an array.array of 64-bit integers,
+// or as a list if there is no such array typecode
+static PyObject *
+hashes_to_array(PyObject *raw, Py_ssize_t n)
+{
+    const int64_t *hashes = (const int64_t *) PyBytes_AS_STRING(raw);
+    PyObject *result;
+    Py_ssize_t i;
+
+    if (int64_typecode != NULL) {
+        return PyObject_CallFunction(array_type, "sO", int64_typecode, raw);
+    }
+
+    result = PyList_New(n);
+    if (result == NULL) {
+        return NULL;
+    }
+    for (i = 0; i < n; i++) {
+        PyObject *hash = PyLong_FromLongLong(hashes[i]);
+        if (hash == NULL) {
+            Py_DECREF(result);
+            return NULL;
+        }
+        PyList_SET_ITEM(result, i, hash);
+    }
+    return result;
+}
+
+static PyObject *
+murmur3_many(PyObject *self, PyObject *keys)
+{
+    PyObject *seq, *raw, *result;
+    int64_t *hashes;
+    Py_ssize_t n, i;
+
+    seq = PySequence_Fast(keys, "murmur3_many expects a sequence of keys");
+    if (seq == NULL) {
+        return NULL;
+    }
+    n = PySequence_Fast_GET_SIZE(seq);
+    raw = PyBytes_FromStringAndSize(NULL, n * sizeof(int64_t));
+    if (raw == NULL) {
+        Py_DECREF(seq);
+        return NULL;
+    }
+    hashes = (int64_t *) PyBytes_AS_STRING(raw);
+
+    for (i = 0; i < n; i++) {
+        PyObject *key = PySequence_Fast_GET_ITEM(seq, i);
+
+        if (PyBytes_Check(key)) {
+            hashes[i] = MurmurHash3_x64_128((void *) PyBytes_AS_STRING(key), PyBytes_GET_SIZE(key), 0);
+        } else if (PyUnicode_Check(key)) {
+            // encoded as murmur3() does it
+            PyObject *encoded = PyUnicode_AsUTF8String(key);
+            if (encoded == NULL) {
+                goto error;
+            }
+            hashes[i] = MurmurHash3_x64_128((void *) PyBytes_AS_STRING(encoded), PyBytes_GET_SIZE(encoded), 0);
+            Py_DECREF(encoded);
+        } else {
+            Py_buffer view;
+            if (PyObject_GetBuffer(key, &view, PyBUF_SIMPLE) == -1) {
+                goto error;
+            }
+            hashes[i] = MurmurHash3_x64_128(view.buf, view.len, 0);
+            PyBuffer_Release(&view);
+        }
+    }
+
+    Py_DECREF(seq);
+    result = hashes_to_array(raw, n);
+    Py_DECREF(raw);
+    return result;
+
+error:
+    Py_DECREF(seq);
+    Py_DECREF(raw);
+    return NULL;
+}
+
+static PyObject *
+murmur3_many_fixed(PyObject *self, PyObject *args)
+{
+    PyObject *data, *raw, *result;
+    Py_buffer view;
+    Py_ssize_t key_size, n, i;
+    int64_t *hashes;
+
+    if (!PyArg_ParseTuple(args, "On", &data, &key_size)) {
+        return NULL;
+    }
+    if (key_size <= 0) {
+        PyErr_SetString(PyExc_ValueError, "key_size must be greater than 0");
+        return NULL;
+    }
+    if (PyObject_GetBuffer(data, &view, PyBUF_SIMPLE) == -1) {
+        return NULL;
+    }
+    if (view.len % key_size) {
+        PyErr_Format(PyExc_ValueError, "buffer size (%zd) is not a multiple of key_size (%zd)", view.len, key_size);
+        PyBuffer_Release(&view);
+        return NULL;
+    }
+
+    n = view.len / key_size;
+    raw = PyBytes_FromStringAndSize(NULL, n * sizeof(int64_t));
+    if (raw == NULL) {
+        PyBuffer_Release(&view);
+        return NULL;
+    }
+    hashes = (int64_t *) PyBytes_AS_STRING(raw);
+
+    Py_BEGIN_ALLOW_THREADS
+    for (i = 0; i < n; i++) {
+        hashes[i] = MurmurHash3_x64_128((const char *) view.buf + i * key_size, key_size, 0);
+    }
+    Py_END_ALLOW_THREADS
+
+    PyBuffer_Release(&view);
+    result = hashes_to_array(raw, n);
+    Py_DECREF(raw);
+    return result;
+}
+
 static PyMethodDef cmurmur3_methods[] = {
     {"murmur3", murmur3, METH_VARARGS, "Make an x64 murmur3 64-bit hash value"},
+    {"murmur3_many", murmur3_many, METH_O,
+     "Make the x64 murmur3 64-bit hash values of a sequence of keys, as an array.array('q')"},
+    {"murmur3_many_fixed", murmur3_many_fixed, METH_VARARGS,
+     "Make the x64 murmur3 64-bit hash values of the consecutive keys of key_size bytes of a "
+     "contiguous buffer (such as a NumPy array), as an array.array('q')"},
     {NULL, NULL, 0, NULL}
 };
 
@@ -269,6 +407,20 @@ initcmurmur3(void)
         INITERROR;
     }
 
+    if (array_type == NULL) {
+        PyObject *array_module = PyImport_ImportModule("array");
+        if (array_module == NULL) {
+            Py_DECREF(module);
+            INITERROR;
+        }
+        array_type = PyObject_GetAttrString(array_module, "array");
+        Py_DECREF(array_module);
+        if (array_type == NULL) {
+            Py_DECREF(module);
+            INITERROR;
+        }
+    }
+
 #if PY_MAJOR_VERSION >= 3
     return module;
 #endif
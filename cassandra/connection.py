@@ -13,18 +13,17 @@
 # limitations under the License.
 
 from __future__ import absolute_import  # to enable import io from stdlib
-from collections import defaultdict, deque
+from collections import defaultdict
 import errno
 from functools import wraps, partial
-from heapq import heappush, heappop
-import io
 import logging
+import math
 import six
 from six.moves import range
 import socket
 import struct
 import sys
-from threading import Thread, Event, RLock
+from threading import Thread, Event, Lock, RLock
 import time
 
 try:
@@ -78,7 +77,8 @@ else:
 
     def lz4_decompress(byts):
         # flip from big-endian to little-endian
-        return lz4_block.decompress(byts[3::-1] + byts[4:])
+        # (byts may be a memoryview over the receive buffer)
+        return lz4_block.decompress(bytes(bytearray(byts[:4])[::-1] + byts[4:]))
 
     locally_supported_compressions['lz4'] = (lz4_compress, lz4_decompress)
 
@@ -89,6 +89,8 @@ except ImportError:
 else:
     # work around apparently buggy snappy decompress
     def decompress(byts):
+        if isinstance(byts, memoryview):
+            byts = byts.tobytes()
         if byts == '\x00':
             return ''
         return snappy.decompress(byts)
@@ -128,9 +130,200 @@ class _Frame(object):
         return "ver({0}); flags({1:04b}); stream({2}); op({3}); offset({4}); len({5})".format(self.version, self.flags, self.stream, self.opcode, self.body_offset, self.end_pos - self.body_offset)
 
 
+class _ReceiveBuffer(object):
+    """
+    Receive buffer for frame reassembly.
+
+    Data is read directly into a preallocated ``bytearray`` with :meth:`read_into`
+    (or copied in with :meth:`write`), and frames are handed out from the front as
+    ``memoryview`` slices. Views are only valid until the next read, because
+    unconsumed bytes are moved to the front of the buffer when it runs out of room.
+    That move is limited to a partial frame, so each received byte is copied at most
+    once more no matter how many frames are pipelined or how large they are.
+    """
+
+    max_retained_size = 2 ** 20
+    """
+    When the buffer is drained, it is reallocated at its initial size if it grew larger
+    than this, so that a single large frame does not pin memory for the life of the connection.
+    """
+
+    def __init__(self, size=4096):
+        self._initial_size = size
+        self._buf = bytearray(size)
+        self._start = 0  # first unconsumed byte
+        self._end = 0  # end of received data
+
+        self.copied = 0
+        """ The number of bytes moved while compacting or growing the buffer """
+
+    def tell(self):
+        """ The number of bytes received but not yet consumed """
+        return self._end - self._start
+
+    def getvalue(self):
+        return bytes(self._buf[self._start:self._end])
+
+    def byte_at(self, offset):
+        return self._buf[self._start + offset]
+
+    def unpack_from(self, struct_, offset):
+        return struct_.unpack_from(self._buf, self._start + offset)
+
+    def view(self, start, end):
+        """
+        Returns a ``memoryview`` over unconsumed bytes [`start`, `end`), without copying.
+        """
+        return memoryview(self._buf)[self._start + start:self._start + end]
+
+    def consume(self, n):
+        self._start += n
+        if self._start == self._end:
+            self._start = self._end = 0
+            if len(self._buf) > self.max_retained_size:
+                self._buf = bytearray(self._initial_size)
+
+    def reserve(self, size):
+        """
+        Ensures there is room to receive `size` more bytes.
+        """
+        buf = self._buf
+        if len(buf) - self._end >= size:
+            return
+
+        remaining = self._end - self._start
+        if remaining + size > len(buf):
+            # always allocate a new buffer to grow, since outstanding views prevent a resize in place
+            buf = bytearray(max(len(buf) * 2, remaining + size))
+            buf[:remaining] = memoryview(self._buf)[self._start:self._end]
+        elif remaining:
+            buf[:remaining] = buf[self._start:self._end]
+
+        self.copied += remaining
+        self._buf = buf
+        self._start = 0
+        self._end = remaining
+
+    def write(self, data):
+        n = len(data)
+        self.reserve(n)
+        self._buf[self._end:self._end + n] = data
+        self._end += n
+
+    def read_into(self, recv_into, size):
+        """
+        Calls ``recv_into(view, size)`` (e.g. ``socket.recv_into``) to receive up to `size`
+        bytes directly into the buffer. Returns the number of bytes received.
+        """
+        self.reserve(size)
+        n = recv_into(memoryview(self._buf)[self._end:], size)
+        self._end += n
+        return n
+
+
+class _StreamIdAllocator(object):
+    """
+    Hands out the stream (request) IDs ``0..max_id`` of a connection and counts
+    how many are in use, so that taking an ID and accounting for the in-flight
+    request happen together under one short, non-reentrant lock.
+
+    IDs are tracked in a bitset of 64-bit words (a set bit is an ID in use), which
+    grows one word at a time as needed. The lowest word that may have a free bit
+    is remembered, so allocation normally finds a free ID without scanning, and
+    the lowest free ID is always chosen to keep the set small.
+    """
+
+    _word_bits = 64
+    _full = (1 << 64) - 1
+
+    def __init__(self, max_id):
+        self.max_id = max_id
+        self._words = [0]
+        self._hint = 0  # no word below this one has a free bit
+        self._lock = Lock()
+
+        self.in_flight = 0
+        """ The number of IDs currently allocated """
+
+    def allocate(self, max_in_flight=None):
+        """
+        Returns the lowest free ID and counts it as in flight, or :const:`None` if all
+        IDs are in use or `max_in_flight` IDs already are.
+        """
+        with self._lock:
+            if max_in_flight is not None and self.in_flight >= max_in_flight:
+                return None
+            words = self._words
+            i = self._hint
+            n = len(words)
+            while i < n and words[i] == self._full:
+                i += 1
+            if i == n:
+                if i * self._word_bits > self.max_id:
+                    self._hint = i
+                    return None
+                words.append(0)
+            word = words[i]
+            bit = (~word & (word + 1)).bit_length() - 1  # lowest clear bit
+            stream_id = i * self._word_bits + bit
+            if stream_id > self.max_id:
+                self._hint = i
+                return None
+            words[i] = word | (1 << bit)
+            self._hint = i
+            self.in_flight += 1
+            return stream_id
+
+    def release(self, stream_id):
+        """
+        Frees `stream_id` for reuse. IDs that are not in use are ignored.
+        """
+        i, bit = divmod(stream_id, self._word_bits)
+        mask = 1 << bit
+        with self._lock:
+            words = self._words
+            if i < len(words) and words[i] & mask:
+                words[i] &= ~mask
+                self.in_flight -= 1
+                if i < self._hint:
+                    self._hint = i
+
 
 NONBLOCKING = (errno.EAGAIN, errno.EWOULDBLOCK)
 
+# stay under IOV_MAX (1024 on Linux and BSD) when gathering buffers for sendmsg
+MAX_WRITE_BUFFERS = 1024
+
+
+def pop_write_buffers(queue, max_size):
+    """
+    Pops buffers from the front of the deque `queue` to be written with a single
+    send, stopping once `max_size` bytes or :data:`MAX_WRITE_BUFFERS` buffers are
+    taken. Returns ``(buffers, size)``; raises :exc:`IndexError` if `queue` is empty.
+    """
+    buf = queue.popleft()
+    buffers = [buf]
+    size = len(buf)
+    while queue and size < max_size and len(buffers) < MAX_WRITE_BUFFERS:
+        buf = queue.popleft()
+        buffers.append(buf)
+        size += len(buf)
+    return buffers, size
+
+
+def requeue_unsent(queue, buffers, sent):
+    """
+    Puts whatever was not sent of `buffers` back on the front of the deque `queue`,
+    after a write that sent only `sent` bytes.
+    """
+    for i, buf in enumerate(buffers):
+        if sent < len(buf):
+            break
+        sent -= len(buf)
+    unsent = buffers[i:]
+    unsent[0] = unsent[0][sent:]
+    queue.extendleft(reversed(unsent))
+
 
 class ConnectionException(Exception):
     """
@@ -202,6 +395,10 @@ class Connection(object):
     in_buffer_size = 4096
     out_buffer_size = 4096
 
+    # Reactors that coalesce writes gather queued frames into a single send of
+    # up to about this many bytes.
+    max_write_size = 64 * 1024
+
     cql_version = None
     protocol_version = ProtocolVersion.MAX_SUPPORTED
 
@@ -213,25 +410,12 @@ class Connection(object):
     ssl_options = None
     last_error = None
 
-    # The current number of operations that are in flight. More precisely,
-    # the number of request IDs that are currently in use.
-    in_flight = 0
-
     # Max concurrent requests allowed per connection. This is set optimistically high, allowing
     # all request ids to be used in protocol version 3+. Normally concurrency would be controlled
     # at a higher level by the application or concurrent.execute_concurrent. This attribute
     # is for lower-level integrations that want some upper bound without reimplementing.
     max_in_flight = 2 ** 15
 
-    # A set of available request IDs.  When using the v3 protocol or higher,
-    # this will not initially include all request IDs in order to save memory,
-    # but the set will grow if it is exhausted.
-    request_ids = None
-
-    # Tracks the highest used request ID in order to help with growing the
-    # request_ids set
-    highest_request_id = 0
-
     is_defunct = False
     is_closed = False
     lock = None
@@ -274,7 +458,7 @@ class Connection(object):
         self.allow_beta_protocol_version = allow_beta_protocol_version
         self._push_watchers = defaultdict(set)
         self._requests = {}
-        self._iobuf = io.BytesIO()
+        self._iobuf = _ReceiveBuffer(self.in_buffer_size)
 
         if ssl_options:
             self._check_hostname = bool(self.ssl_options.pop('check_hostname', False))
@@ -285,15 +469,9 @@ class Connection(object):
 
         if protocol_version >= 3:
             self.max_request_id = min(self.max_in_flight - 1, (2 ** 15) - 1)
-            # Don't fill the deque with 2**15 items right away. Start with some and add
-            # more if needed.
-            initial_size = min(300, self.max_in_flight)
-            self.request_ids = deque(range(initial_size))
-            self.highest_request_id = initial_size - 1
         else:
             self.max_request_id = min(self.max_in_flight, (2 ** 7) - 1)
-            self.request_ids = deque(range(self.max_request_id + 1))
-            self.highest_request_id = self.max_request_id
+        self._stream_ids = _StreamIdAllocator(self.max_request_id)
 
         self.lock = RLock()
         self.connected_event = Event()
@@ -372,6 +550,20 @@ class Connection(object):
             for args in self.sockopts:
                 self._socket.setsockopt(*args)
 
+    def _send_buffers(self, sock, buffers, send=None):
+        """
+        Writes `buffers` to `sock` with one call and returns the number of bytes sent.
+        Multiple buffers go out in a single ``sendmsg`` where the socket supports it
+        (not under SSL or Python 2), and are otherwise joined for one ``send``.
+        `send` replaces ``sock.send`` for single buffers and joined writes.
+        """
+        send = send or sock.send
+        if len(buffers) == 1:
+            return send(buffers[0])
+        if not self.ssl_options and hasattr(sock, 'sendmsg'):
+            return sock.sendmsg(buffers)
+        return send(b''.join(buffers))
+
     def close(self):
         raise NotImplementedError()
 
@@ -435,18 +627,21 @@ class Connection(object):
             t.daemon = True
             t.start()
 
-    def get_request_id(self):
+    @property
+    def in_flight(self):
         """
-        This must be called while self.lock is held.
+        The current number of operations that are in flight. More precisely,
+        the number of request IDs that are currently in use.
         """
-        try:
-            return self.request_ids.popleft()
-        except IndexError:
-            new_request_id = self.highest_request_id + 1
-            # in_flight checks should guarantee this
-            assert new_request_id <= self.max_request_id
-            self.highest_request_id = new_request_id
-            return self.highest_request_id
+        return self._stream_ids.in_flight
+
+    def get_request_id(self, max_in_flight=None):
+        """
+        Takes a free request ID, counting it in :attr:`.in_flight` until its response
+        is processed. Returns :const:`None` if every request ID is in use, or if
+        `max_in_flight` requests are already in flight.
+        """
+        return self._stream_ids.allocate(max_in_flight)
 
     def handle_pushed(self, response):
         log.debug("Message pushed from server: %r", response)
@@ -465,7 +660,13 @@ class Connection(object):
         # queue the decoder function with the request
         # this allows us to inject custom functions per request to encode, decode messages
         self._requests[request_id] = (cb, decoder, result_metadata)
-        msg = encoder(msg, request_id, self.protocol_version, compressor=self.compressor, allow_beta_protocol_version=self.allow_beta_protocol_version)
+        try:
+            msg = encoder(msg, request_id, self.protocol_version, compressor=self.compressor, allow_beta_protocol_version=self.allow_beta_protocol_version)
+        except Exception:
+            # nothing was sent, so no response will free the request ID
+            del self._requests[request_id]
+            self._stream_ids.release(request_id)
+            raise
         self.push(msg)
         return len(msg)
 
@@ -491,10 +692,13 @@ class Connection(object):
         messages_sent = 0
         while True:
             needed = len(msgs) - messages_sent
-            with self.lock:
-                available = min(needed, self.max_request_id - self.in_flight + 1)
-                request_ids = [self.get_request_id() for _ in range(available)]
-                self.in_flight += available
+            request_ids = []
+            while len(request_ids) < needed:
+                request_id = self.get_request_id()
+                if request_id is None:
+                    break
+                request_ids.append(request_id)
+            available = len(request_ids)
 
             for i, request_id in enumerate(request_ids):
                 self.send_msg(msgs[messages_sent + i],
@@ -544,44 +748,47 @@ class Connection(object):
 
     @defunct_on_error
     def _read_frame_header(self):
-        buf = self._iobuf.getvalue()
-        pos = len(buf)
+        buf = self._iobuf
+        pos = buf.tell()
         if pos:
-            version = int_from_buf_item(buf[0]) & PROTOCOL_VERSION_MASK
+            version = buf.byte_at(0) & PROTOCOL_VERSION_MASK
             if version > ProtocolVersion.MAX_SUPPORTED:
                 raise ProtocolError("This version of the driver does not support protocol version %d" % version)
             frame_header = frame_header_v3 if version >= 3 else frame_header_v1_v2
             # this frame header struct is everything after the version byte
             header_size = frame_header.size + 1
             if pos >= header_size:
-                flags, stream, op, body_len = frame_header.unpack_from(buf, 1)
+                flags, stream, op, body_len = buf.unpack_from(frame_header, 1)
                 if body_len < 0:
                     raise ProtocolError("Received negative body length: %r" % body_len)
                 self._current_frame = _Frame(version, flags, stream, op, header_size, body_len + header_size)
         return pos
 
     def _reset_frame(self):
-        self._iobuf = io.BytesIO(self._iobuf.read())
-        self._iobuf.seek(0, 2)  # io.SEEK_END == 2 (constant not present in 2.6)
+        self._iobuf.consume(self._current_frame.end_pos)
         self._current_frame = None
 
     def process_io_buffer(self):
         while True:
             if not self._current_frame:
                 pos = self._read_frame_header()
+                if not self._current_frame:
+                    # we don't have a complete header yet
+                    return
+                if pos < self._current_frame.end_pos:
+                    # make room for the rest of the frame and the read that completes it
+                    # up front, so the partial frame is not moved while it is received
+                    self._iobuf.reserve(self._current_frame.end_pos - pos + self.in_buffer_size)
             else:
                 pos = self._iobuf.tell()
 
-            if not self._current_frame or pos < self._current_frame.end_pos:
-                # we don't have a complete header yet or we
-                # already saw a header, but we don't have a
-                # complete message yet
+            if pos < self._current_frame.end_pos:
+                # we already saw a header, but we don't have a complete message yet
                 return
             else:
                 frame = self._current_frame
-                self._iobuf.seek(frame.body_offset)
-                msg = self._iobuf.read(frame.end_pos - frame.body_offset)
-                self.process_msg(frame, msg)
+                # the body is a view into the receive buffer, valid until the frame is reset
+                self.process_msg(frame, self._iobuf.view(frame.body_offset, frame.end_pos))
                 self._reset_frame()
 
     @defunct_on_error
@@ -593,8 +800,7 @@ class Connection(object):
             result_metadata = None
         else:
             callback, decoder, result_metadata = self._requests.pop(stream_id)
-            with self.lock:
-                self.request_ids.append(stream_id)
+            self._stream_ids.release(stream_id)
 
         self.msg_received = True
 
@@ -817,29 +1023,7 @@ class Connection(object):
         When the operation completes, `callback` will be called with
         two arguments: this connection and an Exception if an error
         occurred, otherwise :const:`None`.
-
-        This method will always increment :attr:`.in_flight` attribute, even if
-        it doesn't need to make a request, just to maintain an
-        ":attr:`.in_flight` is incremented" invariant.
         """
-        # Here we increment in_flight unconditionally, whether we need to issue
-        # a request or not. This is bad, but allows callers -- specifically
-        # _set_keyspace_for_all_conns -- to assume that we increment
-        # self.in_flight during this call. This allows the passed callback to
-        # safely call HostConnection{Pool,}.return_connection on this
-        # Connection.
-        #
-        # We use a busy wait on the lock here because:
-        # - we'll only spin if the connection is at max capacity, which is very
-        #   unlikely for a set_keyspace call
-        # - it allows us to avoid signaling a condition every time a request completes
-        while True:
-            with self.lock:
-                if self.in_flight < self.max_request_id:
-                    self.in_flight += 1
-                    break
-            time.sleep(0.001)
-
         if not keyspace or keyspace == self.keyspace:
             callback(self, None)
             return
@@ -857,9 +1041,15 @@ class Connection(object):
                 callback(self, self.defunct(ConnectionException(
                     "Problem while setting keyspace: %r" % (result,), self.host)))
 
-        # We've incremented self.in_flight above, so we "have permission" to
-        # acquire a new request id
-        request_id = self.get_request_id()
+        # We use a busy wait for a request id here because:
+        # - we'll only spin if the connection is at max capacity, which is very
+        #   unlikely for a set_keyspace call
+        # - it allows us to avoid signaling a condition every time a request completes
+        while True:
+            request_id = self.get_request_id(self.max_request_id)
+            if request_id is not None:
+                break
+            time.sleep(0.001)
 
         self.send_msg(query, request_id, process_result)
 
@@ -892,8 +1082,6 @@ class ResponseWaiter(object):
         self.event = Event()
 
     def got_response(self, response, index):
-        with self.connection.lock:
-            self.connection.in_flight -= 1
         if isinstance(response, Exception):
             if hasattr(response, 'to_exception'):
                 response = response.to_exception()
@@ -939,13 +1127,12 @@ class HeartbeatFuture(object):
         self.owner = owner
         log.debug("Sending options message heartbeat on idle connection (%s) %s",
                   id(connection), connection.host)
-        with connection.lock:
-            if connection.in_flight <= connection.max_request_id:
-                connection.in_flight += 1
-                connection.send_msg(OptionsMessage(), connection.get_request_id(), self._options_callback)
-            else:
-                self._exception = Exception("Failed to send heartbeat because connection 'in_flight' exceeds threshold")
-                self._event.set()
+        request_id = connection.get_request_id()
+        if request_id is not None:
+            connection.send_msg(OptionsMessage(), request_id, self._options_callback)
+        else:
+            self._exception = Exception("Failed to send heartbeat because connection 'in_flight' exceeds threshold")
+            self._event.set()
 
     def wait(self, timeout):
         self._event.wait(timeout)
@@ -1018,9 +1205,6 @@ class ConnectionHeartbeat(Thread):
                     connection = f.connection
                     try:
                         f.wait(timeout)
-                        # TODO: move this, along with connection locks in pool, down into Connection
-                        with connection.lock:
-                            connection.in_flight -= 1
                         connection.reset_idle()
                     except Exception as e:
                         log.warning("Heartbeat failed for connection (%s) to %s",
@@ -1057,6 +1241,10 @@ class Timer(object):
 
     canceled = False
 
+    _manager = None
+    _slot = None
+    _level = None
+
     def __init__(self, timeout, callback):
         self.end = time.time() + timeout
         self.callback = callback
@@ -1066,6 +1254,8 @@ class Timer(object):
 
     def cancel(self):
         self.canceled = True
+        if self._manager:
+            self._manager.cancel_timer(self)
 
     def finish(self, time_now):
         if self.canceled:
@@ -1079,16 +1269,46 @@ class Timer(object):
 
 
 class TimerManager(object):
+    """
+    A hierarchical timing wheel of :class:`.Timer` objects.
+
+    Timers are hashed by the tick (:attr:`resolution` seconds) at which they
+    expire into wheels of 256 slots, each level spanning 256 times the level below.
+    Adding and cancelling a timer are O(1), and timers only move down a level as
+    their expiry approaches. A timer fires at most one tick after its end time.
+
+    :meth:`add_timer` and :meth:`cancel_timer` may be called from any thread; the
+    wheels are only changed by :meth:`service_timeouts` on the event thread.
+    """
+
+    resolution = 0.01
+    """ Seconds per tick of the lowest wheel """
+
+    _bits = 8
+    _levels = 4
+    _mask = (1 << _bits) - 1
+    _max_delta = (1 << (_bits * _levels)) - 1
 
     def __init__(self):
-        self._queue = []
         self._new_timers = []
+        self._canceled_timers = []
+        self._wheels = [[set() for _ in range(1 << self._bits)] for _ in range(self._levels)]
+        self._level_counts = [0] * self._levels
+        self._tick = self._tick_at(time.time())  # the last tick serviced
 
     def add_timer(self, timer):
         """
         called from client thread with a Timer object
         """
-        self._new_timers.append((timer.end, timer))
+        timer._manager = self
+        self._new_timers.append(timer)
+
+    def cancel_timer(self, timer):
+        """
+        called from client thread when a Timer is canceled, so that
+        it is dropped from the wheel rather than held until it expires
+        """
+        self._canceled_timers.append(timer)
 
     def service_timeouts(self):
         """
@@ -1096,27 +1316,124 @@ class TimerManager(object):
         Called from the event thread
         :return: next end time, or None
         """
-        queue = self._queue
-        if self._new_timers:
-            new_timers = self._new_timers
-            while new_timers:
-                heappush(queue, new_timers.pop())
-
-        if queue:
-            now = time.time()
-            while queue:
-                try:
-                    timer = queue[0][1]
-                    if timer.finish(now):
-                        heappop(queue)
-                    else:
-                        return timer.end
-                except Exception:
-                    log.exception("Exception while servicing timeout callback: ")
+        now = time.time()
+        resolution = self.resolution
+        insert = self._insert
+        new_timers = self._new_timers
+        while new_timers:
+            timer = new_timers.pop()
+            if timer.end <= now:
+                self._fire(timer, now)
+            elif not timer.canceled:
+                insert(timer, int(math.ceil(timer.end / resolution)))
+
+        canceled_timers = self._canceled_timers
+        remove = self._remove
+        while canceled_timers:
+            remove(canceled_timers.pop())
+
+        self._advance(self._tick_at(now), now)
+        return self.next_timeout
 
     @property
     def next_timeout(self):
+        """
+        The time at which :meth:`service_timeouts` next has timers to
+        fire or move down a level, or None if the wheels are empty
+        """
+        bits = self._bits
+        for level, count in enumerate(self._level_counts):
+            if not count:
+                continue
+            if level == 0:
+                mask = self._mask
+                wheel = self._wheels[0]
+                tick = self._tick + 1
+                while not wheel[tick & mask] and tick <= self._tick + mask:
+                    tick += 1
+            else:
+                tick = (self._tick | ((1 << (bits * level)) - 1)) + 1
+            return tick * self.resolution
+
+    def _tick_at(self, now):
+        tick = int(now / self.resolution)
+        # agree with the tick times reported by next_timeout despite float rounding
+        if (tick + 1) * self.resolution <= now:
+            tick += 1
+        return tick
+
+    def _insert(self, timer, expiry):
+        delta = expiry - self._tick
+        if delta <= self._mask:
+            level = 0
+            slot = self._wheels[0][expiry & self._mask]
+        else:
+            bits = self._bits
+            level = (delta.bit_length() - 1) // bits
+            if delta > self._max_delta:
+                # beyond the top wheel; it is re-hashed from its real end time when it comes around
+                level = self._levels - 1
+                expiry = self._tick + self._max_delta
+            slot = self._wheels[level][(expiry >> (bits * level)) & self._mask]
+        slot.add(timer)
+        timer._slot = slot
+        timer._level = level
+        self._level_counts[level] += 1
+
+    def _remove(self, timer):
+        slot = timer._slot
+        if slot is not None:
+            timer._slot = None
+            slot.discard(timer)
+            self._level_counts[timer._level] -= 1
+
+    def _take(self, level, index):
+        wheel = self._wheels[level]
+        slot = wheel[index]
+        wheel[index] = set()
+        self._level_counts[level] -= len(slot)
+        return slot
+
+    def _fire(self, timer, now):
+        timer._slot = None
         try:
-            return self._queue[0][0]
-        except IndexError:
-            pass
+            if not timer.finish(now):
+                self._insert(timer, self._tick + 1)
+        except Exception:
+            log.exception("Exception while servicing timeout callback: ")
+
+    def _advance(self, target, now):
+        bits = self._bits
+        mask = self._mask
+        counts = self._level_counts
+        while self._tick < target:
+            for lowest, count in enumerate(counts):
+                if count:
+                    break
+            else:
+                self._tick = target
+                return
+
+            if lowest:
+                # nothing can fire before the next boundary of the lowest occupied level
+                last_idle = self._tick | ((1 << (bits * lowest)) - 1)
+                if last_idle >= target:
+                    self._tick = target
+                    return
+                self._tick = last_idle
+
+            self._tick = tick = self._tick + 1
+
+            # move timers down from higher wheels that have come around
+            for level in range(1, self._levels):
+                if tick & ((1 << (bits * level)) - 1):
+                    break
+                index = (tick >> (bits * level)) & mask
+                if self._wheels[level][index]:
+                    for timer in self._take(level, index):
+                        self._insert(timer, int(math.ceil(timer.end / self.resolution)))
+
+            index = tick & mask
+            if self._wheels[0][index]:
+                for timer in self._take(0, index):
+                    self._fire(timer, now)
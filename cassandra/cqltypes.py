@@ -1050,6 +1050,67 @@ class FrozenType(_ParameterizedType):
         return subtype.to_binary(val, protocol_version)
 
 
+class _RawDateType(DateType):
+    """ Decodes timestamps as integer milliseconds since the epoch """
+
+    @staticmethod
+    def deserialize(byts, protocol_version):
+        return int64_unpack(byts)
+
+
+class _RawUUIDType(UUIDType):
+    """ Decodes uuids as their 16 bytes """
+
+    @staticmethod
+    def deserialize(byts, protocol_version):
+        return byts
+
+
+class _RawTimeUUIDType(TimeUUIDType):
+    """ Decodes timeuuids as their 16 bytes """
+
+    @staticmethod
+    def deserialize(byts, protocol_version):
+        return byts
+
+
+class _RawInetAddressType(InetAddressType):
+    """ Decodes inet addresses as their packed 4 or 16 bytes """
+
+    @staticmethod
+    def deserialize(byts, protocol_version):
+        return byts
+
+
+class _MemoryviewBytesType(BytesType):
+    """ Decodes blobs as read-only memoryviews """
+
+    @staticmethod
+    def deserialize(byts, protocol_version):
+        return memoryview(byts)
+
+
+raw_scalar_types = {
+    DateType: _RawDateType,
+    TimestampType: _RawDateType,
+    UUIDType: _RawUUIDType,
+    TimeUUIDType: _RawTimeUUIDType,
+    InetAddressType: _RawInetAddressType,
+}
+"""
+Maps the result column types that are costly to decode into Python objects to
+types decoding them as plain integers or bytes. See
+:func:`cassandra.protocol.raw_scalar_protocol_handler`.
+"""
+
+
+blob_memoryview_types = {BytesType: _MemoryviewBytesType}
+"""
+Maps blob result columns to a type decoding them as memoryviews. See
+:func:`cassandra.protocol.blob_memoryview_protocol_handler`.
+"""
+
+
 def is_counter_type(t):
     if isinstance(t, six.string_types):
         t = lookup_casstype(t)
@@ -147,6 +147,55 @@ cdef class TimestampType(DesDateType):
     pass
 
 
+cdef class Des_RawDateType(Deserializer):
+    cdef deserialize(self, Buffer *buf, int protocol_version):
+        return unpack_num[int64_t](buf)
+
+
+cdef class Des_RawUUIDType(Deserializer):
+    cdef deserialize(self, Buffer *buf, int protocol_version):
+        return to_bytes(buf)
+
+
+cdef class Des_RawTimeUUIDType(Des_RawUUIDType):
+    pass
+
+
+cdef class Des_RawInetAddressType(Des_RawUUIDType):
+    pass
+
+
+cdef class Des_MemoryviewBytesType(Deserializer):
+    """
+    Slices read-only memoryviews out of the page being decoded, which must
+    first be given to attach_page()
+    """
+
+    cdef object page
+    cdef char *page_ptr
+
+    cdef deserialize(self, Buffer *buf, int protocol_version):
+        if buf.size == 0:
+            # the pointer of empty values is NULL rather than into the page
+            return self.page[:0]
+        cdef Py_ssize_t start = buf.ptr - self.page_ptr
+        return self.page[start:start + buf.size]
+
+
+def attach_page(deserializers, bytes page):
+    """
+    Let deserializers returning views over the data decode from `page`
+    """
+    cdef Deserializer[::1] arr = deserializers
+    cdef Des_MemoryviewBytesType deserializer
+    cdef Py_ssize_t i
+    for i in range(arr.shape[0]):
+        if isinstance(arr[i], Des_MemoryviewBytesType):
+            deserializer = arr[i]
+            deserializer.page = memoryview(page)
+            deserializer.page_ptr = page
+
+
 cdef class TimeUUIDType(DesDateType):
     cdef deserialize(self, Buffer *buf, int protocol_version):
         return UUID(bytes=to_bytes(buf))
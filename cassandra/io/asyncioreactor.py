@@ -0,0 +1,306 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Module that implements an event loop based on the standard library
+``asyncio`` module (Python 3.4+).
+"""
+import asyncio
+import atexit
+from functools import partial
+import logging
+import os
+from threading import Lock, Thread, get_ident
+import time
+import weakref
+
+try:
+    import ssl
+except ImportError:
+    ssl = None  # NOQA
+
+from cassandra.connection import Connection, ConnectionShutdown, Timer
+
+
+log = logging.getLogger(__name__)
+
+
+def _cleanup(loop_weakref):
+    try:
+        loop = loop_weakref()
+    except ReferenceError:
+        return
+    loop._cleanup()
+
+
+if hasattr(asyncio, 'get_running_loop'):
+    def _running_loop():
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+else:
+    # Python 3.5.3+
+    _running_loop = getattr(asyncio.events, '_get_running_loop', None)
+
+# thread idents of the loops run by AsyncioLoop, where the running loop cannot be asked for
+_loop_thread_idents = weakref.WeakKeyDictionary()
+
+
+def in_loop_thread(loop):
+    """
+    Returns whether this is the thread running `loop`.
+    """
+    # the loop set as current for this thread may be run by another thread
+    if _running_loop is not None:
+        return _running_loop() is loop
+    return loop.is_running() and _loop_thread_idents.get(loop) == get_ident()
+
+
+def call_in_loop(loop, fn, *args):
+    """
+    Runs `fn` immediately if called from the thread running `loop`, otherwise
+    schedules it on that loop in a thread-safe manner.
+    """
+    if in_loop_thread(loop):
+        fn(*args)
+    else:
+        loop.call_soon_threadsafe(fn, *args)
+
+
+class AsyncioTimer(Timer):
+    """
+    A :class:`.Timer` scheduled directly on the ``asyncio`` loop with
+    ``call_later``, rather than serviced from a :class:`.TimerManager`.
+    """
+
+    _handle = None
+
+    def __init__(self, timeout, callback, loop):
+        Timer.__init__(self, timeout, callback)
+        self._loop = loop
+        call_in_loop(loop, self._schedule)
+
+    def _schedule(self):
+        if not self.canceled:
+            self._handle = self._loop.call_later(max(self.end - time.time(), 0), self._fire)
+
+    def _fire(self):
+        self._handle = None
+        if not self.canceled:
+            try:
+                self.callback()
+            except Exception:
+                log.exception("Exception while servicing timeout callback: ")
+
+    def cancel(self):
+        self.canceled = True
+        if self._handle:
+            call_in_loop(self._loop, self._handle.cancel)
+
+
+class AsyncioLoop(object):
+    """
+    Owns the ``asyncio`` event loop used by :class:`.AsyncioConnection`.
+
+    The loop is either supplied by the application, which remains responsible
+    for running it, or created here and run in a daemon thread.
+    """
+
+    def __init__(self, loop=None):
+        self._pid = os.getpid()
+        self._lock = Lock()
+        self._thread = None
+        self._thread_recorded = False
+        self._owns_loop = loop is None
+        self.loop = loop or asyncio.new_event_loop()
+
+        if self._owns_loop:
+            atexit.register(partial(_cleanup, weakref.ref(self)))
+
+    def maybe_start(self):
+        if not self._owns_loop:
+            with self._lock:
+                if not self._thread_recorded:
+                    # learn which thread the application runs its loop in
+                    self._thread_recorded = True
+                    self.loop.call_soon_threadsafe(self._record_thread)
+            return
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._run_loop, name="cassandra_driver_event_loop")
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _record_thread(self):
+        _loop_thread_idents[self.loop] = get_ident()
+
+    def _run_loop(self):
+        log.debug("Starting asyncio event loop")
+        asyncio.set_event_loop(self.loop)
+        self._record_thread()
+        self.loop.run_forever()
+        log.debug("Asyncio event loop ended")
+
+    def _cleanup(self):
+        if not self._thread:
+            return
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        log.debug("Waiting for event loop thread to join...")
+        self._thread.join(timeout=1.0)
+        if self._thread.is_alive():
+            log.warning(
+                "Event loop thread could not be joined, so shutdown may not be clean. "
+                "Please call Cluster.shutdown() to avoid this.")
+
+        log.debug("Event loop thread was joined")
+
+
+class _AsyncioProtocol(asyncio.Protocol):
+    """
+    ``asyncio`` protocol feeding received data to an :class:`.AsyncioConnection`.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def data_received(self, data):
+        self.connection._iobuf.write(data)
+        self.connection.process_io_buffer()
+
+    def connection_lost(self, exc):
+        conn = self.connection
+        if exc is not None:
+            conn.defunct(exc)
+        elif not conn.is_closed:
+            log.debug("Connection %s closed by server", conn)
+            conn.close()
+
+
+class AsyncioConnection(Connection):
+    """
+    An implementation of :class:`.Connection` that uses the ``asyncio``
+    module in the Python standard library for its event loop.
+
+    By default, the driver creates a private event loop and runs it in a
+    daemon thread. To run request I/O on an application's own event loop,
+    initialize the reactor with that loop before connecting::
+
+        from cassandra.io.asyncioreactor import AsyncioConnection
+
+        AsyncioConnection.initialize_reactor(loop=asyncio.get_event_loop())
+        cluster = Cluster(connection_class=AsyncioConnection)
+
+    In that case responses are processed and callbacks are executed on the
+    application loop, so :meth:`.Session.execute_aio` results are delivered
+    without leaving the loop. Because connections are established
+    synchronously, blocking calls such as :meth:`.Cluster.connect` and
+    :meth:`.Session.prepare` must not be made from the loop thread; run them
+    in an executor instead::
+
+        session = await loop.run_in_executor(None, cluster.connect)
+
+    .. versionadded:: 3.12.0
+    """
+
+    _reactor = None
+    _transport = None
+
+    @classmethod
+    def initialize_reactor(cls, loop=None):
+        if cls._reactor:
+            if cls._reactor._pid != os.getpid():
+                log.debug("Detected fork, clearing and reinitializing reactor state")
+                cls.handle_fork()
+            elif loop is None or loop is cls._reactor.loop:
+                return
+            else:
+                raise ValueError("The asyncio reactor is already initialized with a different event loop")
+
+        cls._reactor = AsyncioLoop(loop)
+
+    @classmethod
+    def handle_fork(cls):
+        if cls._reactor:
+            cls._reactor._cleanup()
+            cls._reactor = None
+
+    @classmethod
+    def create_timer(cls, timeout, callback):
+        return AsyncioTimer(timeout, callback, cls._reactor.loop)
+
+    def __init__(self, *args, **kwargs):
+        Connection.__init__(self, *args, **kwargs)
+
+        self._loop = self._reactor.loop
+        if in_loop_thread(self._loop):
+            raise RuntimeError("AsyncioConnection cannot be created from its own event loop thread; "
+                               "connect from an executor instead")
+        self._reactor.maybe_start()
+
+        # asyncio performs its own TLS handshake on the raw socket
+        ssl_context = self._make_ssl_context()
+        self.ssl_options = None
+        self._check_hostname = False
+        self._connect_socket()
+        self._socket.setblocking(False)
+
+        connect = self._loop.create_connection(partial(_AsyncioProtocol, self),
+                                               sock=self._socket, ssl=ssl_context,
+                                               server_hostname=self.host if ssl_context else None)
+        self._transport, _ = asyncio.run_coroutine_threadsafe(connect, self._loop).result(self.connect_timeout)
+
+        self._send_options_message()
+
+    def _make_ssl_context(self):
+        if not self.ssl_options:
+            return None
+        if not ssl:
+            raise RuntimeError("This version of Python was not compiled with SSL support")
+
+        opts = self.ssl_options
+        context = ssl.SSLContext(opts.get('ssl_version', ssl.PROTOCOL_SSLv23))
+        if opts.get('ca_certs'):
+            context.load_verify_locations(opts['ca_certs'])
+        if opts.get('certfile'):
+            context.load_cert_chain(opts['certfile'], opts.get('keyfile'))
+        if opts.get('ciphers'):
+            context.set_ciphers(opts['ciphers'])
+        context.check_hostname = self._check_hostname
+        context.verify_mode = opts.get('cert_reqs', ssl.CERT_REQUIRED if self._check_hostname else ssl.CERT_NONE)
+        return context
+
+    def close(self):
+        with self.lock:
+            if self.is_closed:
+                return
+            self.is_closed = True
+
+        log.debug("Closing connection (%s) to %s", id(self), self.host)
+        if self._transport:
+            call_in_loop(self._loop, self._transport.close)
+        elif self._socket:
+            self._socket.close()
+        log.debug("Closed socket to %s", self.host)
+
+        if not self.is_defunct:
+            self.error_all_requests(
+                ConnectionShutdown("Connection to %s was closed" % self.host))
+            # don't leave in-progress operations hanging
+            self.connected_event.set()
+
+    def push(self, data):
+        # the transport buffers and chunks writes itself; no need to split here
+        call_in_loop(self._loop, self._transport.write, data)
@@ -14,6 +14,7 @@
 import atexit
 from collections import deque
 from functools import partial
+import itertools
 import logging
 import os
 import socket
@@ -36,11 +37,11 @@ try:
 except ImportError:
     ssl = None  # NOQA
 
-from cassandra.connection import Connection, ConnectionShutdown, NONBLOCKING, Timer, TimerManager
+from cassandra.connection import (Connection, ConnectionShutdown, NONBLOCKING, Timer, TimerManager,
+                                  pop_write_buffers, requeue_unsent)
 
 log = logging.getLogger(__name__)
 
-_dispatcher_map = {}
 
 def _cleanup(loop_weakref):
     try:
@@ -71,8 +72,8 @@ class _PipeWrapper(object):
 
 class _AsyncoreDispatcher(asyncore.dispatcher):
 
-    def __init__(self, socket):
-        asyncore.dispatcher.__init__(self, map=_dispatcher_map)
+    def __init__(self, socket, map):
+        asyncore.dispatcher.__init__(self, map=map)
         # inject after to avoid base class validation
         self.set_socket(socket)
         self._notified = False
@@ -88,14 +89,14 @@ class _AsyncoreDispatcher(asyncore.dispatcher):
         assert not self._notified
 
     def loop(self, timeout):
-        asyncore.loop(timeout=timeout, use_poll=True, map=_dispatcher_map, count=1)
+        asyncore.loop(timeout=timeout, use_poll=True, map=self._map, count=1)
 
 
 class _AsyncorePipeDispatcher(_AsyncoreDispatcher):
 
-    def __init__(self):
+    def __init__(self, map):
         self.read_fd, self.write_fd = os.pipe()
-        _AsyncoreDispatcher.__init__(self, _PipeWrapper(self.read_fd))
+        _AsyncoreDispatcher.__init__(self, _PipeWrapper(self.read_fd), map)
 
     def writable(self):
         return False
@@ -126,11 +127,11 @@ class _AsyncoreUDPDispatcher(_AsyncoreDispatcher):
     """
     bind_address = ('localhost', 10000)
 
-    def __init__(self):
+    def __init__(self, map):
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self._socket.bind(self.bind_address)
         self._socket.setblocking(0)
-        _AsyncoreDispatcher.__init__(self, self._socket)
+        _AsyncoreDispatcher.__init__(self, self._socket, map)
 
     def handle_read(self):
         try:
@@ -147,7 +148,7 @@ class _AsyncoreUDPDispatcher(_AsyncoreDispatcher):
             self._socket.sendto(b'', self.bind_address)
 
     def loop(self, timeout):
-        asyncore.loop(timeout=timeout, use_poll=False, map=_dispatcher_map, count=1)
+        asyncore.loop(timeout=timeout, use_poll=False, map=self._map, count=1)
 
 
 class _BusyWaitDispatcher(object):
@@ -158,14 +159,17 @@ class _BusyWaitDispatcher(object):
     if anything is writable.
     """
 
+    def __init__(self, map):
+        self._map = map
+
     def notify_loop(self):
         pass
 
     def loop(self, timeout):
-        if not _dispatcher_map:
+        if not self._map:
             time.sleep(0.005)
         count = timeout // self.max_write_latency
-        asyncore.loop(timeout=self.max_write_latency, use_poll=True, map=_dispatcher_map, count=count)
+        asyncore.loop(timeout=self.max_write_latency, use_poll=True, map=self._map, count=count)
 
     def validate(self):
         pass
@@ -190,14 +194,17 @@ class AsyncoreLoop(object):
 
         self._timers = TimerManager()
 
+        # each loop polls only the dispatchers in its own map
+        self._dispatcher_map = {}
+
         try:
-            dispatcher = self._loop_dispatch_class()
+            dispatcher = self._loop_dispatch_class(self._dispatcher_map)
             dispatcher.validate()
             log.debug("Validated loop dispatch with %s", self._loop_dispatch_class)
         except Exception:
             log.exception("Failed validating loop dispatch with %s. Using busy wait execution instead.", self._loop_dispatch_class)
             dispatcher.close()
-            dispatcher = _BusyWaitDispatcher()
+            dispatcher = _BusyWaitDispatcher(self._dispatcher_map)
         self._loop_dispatcher = dispatcher
 
         atexit.register(partial(_cleanup, weakref.ref(self)))
@@ -240,8 +247,6 @@ class AsyncoreLoop(object):
         self._timers.add_timer(timer)
 
     def _cleanup(self):
-        global _dispatcher_map
-
         self._shutdown = True
         if not self._thread:
             return
@@ -256,7 +261,7 @@ class AsyncoreLoop(object):
         log.debug("Event loop thread was joined")
 
         # Ensure all connections are closed and  in-flight requests cancelled
-        for conn in tuple(_dispatcher_map.values()):
+        for conn in tuple(self._dispatcher_map.values()):
             conn.close()
 
         log.debug("Dispatchers were closed")
@@ -268,7 +273,25 @@ class AsyncoreConnection(Connection, asyncore.dispatcher):
     module in the Python standard library for its event loop.
     """
 
-    _loop = None
+    event_loop_count = 1
+    """
+    The number of event loops, each with its own thread, that connections are
+    spread across. This must be set before the first :class:`.Cluster` connects.
+
+    .. versionadded:: 3.12.0
+    """
+
+    assign_loops_by_host = False
+    """
+    By default connections are assigned to loops round-robin. If this is set to
+    :const:`True`, all connections to a host share the same loop instead.
+
+    .. versionadded:: 3.12.0
+    """
+
+    _loop = None  # runs timers, and connections are assigned to it unless sharded
+    _loops = ()
+    _loop_counter = itertools.count()
 
     _writable = False
     _readable = False
@@ -276,26 +299,35 @@ class AsyncoreConnection(Connection, asyncore.dispatcher):
     @classmethod
     def initialize_reactor(cls):
         if not cls._loop:
-            cls._loop = AsyncoreLoop()
+            cls._create_loops()
         else:
             current_pid = os.getpid()
             if cls._loop._pid != current_pid:
                 log.debug("Detected fork, clearing and reinitializing reactor state")
                 cls.handle_fork()
-                cls._loop = AsyncoreLoop()
+                cls._create_loops()
+
+    @classmethod
+    def _create_loops(cls):
+        cls._loops = [AsyncoreLoop() for _ in range(max(cls.event_loop_count, 1))]
+        cls._loop = cls._loops[0]
+        cls._loop_counter = itertools.count()
 
     @classmethod
     def handle_fork(cls):
-        global _dispatcher_map
-        _dispatcher_map = {}
-        if cls._loop:
-            cls._loop._cleanup()
-            cls._loop = None
+        for loop in cls._loops:
+            # forget the parent's dispatchers rather than closing them from the child
+            loop._dispatcher_map.clear()
+            loop._cleanup()
+        cls._loops = ()
+        cls._loop = None
 
     @classmethod
     def create_timer(cls, timeout, callback):
         timer = Timer(timeout, callback)
         cls._loop.add_timer(timer)
+        # the timer loop may carry no connections when they are spread over several loops
+        cls._loop.maybe_start()
         return timer
 
     def __init__(self, *args, **kwargs):
@@ -304,8 +336,10 @@ class AsyncoreConnection(Connection, asyncore.dispatcher):
         self.deque = deque()
         self.deque_lock = Lock()
 
+        self._loop = self._assign_loop()
+
         self._connect_socket()
-        asyncore.dispatcher.__init__(self, self._socket, _dispatcher_map)
+        asyncore.dispatcher.__init__(self, self._socket, self._loop._dispatcher_map)
 
         self._writable = True
         self._readable = True
@@ -315,6 +349,14 @@ class AsyncoreConnection(Connection, asyncore.dispatcher):
         # start the event loop if needed
         self._loop.maybe_start()
 
+    def _assign_loop(self):
+        loops = self._loops
+        if len(loops) == 1:
+            return loops[0]
+        if self.assign_loops_by_host:
+            return loops[hash(self.host) % len(loops)]
+        return loops[next(self._loop_counter) % len(loops)]
+
     def close(self):
         with self.lock:
             if self.is_closed:
@@ -349,34 +391,37 @@ class AsyncoreConnection(Connection, asyncore.dispatcher):
         while True:
             with self.deque_lock:
                 try:
-                    next_msg = self.deque.popleft()
+                    buffers, size = pop_write_buffers(self.deque, self.max_write_size)
                 except IndexError:
                     self._writable = False
                     return
 
             try:
-                sent = self.send(next_msg)
+                sent = self._send_buffers(self.socket, buffers, self.send)
                 self._readable = True
             except socket.error as err:
                 if (err.args[0] in NONBLOCKING):
                     with self.deque_lock:
-                        self.deque.appendleft(next_msg)
+                        self.deque.extendleft(reversed(buffers))
                 else:
                     self.defunct(err)
                 return
             else:
-                if sent < len(next_msg):
+                if sent < size:
                     with self.deque_lock:
-                        self.deque.appendleft(next_msg[sent:])
+                        requeue_unsent(self.deque, buffers, sent)
                     if sent == 0:
                         return
 
     def handle_read(self):
+        closed = False
         try:
             while True:
-                buf = self.recv(self.in_buffer_size)
-                self._iobuf.write(buf)
-                if len(buf) < self.in_buffer_size:
+                received = self._iobuf.read_into(self.socket.recv_into, self.in_buffer_size)
+                if not received:
+                    closed = True
+                    break
+                if received < self.in_buffer_size:
                     break
         except socket.error as err:
             if ssl and isinstance(err, ssl.SSLError):
@@ -392,6 +437,10 @@ class AsyncoreConnection(Connection, asyncore.dispatcher):
             if not self._requests and not self.is_control_connection:
                 self._readable = False
 
+        if closed:
+            # after the frames received before the server closed the connection
+            self.handle_close()
+
     def push(self, data):
         sabs = self.out_buffer_size
         if len(data) > sabs:
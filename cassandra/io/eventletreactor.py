@@ -132,8 +132,7 @@ class EventletConnection(Connection):
     def handle_read(self):
         while True:
             try:
-                buf = self._socket.recv(self.in_buffer_size)
-                self._iobuf.write(buf)
+                received = self._iobuf.read_into(self._socket.recv_into, self.in_buffer_size)
             except socket.error as err:
                 log.debug("Exception during socket recv for %s: %s",
                           self, err)
@@ -142,7 +141,7 @@ class EventletConnection(Connection):
             except GreenletExit:  # graceful greenthread exit
                 return
 
-            if buf and self._iobuf.tell():
+            if received:
                 self.process_io_buffer()
             else:
                 log.debug("Connection %s closed by server", self)
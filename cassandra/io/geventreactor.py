@@ -108,8 +108,14 @@ class GeventConnection(Connection):
     def handle_write(self):
         while True:
             try:
-                next_msg = self._write_queue.get()
-                self._socket.sendall(next_msg)
+                buffers = [self._write_queue.get()]
+                size = len(buffers[0])
+                # gather whatever else is queued into the same send
+                while size < self.max_write_size and not self._write_queue.empty():
+                    next_msg = self._write_queue.get_nowait()
+                    buffers.append(next_msg)
+                    size += len(next_msg)
+                self._socket.sendall(b''.join(buffers) if len(buffers) > 1 else buffers[0])
             except socket.error as err:
                 log.debug("Exception in send for %s: %s", self, err)
                 self.defunct(err)
@@ -118,14 +124,13 @@ class GeventConnection(Connection):
     def handle_read(self):
         while True:
             try:
-                buf = self._socket.recv(self.in_buffer_size)
-                self._iobuf.write(buf)
+                received = self._iobuf.read_into(self._socket.recv_into, self.in_buffer_size)
             except socket.error as err:
                 log.debug("Exception in read for %s: %s", self, err)
                 self.defunct(err)
                 return  # leave the read loop
 
-            if buf and self._iobuf.tell():
+            if received:
                 self.process_io_buffer()
             else:
                 log.debug("Connection %s closed by server", self)
@@ -14,6 +14,7 @@
 import atexit
 from collections import deque
 from functools import partial
+import itertools
 import logging
 import os
 import socket
@@ -25,7 +26,8 @@ import weakref
 from six.moves import range
 
 from cassandra.connection import (Connection, ConnectionShutdown,
-                                  NONBLOCKING, Timer, TimerManager)
+                                  NONBLOCKING, Timer, TimerManager,
+                                  pop_write_buffers, requeue_unsent)
 try:
     import cassandra.io.libevwrapper as libev
 except ImportError:
@@ -105,11 +107,11 @@ class LibevLoop(object):
             self._loop.start()
             # there are still active watchers, no deadlock
             with self._lock:
-                if not self._shutdown and self._live_conns:
+                if not self._shutdown and (self._live_conns or self._has_timers()):
                     log.debug("Restarting event loop")
                     continue
                 else:
-                    # all Connections have been closed, no active watchers
+                    # all Connections have been closed and no timers are pending, no active watchers
                     log.debug("All Connections currently closed, event loop ended")
                     self._started = False
                     break
@@ -139,6 +141,11 @@ class LibevLoop(object):
         self._timers.add_timer(timer)
         self._notifier.send()  # wake up in case this timer is earlier
 
+    def _has_timers(self):
+        # timers added since the loop last ran are not in the wheels yet
+        timers = self._timers
+        return bool(timers._new_timers) or timers.next_timeout is not None
+
     def _update_timer(self):
         if not self._shutdown:
             next_end = self._timers.service_timeouts()
@@ -226,7 +233,25 @@ class LibevConnection(Connection):
     """
     An implementation of :class:`.Connection` that uses libev for its event loop.
     """
-    _libevloop = None
+    event_loop_count = 1
+    """
+    The number of event loops, each with its own thread, that connections are
+    spread across. This must be set before the first :class:`.Cluster` connects.
+
+    .. versionadded:: 3.12.0
+    """
+
+    assign_loops_by_host = False
+    """
+    By default connections are assigned to loops round-robin. If this is set to
+    :const:`True`, all connections to a host share the same loop instead.
+
+    .. versionadded:: 3.12.0
+    """
+
+    _libevloop = None  # runs timers, and connections are assigned to it unless sharded
+    _libevloops = ()
+    _loop_counter = itertools.count()
     _write_watcher_is_active = False
     _read_watcher = None
     _write_watcher = None
@@ -235,23 +260,32 @@ class LibevConnection(Connection):
     @classmethod
     def initialize_reactor(cls):
         if not cls._libevloop:
-            cls._libevloop = LibevLoop()
+            cls._create_loops()
         else:
             if cls._libevloop._pid != os.getpid():
                 log.debug("Detected fork, clearing and reinitializing reactor state")
                 cls.handle_fork()
-                cls._libevloop = LibevLoop()
+                cls._create_loops()
+
+    @classmethod
+    def _create_loops(cls):
+        cls._libevloops = [LibevLoop() for _ in range(max(cls.event_loop_count, 1))]
+        cls._libevloop = cls._libevloops[0]
+        cls._loop_counter = itertools.count()
 
     @classmethod
     def handle_fork(cls):
-        if cls._libevloop:
-            cls._libevloop._cleanup()
-            cls._libevloop = None
+        for loop in cls._libevloops:
+            loop._cleanup()
+        cls._libevloops = ()
+        cls._libevloop = None
 
     @classmethod
     def create_timer(cls, timeout, callback):
         timer = Timer(timeout, callback)
         cls._libevloop.add_timer(timer)
+        # the timer loop may carry no connections when they are spread over several loops
+        cls._libevloop.maybe_start()
         return timer
 
     def __init__(self, *args, **kwargs):
@@ -259,6 +293,7 @@ class LibevConnection(Connection):
 
         self.deque = deque()
         self._deque_lock = Lock()
+        self._libevloop = self._assign_loop()
         self._connect_socket()
         self._socket.setblocking(0)
 
@@ -273,6 +308,14 @@ class LibevConnection(Connection):
         # start the global event loop if needed
         self._libevloop.maybe_start()
 
+    def _assign_loop(self):
+        loops = self._libevloops
+        if len(loops) == 1:
+            return loops[0]
+        if self.assign_loops_by_host:
+            return loops[hash(self.host) % len(loops)]
+        return loops[next(self._loop_counter) % len(loops)]
+
     def close(self):
         with self.lock:
             if self.is_closed:
@@ -302,23 +345,23 @@ class LibevConnection(Connection):
         while True:
             try:
                 with self._deque_lock:
-                    next_msg = self.deque.popleft()
+                    buffers, size = pop_write_buffers(self.deque, self.max_write_size)
             except IndexError:
                 return
 
             try:
-                sent = self._socket.send(next_msg)
+                sent = self._send_buffers(self._socket, buffers)
             except socket.error as err:
                 if (err.args[0] in NONBLOCKING):
                     with self._deque_lock:
-                        self.deque.appendleft(next_msg)
+                        self.deque.extendleft(reversed(buffers))
                 else:
                     self.defunct(err)
                 return
             else:
-                if sent < len(next_msg):
+                if sent < size:
                     with self._deque_lock:
-                        self.deque.appendleft(next_msg[sent:])
+                        requeue_unsent(self.deque, buffers, sent)
 
     def handle_read(self, watcher, revents, errno=None):
         if revents & libev.EV_ERROR:
@@ -331,9 +374,8 @@ class LibevConnection(Connection):
             return
         try:
             while True:
-                buf = self._socket.recv(self.in_buffer_size)
-                self._iobuf.write(buf)
-                if len(buf) < self.in_buffer_size:
+                received = self._iobuf.read_into(self._socket.recv_into, self.in_buffer_size)
+                if received < self.in_buffer_size:
                     break
         except socket.error as err:
             if ssl and isinstance(err, ssl.SSLError):
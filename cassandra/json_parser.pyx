@@ -0,0 +1,498 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module provides an optional protocol parser that writes result rows
+straight into JSON documents (bytes), without building Python objects for
+the common column types.
+"""
+
+include "ioutils.pyx"
+
+from cpython.bytes cimport PyBytes_FromStringAndSize
+from cpython.mem cimport PyMem_Free
+from libc.math cimport isnan, isinf
+from libc.stdio cimport snprintf
+from libc.stdlib cimport realloc, free
+from libc.string cimport strlen
+
+from cassandra.bytesio cimport BytesIOReader
+from cassandra.deserializers cimport Deserializer, from_binary
+from cassandra.parsing cimport ParseDesc, ColumnParser
+
+import binascii
+import calendar
+import datetime
+from decimal import Decimal
+import json
+from uuid import UUID
+
+import six
+
+from cassandra import cqltypes, util, DriverException
+
+
+cdef extern from "Python.h":
+    char *PyOS_double_to_string(double val, char format_code, int precision, int flags, int *ptype) except NULL
+    int Py_DTSF_ADD_DOT_0
+
+
+cdef struct Writer:
+    char *data
+    Py_ssize_t size
+    Py_ssize_t capacity
+
+
+cdef enum CellKind:
+    OBJECT_CELL
+    INT_CELL
+    FLOAT_CELL
+    DOUBLE_CELL
+    BOOLEAN_CELL
+    TEXT_CELL
+    TIMESTAMP_CELL
+    UUID_CELL
+    BLOB_CELL
+
+
+_cell_kinds = {
+    cqltypes.ByteType: INT_CELL,
+    cqltypes.ShortType: INT_CELL,
+    cqltypes.Int32Type: INT_CELL,
+    cqltypes.LongType: INT_CELL,
+    cqltypes.CounterColumnType: INT_CELL,
+    cqltypes._RawDateType: INT_CELL,
+    cqltypes.FloatType: FLOAT_CELL,
+    cqltypes.DoubleType: DOUBLE_CELL,
+    cqltypes.BooleanType: BOOLEAN_CELL,
+    cqltypes.UTF8Type: TEXT_CELL,
+    cqltypes.VarcharType: TEXT_CELL,
+    cqltypes.AsciiType: TEXT_CELL,
+    cqltypes.DateType: TIMESTAMP_CELL,
+    cqltypes.TimestampType: TIMESTAMP_CELL,
+    cqltypes.UUIDType: UUID_CELL,
+    cqltypes.TimeUUIDType: UUID_CELL,
+    cqltypes.BytesType: BLOB_CELL,
+    cqltypes._MemoryviewBytesType: BLOB_CELL,
+    cqltypes._RawUUIDType: BLOB_CELL,
+    cqltypes._RawTimeUUIDType: BLOB_CELL,
+    cqltypes._RawInetAddressType: BLOB_CELL,
+}
+
+TIMESTAMP_FORMATS = ('iso', 'epoch_ms')
+UUID_FORMATS = ('canonical', 'hex')
+
+cdef char *hex_digits = b"0123456789abcdef"
+
+
+cdef class JsonParser(ColumnParser):
+    """
+    Decode a ResultMessage into JSON documents (as UTF-8 encoded bytes): one
+    object per row, mapping column names to values, or a single array of
+    these objects per page if `page_documents` is set.
+
+    `timestamp_format` is one of 'iso' ("2017-06-01T12:30:05.123Z") or
+    'epoch_ms' (milliseconds since the epoch), and `uuid_format` is one of
+    'canonical' ("d2177dd0-eaa2-11de-a572-001b779c76e3") or 'hex' (the same
+    without dashes).
+    """
+
+    cdef readonly bint page_documents
+    cdef readonly object timestamp_format
+    cdef readonly object uuid_format
+    cdef bint epoch_ms_timestamps
+    cdef bint hex_uuids
+    cdef object object_encoder
+
+    def __init__(self, page_documents=False, timestamp_format='iso', uuid_format='canonical'):
+        if timestamp_format not in TIMESTAMP_FORMATS:
+            raise ValueError("timestamp_format must be one of %s" % (TIMESTAMP_FORMATS,))
+        if uuid_format not in UUID_FORMATS:
+            raise ValueError("uuid_format must be one of %s" % (UUID_FORMATS,))
+        self.page_documents = page_documents
+        self.timestamp_format = timestamp_format
+        self.uuid_format = uuid_format
+        self.epoch_ms_timestamps = timestamp_format == 'epoch_ms'
+        self.hex_uuids = uuid_format == 'hex'
+        self.object_encoder = ObjectEncoder(timestamp_format, uuid_format)
+
+    def with_row_factory(self, row_factory):
+        """
+        Returns this parser: the documents are the rows whatever the row
+        factory, which is not applied to them.
+        """
+        return self
+
+    cpdef parse_rows(self, BytesIOReader reader, ParseDesc desc):
+        cdef Py_ssize_t i, j, rowcount, rowsize = desc.rowsize
+        cdef Writer writer
+        cdef list documents = []
+        cdef list kinds = [_cell_kinds.get(coltype, OBJECT_CELL) for coltype in desc.coltypes]
+        # "{"name":" or ","name":" ahead of each value
+        cdef list keys = [(b'{' if i == 0 else b',') + json_key(name) for i, name in enumerate(desc.colnames)]
+        cdef bytes key
+
+        rowcount = read_int(reader)
+        writer.data = NULL
+        writer.size = writer.capacity = 0
+        try:
+            if self.page_documents:
+                write_char(&writer, b'[')
+            for j in range(rowcount):
+                if self.page_documents and j:
+                    write_char(&writer, b',')
+                for i in range(rowsize):
+                    key = keys[i]
+                    write(&writer, key, len(key))
+                    self.write_cell(&writer, reader, desc, i, kinds[i])
+                if rowsize == 0:
+                    write_char(&writer, b'{')
+                write_char(&writer, b'}')
+                if not self.page_documents:
+                    documents.append(PyBytes_FromStringAndSize(writer.data, writer.size))
+                    writer.size = 0
+            if self.page_documents:
+                write_char(&writer, b']')
+                documents.append(PyBytes_FromStringAndSize(writer.data, writer.size))
+        finally:
+            free(writer.data)
+        return documents
+
+    cdef int write_cell(self, Writer *writer, BytesIOReader reader, ParseDesc desc,
+                        Py_ssize_t i, CellKind kind) except -1:
+        cdef Buffer buf
+
+        get_buf(reader, &buf)
+        try:
+            if buf.size < 0 or (buf.size == 0 and kind != TEXT_CELL and kind != BLOB_CELL and kind != OBJECT_CELL):
+                write(writer, b'null', 4)
+            elif kind == INT_CELL:
+                write_int(writer, &buf)
+            elif kind == FLOAT_CELL:
+                check_size(&buf, 4)
+                write_double(writer, unpack_num[float](&buf))
+            elif kind == DOUBLE_CELL:
+                check_size(&buf, 8)
+                write_double(writer, unpack_num[double](&buf))
+            elif kind == BOOLEAN_CELL:
+                check_size(&buf, 1)
+                if buf.ptr[0]:
+                    write(writer, b'true', 4)
+                else:
+                    write(writer, b'false', 5)
+            elif kind == TEXT_CELL:
+                write_text(writer, &buf)
+            elif kind == TIMESTAMP_CELL:
+                check_size(&buf, 8)
+                write_timestamp(writer, unpack_num[int64_t](&buf), self.epoch_ms_timestamps)
+            elif kind == UUID_CELL:
+                check_size(&buf, 16)
+                write_uuid(writer, &buf, self.hex_uuids)
+            elif kind == BLOB_CELL:
+                write_blob(writer, &buf)
+            else:
+                value = from_binary(desc.deserializers[i], &buf, desc.protocol_version)
+                encoded = self.object_encoder.encode(value)
+                write(writer, encoded, len(encoded))
+        except Exception as e:
+            raise DriverException('Failed decoding result column "%s" of type %s: %s' % (desc.colnames[i],
+                                                                                         desc.coltypes[i].cql_parameterized_type(),
+                                                                                         str(e)))
+        return 0
+
+
+def json_key(name):
+    return json.dumps(name, ensure_ascii=False).encode('utf8') + b':'
+
+
+class ObjectEncoder(object):
+    """
+    Encodes the values of the columns that JsonParser does not write itself
+    (collections, user types, decimals, ...), formatting timestamps and UUIDs
+    like it.
+    """
+
+    def __init__(self, timestamp_format, uuid_format):
+        self.timestamp_format = timestamp_format
+        self.uuid_format = uuid_format
+
+    def encode(self, value):
+        return json.dumps(self.convert(value), ensure_ascii=False, separators=(',', ':')).encode('utf8')
+
+    def convert(self, value):
+        if value is None or isinstance(value, (six.string_types, bool, float) + six.integer_types):
+            return value
+        if isinstance(value, datetime.datetime):
+            return self.convert_timestamp(value)
+        if isinstance(value, UUID):
+            return value.hex if self.uuid_format == 'hex' else str(value)
+        if isinstance(value, memoryview):
+            value = value.tobytes()
+        if isinstance(value, (bytes, bytearray)):
+            return '0x' + binascii.hexlify(value).decode('ascii')
+        if isinstance(value, tuple) and hasattr(value, '_fields'):
+            return dict((name, self.convert(v)) for name, v in zip(value._fields, value))
+        if hasattr(value, 'items'):
+            return dict((self.convert_key(k), self.convert(v)) for k, v in value.items())
+        if isinstance(value, (list, tuple, set, frozenset, util.SortedSet)):
+            return [self.convert(v) for v in value]
+        if hasattr(value, '__dict__') and not isinstance(value, (Decimal, util.Date, util.Time, util.Duration,
+                                                                   datetime.date, datetime.time)):
+            # user types mapped to classes
+            return dict((name, self.convert(v)) for name, v in vars(value).items())
+        return str(value)
+
+    def convert_key(self, key):
+        key = self.convert(key)
+        if key is None or isinstance(key, (six.string_types, bool, float) + six.integer_types):
+            return key
+        return json.dumps(key, separators=(',', ':'))
+
+    def convert_timestamp(self, dt):
+        ms = calendar.timegm(dt.utctimetuple()) * 1000 + dt.microsecond // 1000
+        if self.timestamp_format == 'epoch_ms':
+            return ms
+        return format_timestamp(ms)
+
+
+def format_timestamp(int64_t ms):
+    """Formats milliseconds since the epoch as JsonParser does"""
+    cdef Writer writer
+    writer.data = NULL
+    writer.size = writer.capacity = 0
+    try:
+        write_iso_timestamp(&writer, ms)
+        # without the quotes
+        return writer.data[1:writer.size - 1].decode('ascii')
+    finally:
+        free(writer.data)
+
+
+### Writing JSON into a growing buffer
+
+cdef int reserve(Writer *writer, Py_ssize_t n) except -1:
+    cdef Py_ssize_t capacity
+    cdef char *data
+    if writer.size + n > writer.capacity:
+        capacity = max(2 * writer.capacity, writer.size + n, 256)
+        data = <char *>realloc(writer.data, capacity)
+        if data is NULL:
+            raise MemoryError()
+        writer.data = data
+        writer.capacity = capacity
+    return 0
+
+
+cdef inline int write(Writer *writer, char *s, Py_ssize_t n) except -1:
+    reserve(writer, n)
+    memcpy(writer.data + writer.size, s, n)
+    writer.size += n
+    return 0
+
+
+cdef inline int write_char(Writer *writer, char c) except -1:
+    reserve(writer, 1)
+    writer.data[writer.size] = c
+    writer.size += 1
+    return 0
+
+
+cdef inline int check_size(Buffer *buf, Py_ssize_t size) except -1:
+    if buf.size != size:
+        raise ValueError("unexpected size %d" % (buf.size,))
+    return 0
+
+
+cdef int write_int(Writer *writer, Buffer *buf) except -1:
+    cdef int64_t value
+    cdef char out[24]
+    if buf.size == 8:
+        value = unpack_num[int64_t](buf)
+    elif buf.size == 4:
+        value = unpack_num[int32_t](buf)
+    elif buf.size == 2:
+        value = unpack_num[int16_t](buf)
+    elif buf.size == 1:
+        value = unpack_num[int8_t](buf)
+    else:
+        raise ValueError("unexpected size %d" % (buf.size,))
+    write(writer, out, snprintf(out, sizeof(out), "%lld", <long long>value))
+    return 0
+
+
+cdef int write_double(Writer *writer, double value) except -1:
+    cdef char *out
+    # as json.dumps does
+    if isnan(value):
+        write(writer, b'NaN', 3)
+    elif isinf(value):
+        if value > 0:
+            write(writer, b'Infinity', 8)
+        else:
+            write(writer, b'-Infinity', 9)
+    else:
+        out = PyOS_double_to_string(value, b'r', 0, Py_DTSF_ADD_DOT_0, NULL)
+        try:
+            write(writer, out, strlen(out))
+        finally:
+            PyMem_Free(out)
+    return 0
+
+
+cdef int write_text(Writer *writer, Buffer *buf) except -1:
+    """Writes a JSON string of UTF-8 text, escaping as needed"""
+    cdef Py_ssize_t i = 0, start = 0, size = buf.size
+    cdef unsigned char c
+    cdef char escape[6]
+
+    validate_utf8(buf)
+    write_char(writer, b'"')
+    while i < size:
+        c = <unsigned char>buf.ptr[i]
+        if c >= 0x20 and c != b'"' and c != b'\\':
+            i += 1
+            continue
+        write(writer, buf.ptr + start, i - start)
+        if c == b'"':
+            write(writer, b'\\"', 2)
+        elif c == b'\\':
+            write(writer, b'\\\\', 2)
+        elif c == b'\n':
+            write(writer, b'\\n', 2)
+        elif c == b'\r':
+            write(writer, b'\\r', 2)
+        elif c == b'\t':
+            write(writer, b'\\t', 2)
+        else:
+            escape[0] = b'\\'
+            escape[1] = b'u'
+            escape[2] = b'0'
+            escape[3] = b'0'
+            escape[4] = hex_digits[c >> 4]
+            escape[5] = hex_digits[c & 0xf]
+            write(writer, escape, 6)
+        i += 1
+        start = i
+    write(writer, buf.ptr + start, size - start)
+    write_char(writer, b'"')
+    return 0
+
+
+cdef int validate_utf8(Buffer *buf) except -1:
+    cdef Py_ssize_t i = 0, n, size = buf.size
+    cdef unsigned char c, lo, hi
+    while i < size:
+        c = <unsigned char>buf.ptr[i]
+        if c < 0x80:
+            i += 1
+            continue
+        elif 0xc2 <= c <= 0xdf:
+            n = 1
+        elif 0xe0 <= c <= 0xef:
+            n = 2
+        elif 0xf0 <= c <= 0xf4:
+            n = 3
+        else:
+            raise ValueError("invalid UTF-8 at byte %d" % (i,))
+        if i + n >= size:
+            raise ValueError("truncated UTF-8 at byte %d" % (i,))
+
+        # the second byte rules out overlong forms, surrogates and code points past U+10FFFF
+        lo = 0xa0 if c == 0xe0 else 0x90 if c == 0xf0 else 0x80
+        hi = 0x9f if c == 0xed else 0x8f if c == 0xf4 else 0xbf
+        i += 1
+        c = <unsigned char>buf.ptr[i]
+        if c < lo or c > hi:
+            raise ValueError("invalid UTF-8 at byte %d" % (i,))
+        i += 1
+        n -= 1
+        while n:
+            if (<unsigned char>buf.ptr[i]) & 0xc0 != 0x80:
+                raise ValueError("invalid UTF-8 at byte %d" % (i,))
+            i += 1
+            n -= 1
+    return 0
+
+
+cdef int write_timestamp(Writer *writer, int64_t ms, bint epoch_ms) except -1:
+    cdef char out[24]
+    if epoch_ms:
+        write(writer, out, snprintf(out, sizeof(out), "%lld", <long long>ms))
+    else:
+        write_iso_timestamp(writer, ms)
+    return 0
+
+
+cdef int write_iso_timestamp(Writer *writer, int64_t ms) except -1:
+    """Writes "YYYY-MM-DDTHH:MM:SS.mmmZ", for milliseconds since the epoch (UTC)"""
+    cdef int64_t days, ms_of_day, z, era, doe, yoe, doy, mp, year, month, day
+    cdef char out[48]
+
+    days = ms // 86400000
+    ms_of_day = ms - days * 86400000
+    if ms_of_day < 0:  # C division truncates towards zero
+        days -= 1
+        ms_of_day += 86400000
+
+    # civil date of a count of days since 1970-01-01, in the proleptic Gregorian calendar
+    z = days + 719468
+    era = (z if z >= 0 else z - 146096) // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = mp + 3 if mp < 10 else mp - 9
+    year = yoe + era * 400 + (1 if month <= 2 else 0)
+
+    write(writer, out, snprintf(out, sizeof(out), "\"%04lld-%02d-%02dT%02d:%02d:%02d.%03dZ\"",
+                                <long long>year, <int>month, <int>day, <int>(ms_of_day // 3600000),
+                                <int>(ms_of_day // 60000 % 60), <int>(ms_of_day // 1000 % 60),
+                                <int>(ms_of_day % 1000)))
+    return 0
+
+
+cdef int write_uuid(Writer *writer, Buffer *buf, bint hex_uuid) except -1:
+    cdef Py_ssize_t i
+    cdef unsigned char c
+    write_char(writer, b'"')
+    for i in range(16):
+        if not hex_uuid and (i == 4 or i == 6 or i == 8 or i == 10):
+            write_char(writer, b'-')
+        c = <unsigned char>buf.ptr[i]
+        write_char(writer, hex_digits[c >> 4])
+        write_char(writer, hex_digits[c & 0xf])
+    write_char(writer, b'"')
+    return 0
+
+
+cdef int write_blob(Writer *writer, Buffer *buf) except -1:
+    cdef Py_ssize_t i
+    cdef unsigned char c
+    cdef char *out
+
+    reserve(writer, 4 + 2 * buf.size)
+    out = writer.data + writer.size
+    out[0] = b'"'
+    out[1] = b'0'
+    out[2] = b'x'
+    out += 3
+    for i in range(buf.size):
+        c = <unsigned char>buf.ptr[i]
+        out[0] = hex_digits[c >> 4]
+        out[1] = hex_digits[c & 0xf]
+        out += 2
+    out[0] = b'"'
+    writer.size += 4 + 2 * buf.size
+    return 0
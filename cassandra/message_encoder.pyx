@@ -0,0 +1,388 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Encodes QUERY, EXECUTE and BATCH request frames for protocol v3 and higher.
+
+The size of the frame is computed first, then the header and body are written
+into a single preallocated ``bytes`` object in one pass. Anything this module
+does not handle (other messages, older protocol versions, values that are not
+``bytes``, out of range fields) makes :func:`encode_message` return :const:`None`,
+and the caller falls back to the Python encoder, which also raises any errors.
+"""
+
+from libc.stdint cimport uint8_t, uint16_t, uint32_t, uint64_t
+from libc.string cimport memcpy
+from cpython.bytes cimport PyBytes_FromStringAndSize, PyBytes_AS_STRING, PyBytes_GET_SIZE, PyBytes_CheckExact
+
+import six
+
+from cassandra.protocol import (QueryMessage, ExecuteMessage, BatchMessage, _UNSET_VALUE,
+                                COMPRESSED_FLAG, TRACING_FLAG, CUSTOM_PAYLOAD_FLAG, USE_BETA_FLAG,
+                                _VALUES_FLAG, _SKIP_METADATA_FLAG, _PAGE_SIZE_FLAG,
+                                _WITH_PAGING_STATE_FLAG, _WITH_SERIAL_CONSISTENCY_FLAG,
+                                _PROTOCOL_TIMESTAMP)
+
+cdef object UNSET_VALUE = _UNSET_VALUE
+cdef object text_type = six.text_type
+
+cdef enum:
+    HEADER_SIZE = 9
+    MAX_SHORT = 0xFFFF
+    MAX_INT = 0x7FFFFFFF
+
+
+cdef struct Writer:
+    char *ptr
+    Py_ssize_t pos
+
+
+cdef inline void put_byte(Writer *w, uint8_t v):
+    w.ptr[w.pos] = <char>v
+    w.pos += 1
+
+
+cdef inline void put_short(Writer *w, uint16_t v):
+    w.ptr[w.pos] = <char>(v >> 8)
+    w.ptr[w.pos + 1] = <char>v
+    w.pos += 2
+
+
+cdef inline void put_int(Writer *w, uint32_t v):
+    cdef int i
+    for i in range(4):
+        w.ptr[w.pos + i] = <char>(v >> (24 - 8 * i))
+    w.pos += 4
+
+
+cdef inline void put_long(Writer *w, uint64_t v):
+    cdef int i
+    for i in range(8):
+        w.ptr[w.pos + i] = <char>(v >> (56 - 8 * i))
+    w.pos += 8
+
+
+cdef inline void put_raw(Writer *w, bytes b):
+    cdef Py_ssize_t n = PyBytes_GET_SIZE(b)
+    memcpy(w.ptr + w.pos, PyBytes_AS_STRING(b), n)
+    w.pos += n
+
+
+cdef inline void put_flags(Writer *w, uint32_t flags, bint int_flags):
+    if int_flags:
+        put_int(w, flags)
+    else:
+        put_byte(w, <uint8_t>flags)
+
+
+cdef inline object as_bytes(s):
+    """ [long]string contents as bytes, or None if not supported """
+    if PyBytes_CheckExact(s):
+        return s
+    if isinstance(s, text_type):
+        return s.encode('utf8')
+    return None
+
+
+cdef Py_ssize_t values_size(params) except -2:
+    """
+    Size of a [short] count followed by [value]s, or -1 if they can't be encoded here
+    """
+    cdef Py_ssize_t size = 2
+    if len(params) > MAX_SHORT:
+        return -1
+    for v in params:
+        size += 4
+        if v is None or v is UNSET_VALUE:
+            continue
+        if not PyBytes_CheckExact(v):
+            return -1
+        size += PyBytes_GET_SIZE(v)
+    return size
+
+
+cdef int put_values(Writer *w, params) except -1:
+    put_short(w, <uint16_t>len(params))
+    for v in params:
+        if v is None:
+            put_int(w, <uint32_t>-1)
+        elif v is UNSET_VALUE:
+            put_int(w, <uint32_t>-2)
+        else:
+            put_int(w, <uint32_t>PyBytes_GET_SIZE(v))
+            put_raw(w, v)
+    return 0
+
+
+cdef class _Options(object):
+    """
+    The optional trailing fields shared by QUERY, EXECUTE and BATCH bodies
+    """
+    cdef uint32_t flags
+    cdef int fetch_size
+    cdef bytes paging_state
+    cdef int serial_consistency_level
+    cdef uint64_t timestamp
+
+    cdef Py_ssize_t prepare(self, msg, bint paging) except -2:
+        """ Sets the flags and returns the size of the fields, or -1 if unsupported """
+        cdef Py_ssize_t size = 0
+        self.flags = 0
+        if paging and msg.fetch_size:
+            if not 0 < msg.fetch_size <= MAX_INT:
+                return -1
+            self.flags |= _PAGE_SIZE_FLAG
+            self.fetch_size = msg.fetch_size
+            size += 4
+        if paging and msg.paging_state:
+            self.paging_state = as_bytes(msg.paging_state)
+            if self.paging_state is None:
+                return -1
+            self.flags |= _WITH_PAGING_STATE_FLAG
+            size += 4 + PyBytes_GET_SIZE(self.paging_state)
+        if msg.serial_consistency_level:
+            self.flags |= _WITH_SERIAL_CONSISTENCY_FLAG
+            self.serial_consistency_level = msg.serial_consistency_level
+            size += 2
+        if msg.timestamp is not None:
+            if not 0 <= msg.timestamp <= 0xFFFFFFFFFFFFFFFF:
+                return -1
+            self.flags |= _PROTOCOL_TIMESTAMP
+            self.timestamp = msg.timestamp
+            size += 8
+        return size
+
+    cdef void put(self, Writer *w):
+        if self.flags & _PAGE_SIZE_FLAG:
+            put_int(w, <uint32_t>self.fetch_size)
+        if self.flags & _WITH_PAGING_STATE_FLAG:
+            put_int(w, <uint32_t>PyBytes_GET_SIZE(self.paging_state))
+            put_raw(w, self.paging_state)
+        if self.flags & _WITH_SERIAL_CONSISTENCY_FLAG:
+            put_short(w, <uint16_t>self.serial_consistency_level)
+        if self.flags & _PROTOCOL_TIMESTAMP:
+            put_long(w, self.timestamp)
+
+
+cdef bytes alloc_frame(Py_ssize_t body_size, Writer *w):
+    cdef bytes frame = PyBytes_FromStringAndSize(NULL, HEADER_SIZE + body_size)
+    w.ptr = PyBytes_AS_STRING(frame)
+    w.pos = HEADER_SIZE
+    return frame
+
+
+cdef object encode_query(msg, bytes payload, bint int_flags, Writer *w):
+    cdef _Options options = _Options()
+    cdef bytes query = as_bytes(msg.query)
+    if query is None:
+        return None
+
+    cdef Py_ssize_t opt_size = options.prepare(msg, True)
+    if opt_size < 0:
+        return None
+    params = msg._query_params
+    cdef Py_ssize_t params_size = 0
+    if params is not None:
+        options.flags |= _VALUES_FLAG
+        params_size = values_size(params)
+        if params_size < 0:
+            return None
+
+    cdef Py_ssize_t size = (PyBytes_GET_SIZE(payload) + 4 + PyBytes_GET_SIZE(query) + 2 +
+                            (4 if int_flags else 1) + params_size + opt_size)
+    frame = alloc_frame(size, w)
+    put_raw(w, payload)
+    put_int(w, <uint32_t>PyBytes_GET_SIZE(query))
+    put_raw(w, query)
+    put_short(w, <uint16_t>msg.consistency_level)
+    put_flags(w, options.flags, int_flags)
+    if params is not None:
+        put_values(w, params)
+    options.put(w)
+    return frame
+
+
+cdef object encode_execute(msg, bytes payload, bint int_flags, Writer *w):
+    cdef _Options options = _Options()
+    cdef bytes query_id = as_bytes(msg.query_id)
+    if query_id is None or PyBytes_GET_SIZE(query_id) > MAX_SHORT:
+        return None
+
+    cdef Py_ssize_t opt_size = options.prepare(msg, True)
+    if opt_size < 0:
+        return None
+    options.flags |= _VALUES_FLAG
+    if msg.skip_meta:
+        options.flags |= _SKIP_METADATA_FLAG
+    params = msg.query_params
+    cdef Py_ssize_t params_size = values_size(params)
+    if params_size < 0:
+        return None
+
+    cdef Py_ssize_t size = (PyBytes_GET_SIZE(payload) + 2 + PyBytes_GET_SIZE(query_id) + 2 +
+                            (4 if int_flags else 1) + params_size + opt_size)
+    frame = alloc_frame(size, w)
+    put_raw(w, payload)
+    put_short(w, <uint16_t>PyBytes_GET_SIZE(query_id))
+    put_raw(w, query_id)
+    put_short(w, <uint16_t>msg.consistency_level)
+    put_flags(w, options.flags, int_flags)
+    put_values(w, params)
+    options.put(w)
+    return frame
+
+
+cdef object encode_batch(msg, bytes payload, bint int_flags, Writer *w):
+    cdef _Options options = _Options()
+    cdef Py_ssize_t params_size, size
+    queries = msg.queries
+    if len(queries) > MAX_SHORT:
+        return None
+
+    # encoded query strings and ids, in order
+    statements = []
+    size = PyBytes_GET_SIZE(payload) + 1 + 2
+    for prepared, string_or_query_id, params in queries:
+        statement = as_bytes(string_or_query_id) if not prepared else string_or_query_id
+        if not PyBytes_CheckExact(statement):
+            return None
+        if prepared and PyBytes_GET_SIZE(statement) > MAX_SHORT:
+            return None
+        params_size = values_size(params)
+        if params_size < 0:
+            return None
+        statements.append(statement)
+        size += 1 + (2 if prepared else 4) + PyBytes_GET_SIZE(statement) + params_size
+
+    cdef Py_ssize_t opt_size = options.prepare(msg, False)
+    if opt_size < 0:
+        return None
+    size += 2 + (4 if int_flags else 1) + opt_size
+
+    frame = alloc_frame(size, w)
+    put_raw(w, payload)
+    put_byte(w, <uint8_t>msg.batch_type.value)
+    put_short(w, <uint16_t>len(queries))
+    for (prepared, _, params), statement in zip(queries, statements):
+        if prepared:
+            put_byte(w, 1)
+            put_short(w, <uint16_t>PyBytes_GET_SIZE(statement))
+        else:
+            put_byte(w, 0)
+            put_int(w, <uint32_t>PyBytes_GET_SIZE(statement))
+        put_raw(w, statement)
+        put_values(w, params)
+    put_short(w, <uint16_t>msg.consistency_level)
+    put_flags(w, options.flags, int_flags)
+    options.put(w)
+    return frame
+
+
+cdef bytes encode_payload(custom_payload):
+    """ The custom payload [bytes map], or None if it can't be encoded here """
+    if len(custom_payload) > MAX_SHORT:
+        return None
+    parts = [None]
+    for k, v in custom_payload.items():
+        k = as_bytes(k)
+        if k is None or PyBytes_GET_SIZE(k) > MAX_SHORT or not (v is None or PyBytes_CheckExact(v)):
+            return None
+        parts.append(_short(PyBytes_GET_SIZE(k)))
+        parts.append(k)
+        if v is None:
+            parts.append(b'\xff\xff\xff\xff')
+        else:
+            parts.append(_int(PyBytes_GET_SIZE(v)))
+            parts.append(v)
+    parts[0] = _short(len(custom_payload))
+    return b''.join(parts)
+
+
+cdef bytes _short(uint16_t v):
+    cdef char buf[2]
+    cdef Writer w
+    w.ptr = buf
+    w.pos = 0
+    put_short(&w, v)
+    return buf[:2]
+
+
+cdef bytes _int(uint32_t v):
+    cdef char buf[4]
+    cdef Writer w
+    w.ptr = buf
+    w.pos = 0
+    put_int(&w, v)
+    return buf[:4]
+
+
+def encode_message(msg, int stream_id, int protocol_version, compressor, allow_beta_protocol_version):
+    """
+    Encodes a :class:`.QueryMessage`, :class:`.ExecuteMessage` or :class:`.BatchMessage`
+    frame, with the same arguments as :meth:`._ProtocolHandler.encode_message`.
+    Returns :const:`None` if the message must be encoded by the Python implementation.
+    """
+    cdef Writer w
+    cdef uint8_t flags = 0
+    cdef bytes payload = b''
+    cdef bint int_flags
+
+    if protocol_version < 3:
+        return None
+
+    msg_type = type(msg)
+    if msg_type is not QueryMessage and msg_type is not ExecuteMessage and msg_type is not BatchMessage:
+        return None
+
+    if msg.custom_payload:
+        if protocol_version < 4:
+            return None
+        payload = encode_payload(msg.custom_payload)
+        if payload is None:
+            return None
+        flags |= CUSTOM_PAYLOAD_FLAG
+
+    int_flags = protocol_version >= 5  # ProtocolVersion.uses_int_query_flags
+    if msg_type is ExecuteMessage:
+        frame = encode_execute(msg, payload, int_flags, &w)
+    elif msg_type is QueryMessage:
+        frame = encode_query(msg, payload, int_flags, &w)
+    else:
+        frame = encode_batch(msg, payload, int_flags, &w)
+    if frame is None:
+        return None
+
+    cdef Py_ssize_t body_size = w.pos - HEADER_SIZE
+    if compressor and body_size > 0:
+        body = compressor(frame[HEADER_SIZE:])
+        flags |= COMPRESSED_FLAG
+        header = PyBytes_FromStringAndSize(NULL, HEADER_SIZE)
+        w.ptr = PyBytes_AS_STRING(header)
+        body_size = len(body)
+        frame = None
+    if msg.tracing:
+        flags |= TRACING_FLAG
+    if allow_beta_protocol_version:
+        flags |= USE_BETA_FLAG
+
+    w.pos = 0
+    put_byte(&w, <uint8_t>protocol_version)
+    put_byte(&w, flags)
+    put_short(&w, <uint16_t>stream_id)
+    put_byte(&w, <uint8_t>msg_type.opcode)
+    put_int(&w, <uint32_t>body_size)
+
+    if frame is None:
+        return header + body
+    return frame
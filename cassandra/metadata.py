@@ -12,12 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from array import array
 from binascii import unhexlify
 from bisect import bisect_right
 from collections import defaultdict, Mapping
 from functools import total_ordering
 from hashlib import md5
-from itertools import islice, cycle
 import json
 import logging
 import re
@@ -27,8 +27,9 @@ import sys
 from threading import RLock
 
 murmur3 = None
+murmur3_many = None
 try:
-    from cassandra.murmur3 import murmur3
+    from cassandra.murmur3 import murmur3, murmur3_many
 except ImportError as e:
     pass
 
@@ -38,7 +39,7 @@ from cassandra.encoder import Encoder
 from cassandra.marshal import varint_unpack
 from cassandra.protocol import QueryMessage
 from cassandra.query import dict_factory, bind_params
-from cassandra.util import OrderedDict
+from cassandra.util import OrderedDict, int64_typecode
 
 log = logging.getLogger(__name__)
 
@@ -295,10 +296,26 @@ class Metadata(object):
         if not t:
             return []
         try:
-            return t.get_replicas(keyspace, t.token_class.from_key(key))
+            return t.get_replicas_for_value(keyspace, t.token_class.hash_fn(key))
         except NoMurmur3:
             return []
 
+    def get_replicas_bulk(self, keyspace, keys):
+        """
+        Returns a list of the lists of :class:`.Host` instances that are replicas
+        for each of a sequence of partition keys, as :meth:`get_replicas` would.
+        This is meant for routing or grouping many keys at once.
+
+        .. versionadded:: 3.12.0
+        """
+        t = self.token_map
+        if not t:
+            return [[] for _ in keys]
+        try:
+            return t.get_replicas_bulk(keyspace, keys)
+        except NoMurmur3:
+            return [[] for _ in keys]
+
     def can_support_partitioner(self):
         if self.partitioner.endswith('Murmur3Partitioner') and murmur3 is None:
             return False
@@ -479,69 +496,47 @@ class NetworkTopologyStrategy(ReplicationStrategy):
                          for dc, rf in self.dc_replication_factors.items() if rf > 0)
 
         # build a map of DCs to lists of indexes into `ring` for tokens that
-        # belong to that DC
+        # belong to that DC, and to lists of the hosts owning these tokens
         dc_to_token_offset = defaultdict(list)
+        dc_to_hosts = defaultdict(list)
         dc_racks = defaultdict(set)
         hosts_per_dc = defaultdict(set)
         for i, token in enumerate(ring):
             host = token_to_host_owner[token]
             dc_to_token_offset[host.datacenter].append(i)
+            dc_to_hosts[host.datacenter].append(host)
             if host.datacenter and host.rack:
                 dc_racks[host.datacenter].add(host.rack)
                 hosts_per_dc[host.datacenter].add(host)
 
-        # A map of DCs to an index into the dc_to_token_offset value for that dc.
+        # The replicas in a DC are the same for all the tokens following a token
+        # of this DC up to this token (included), so they are found once per
+        # token of the DC, as lists indexed like its dc_to_token_offset value.
+        dc_replicas = []
+        for dc in dc_to_token_offset.keys():
+            if dc not in dc_rf_map:
+                continue
+            dc_replicas.append((dc_to_token_offset[dc], _nts_dc_replicas(
+                dc_to_hosts[dc], dc_rf_map[dc], len(dc_racks[dc]), len(hosts_per_dc[dc]))))
+
+        # A list of indexes into the dc_to_token_offset value of each DC.
         # This is how we keep track of advancing around the ring for each DC.
-        dc_to_current_index = defaultdict(int)
+        dc_indexes = [0] * len(dc_replicas)
 
         replica_map = defaultdict(list)
         for i in range(len(ring)):
             replicas = replica_map[ring[i]]
 
-            # go through each DC and find the replicas in that DC
-            for dc in dc_to_token_offset.keys():
-                if dc not in dc_rf_map:
-                    continue
-
+            for dc_index, (token_offsets, replicas_by_offset) in enumerate(dc_replicas):
                 # advance our per-DC index until we're up to at least the
                 # current token in the ring
-                token_offsets = dc_to_token_offset[dc]
-                index = dc_to_current_index[dc]
+                index = dc_indexes[dc_index]
                 num_tokens = len(token_offsets)
                 while index < num_tokens and token_offsets[index] < i:
                     index += 1
-                dc_to_current_index[dc] = index
-
-                replicas_remaining = dc_rf_map[dc]
-                replicas_this_dc = 0
-                skipped_hosts = []
-                racks_placed = set()
-                racks_this_dc = dc_racks[dc]
-                hosts_this_dc = len(hosts_per_dc[dc])
-                for token_offset in islice(cycle(token_offsets), index, index + num_tokens):
-                    host = token_to_host_owner[ring[token_offset]]
-                    if replicas_remaining == 0 or replicas_this_dc == hosts_this_dc:
-                        break
-
-                    if host in replicas:
-                        continue
-
-                    if host.rack in racks_placed and len(racks_placed) < len(racks_this_dc):
-                        skipped_hosts.append(host)
-                        continue
+                dc_indexes[dc_index] = index
 
-                    replicas.append(host)
-                    replicas_this_dc += 1
-                    replicas_remaining -= 1
-                    racks_placed.add(host.rack)
-
-                    if len(racks_placed) == len(racks_this_dc):
-                        for host in skipped_hosts:
-                            if replicas_remaining == 0:
-                                break
-                            replicas.append(host)
-                            replicas_remaining -= 1
-                        del skipped_hosts[:]
+                replicas.extend(replicas_by_offset[index if index < num_tokens else 0])
 
         return replica_map
 
@@ -562,6 +557,101 @@ class NetworkTopologyStrategy(ReplicationStrategy):
         return self.dc_replication_factors == other.dc_replication_factors
 
 
+def _nts_dc_replicas(hosts, replication_factor, num_racks, num_hosts):
+    """
+    Returns the replicas in a DC for each of its tokens, as placed by
+    ``NetworkTopologyStrategy``: walking the ring from the token, the first hosts
+    of racks without replicas yet, then, once every rack has one, the hosts that
+    were skipped because their rack had one, and the following hosts.
+
+    `hosts` are the owners of the tokens of the DC, in ring order; `num_racks` and
+    `num_hosts` count the racks and hosts of the DC.
+
+    Instead of stepping through each token of the walk, it jumps to the next token
+    of another host, and, when no more skipped hosts can become replicas, to the
+    next token of a rack without replicas.
+    """
+    num_tokens = len(hosts)
+
+    # steps from each token to the next token of another host
+    host_changes = _cyclic_distances([hosts[i] is not hosts[i - 1] for i in range(num_tokens)])
+    if host_changes is None:
+        host_steps = [num_tokens] * num_tokens
+    else:
+        host_steps = [host_changes[(i + 1) % num_tokens] + 1 for i in range(num_tokens)]
+
+    # distances from each token to the next token of each rack
+    racks = [host.rack for host in hosts]
+    rack_distances = dict((rack, _cyclic_distances([r == rack for r in racks])) for rack in set(racks))
+
+    replicas_by_offset = []
+    for start in range(num_tokens):
+        replicas = []
+        replicas_remaining = replication_factor
+        replicas_this_dc = 0
+        skipped_hosts = []
+        racks_placed = set()
+
+        index = start
+        walked = 0
+        while walked < num_tokens:
+            if replicas_remaining == 0 or replicas_this_dc == num_hosts:
+                break
+
+            host = hosts[index]
+            if host not in replicas and host not in skipped_hosts:
+                if host.rack in racks_placed and len(racks_placed) < num_racks:
+                    # only the first skipped hosts can be placed once every rack has a replica
+                    if len(skipped_hosts) < replicas_remaining:
+                        skipped_hosts.append(host)
+                else:
+                    replicas.append(host)
+                    replicas_this_dc += 1
+                    replicas_remaining -= 1
+                    racks_placed.add(host.rack)
+
+                    if len(racks_placed) == num_racks:
+                        for skipped in skipped_hosts:
+                            if replicas_remaining == 0:
+                                break
+                            replicas.append(skipped)
+                            replicas_remaining -= 1
+                        del skipped_hosts[:]
+
+            if len(racks_placed) < num_racks and len(skipped_hosts) >= replicas_remaining:
+                # only a host of a rack without replicas can change the replicas
+                next_index = (index + 1) % num_tokens
+                step = min([distances[next_index] for rack, distances in rack_distances.items()
+                            if rack not in racks_placed] or [num_tokens]) + 1
+            else:
+                step = host_steps[index]
+            walked += step
+            index = (index + step) % num_tokens
+
+        replicas_by_offset.append(replicas)
+
+    return replicas_by_offset
+
+
+def _cyclic_distances(flags):
+    """
+    Returns, for each index of a cyclic list of booleans, the distance to the
+    next true value (0 if it is at this index), or None if there is none.
+    """
+    num_flags = len(flags)
+    if not any(flags):
+        return None
+
+    distances = [0] * num_flags
+    distance = num_flags
+    # twice around, for the distances of the last values to wrap
+    for i in range(2 * num_flags - 1, -1, -1):
+        index = i % num_flags
+        distance = 0 if flags[index] else distance + 1
+        distances[index] = distance
+    return distances
+
+
 class LocalStrategy(ReplicationStrategy):
     def __init__(self, options_map):
         pass
@@ -1427,7 +1517,8 @@ class TokenMap(object):
     tokens_to_hosts_by_ks = None
     """
     A map of keyspace names to a nested map of :class:`.Token` objects to
-    sets of :class:`.Host` objects.
+    sets of :class:`.Host` objects. Keyspaces with equal replication strategies
+    share the same nested map, which must not be modified.
     """
 
     ring = None
@@ -1442,7 +1533,15 @@ class TokenMap(object):
         self.ring = all_tokens
         self.token_to_host_owner = token_to_host_owner
 
+        # the values of the ring tokens, bisected instead of the tokens themselves
+        # not to compare Token objects
+        self._ring_values = _make_ring_values(token_class, all_tokens)
         self.tokens_to_hosts_by_ks = {}
+        # lists of the replicas of the ring tokens by keyspace, parallel to the ring
+        self._replicas_by_ks = {}
+        # (strategy, replica map, replica lists) of the replication strategies of the
+        # keyspaces, shared by the keyspaces with equal strategies
+        self._shared_replica_maps = []
         self._metadata = metadata
         self._rebuild_lock = RLock()
 
@@ -1454,44 +1553,130 @@ class TokenMap(object):
                     ks_meta = self._metadata.keyspaces.get(keyspace)
                     if ks_meta:
                         replica_map = self.replica_map_for_keyspace(self._metadata.keyspaces[keyspace])
-                        self.tokens_to_hosts_by_ks[keyspace] = replica_map
+                        self._set_replica_map(keyspace, replica_map)
             except Exception:
                 # should not happen normally, but we don't want to blow up queries because of unexpected meta state
                 # bypass until new map is generated
-                self.tokens_to_hosts_by_ks[keyspace] = {}
+                self._set_replica_map(keyspace, {})
                 log.exception("Failed creating a token map for keyspace '%s' with %s. PLEASE REPORT THIS: https://datastax-oss.atlassian.net/projects/PYTHON", keyspace, self.token_to_host_owner)
 
+    def _set_replica_map(self, keyspace, replica_map):
+        # called with the rebuild lock held
+        replicas = None
+        for _, shared_map, shared_replicas in self._shared_replica_maps:
+            if shared_map is replica_map:
+                replicas = shared_replicas
+                break
+        else:
+            if replica_map:
+                replicas = [replica_map.get(token, []) for token in self.ring]
+
+        if replicas:
+            self._replicas_by_ks[keyspace] = replicas
+        else:
+            self._replicas_by_ks.pop(keyspace, None)
+        self.tokens_to_hosts_by_ks[keyspace] = replica_map
+        self._release_replica_maps()
+
+    def _release_replica_maps(self):
+        # drops the shared replica maps that no keyspace uses anymore; they are
+        # left untouched, for the callers still holding them
+        in_use = set(id(replica_map) for replica_map in self.tokens_to_hosts_by_ks.values())
+        self._shared_replica_maps = [shared for shared in self._shared_replica_maps if id(shared[1]) in in_use]
+
     def replica_map_for_keyspace(self, ks_metadata):
+        """
+        Returns the map of :class:`.Token` objects to replicas for a keyspace,
+        which is shared with the other keyspaces of this token map that have
+        an equal replication strategy.
+
+        .. versionchanged:: 3.12.0
+            replica maps are shared by the keyspaces with equal strategies
+        """
         strategy = ks_metadata.replication_strategy
-        if strategy:
-            return strategy.make_token_replica_map(self.token_to_host_owner, self.ring)
-        else:
+        if not strategy:
             return None
 
+        with self._rebuild_lock:
+            for shared_strategy, replica_map, _ in self._shared_replica_maps:
+                if shared_strategy == strategy:
+                    return replica_map
+
+            replica_map = strategy.make_token_replica_map(self.token_to_host_owner, self.ring)
+            replicas = [replica_map.get(token, []) for token in self.ring] if replica_map else None
+            self._shared_replica_maps.append((strategy, replica_map, replicas))
+            return replica_map
+
     def remove_keyspace(self, keyspace):
-        self.tokens_to_hosts_by_ks.pop(keyspace, None)
+        with self._rebuild_lock:
+            self.tokens_to_hosts_by_ks.pop(keyspace, None)
+            self._replicas_by_ks.pop(keyspace, None)
+            self._release_replica_maps()
+
+    def _get_replica_list(self, keyspace):
+        replicas = self._replicas_by_ks.get(keyspace, None)
+        if replicas is None and self.tokens_to_hosts_by_ks.get(keyspace, None) is None:
+            self.rebuild_keyspace(keyspace, build_if_absent=True)
+            replicas = self._replicas_by_ks.get(keyspace, None)
+        return replicas
 
     def get_replicas(self, keyspace, token):
         """
         Get  a set of :class:`.Host` instances representing all of the
         replica nodes for a given :class:`.Token`.
         """
-        tokens_to_hosts = self.tokens_to_hosts_by_ks.get(keyspace, None)
-        if tokens_to_hosts is None:
-            self.rebuild_keyspace(keyspace, build_if_absent=True)
-            tokens_to_hosts = self.tokens_to_hosts_by_ks.get(keyspace, None)
+        return self.get_replicas_for_value(keyspace, token.value)
 
-        if tokens_to_hosts:
+    def get_replicas_for_value(self, keyspace, value):
+        """
+        Like :meth:`get_replicas`, for the value of a token (as hashed by
+        :meth:`.Token.hash_fn`) rather than a :class:`.Token`.
+
+        .. versionadded:: 3.12.0
+        """
+        replicas = self._get_replica_list(keyspace)
+        if replicas:
             # token range ownership is exclusive on the LHS (the start token), so
             # we use bisect_right, which, in the case of a tie/exact match,
             # picks an insertion point to the right of the existing match
-            point = bisect_right(self.ring, token)
-            if point == len(self.ring):
-                return tokens_to_hosts[self.ring[0]]
+            point = bisect_right(self._ring_values, value)
+            if point == len(replicas):
+                return replicas[0]
             else:
-                return tokens_to_hosts[self.ring[point]]
+                return replicas[point]
         return []
 
+    def get_replicas_bulk(self, keyspace, routing_keys):
+        """
+        Get the lists of :class:`.Host` instances that are replicas for each
+        of a sequence of routing keys (serialized partition keys), hashing
+        and bisecting them in one pass.
+
+        .. versionadded:: 3.12.0
+        """
+        replicas = self._get_replica_list(keyspace)
+        if not replicas:
+            return [[] for _ in routing_keys]
+
+        ring_values = self._ring_values
+        ring_size = len(replicas)
+        result = []
+        for value in self.token_class.hash_many(routing_keys):
+            point = bisect_right(ring_values, value)
+            result.append(replicas[point if point < ring_size else 0])
+        return result
+
+
+def _make_ring_values(token_class, tokens):
+    """
+    Returns the values of sorted tokens as an int64 :class:`array.array` for
+    ``Murmur3Partitioner`` tokens, or as a list otherwise.
+    """
+    values = [token.value for token in tokens]
+    if token_class is Murmur3Token and int64_typecode:
+        return array(int64_typecode, values)
+    return values
+
 
 @total_ordering
 class Token(object):
@@ -1506,6 +1691,15 @@ class Token(object):
     def hash_fn(cls, key):
         return key
 
+    @classmethod
+    def hash_many(cls, keys):
+        """
+        Returns the token values of a sequence of keys, as :meth:`hash_fn` does for one key.
+
+        .. versionadded:: 3.12.0
+        """
+        return [cls.hash_fn(key) for key in keys]
+
     @classmethod
     def from_key(cls, key):
         return cls(cls.hash_fn(key))
@@ -1557,6 +1751,19 @@ class Murmur3Token(HashToken):
         else:
             raise NoMurmur3()
 
+    @classmethod
+    def hash_many(cls, keys):
+        """
+        Returns the token values of a sequence of keys as an int64 :class:`array.array`
+        (a list if there is no such typecode), hashing them all at once.
+        """
+        if murmur3_many is None:
+            raise NoMurmur3()
+        values = murmur3_many(keys)
+        while MIN_LONG in values:
+            values[values.index(MIN_LONG)] = MAX_LONG
+        return values
+
     def __init__(self, token):
         """ `token` is an int or string representing the token. """
         self.value = int(token)
@@ -1,6 +1,9 @@
+from array import array
 from six.moves import range
 import struct
 
+from cassandra.util import int64_typecode
+
 
 def body_and_tail(data):
     l = len(data)
@@ -109,7 +112,26 @@ def _murmur3(data):
 
     return truncate_int64(h1)
 
+
+def _int64_array(values):
+    return array(int64_typecode, values) if int64_typecode else list(values)
+
+
+def _murmur3_many(keys):
+    return _int64_array([_murmur3(key) for key in keys])
+
+
+def _murmur3_many_fixed(data, key_size):
+    if key_size <= 0:
+        raise ValueError("key_size must be greater than 0")
+    data = memoryview(data).tobytes()
+    if len(data) % key_size:
+        raise ValueError("buffer size (%d) is not a multiple of key_size (%d)" % (len(data), key_size))
+    return _int64_array([_murmur3(data[i:i + key_size]) for i in range(0, len(data), key_size)])
+
 try:
-    from cassandra.cmurmur3 import murmur3
+    from cassandra.cmurmur3 import murmur3, murmur3_many, murmur3_many_fixed
 except ImportError:
     murmur3 = _murmur3
+    murmur3_many = _murmur3_many
+    murmur3_many_fixed = _murmur3_many_fixed
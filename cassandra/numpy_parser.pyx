@@ -25,13 +25,13 @@ as numpy is an optional dependency.
 include "ioutils.pyx"
 
 cimport cython
-from libc.stdint cimport uint64_t, uint8_t
+from libc.stdint cimport uint64_t, uint32_t, int32_t, uint8_t
 from cpython.ref cimport Py_INCREF, PyObject
 
 from cassandra.bytesio cimport BytesIOReader
 from cassandra.deserializers cimport Deserializer, from_binary
 from cassandra.parsing cimport ParseDesc, ColumnParser, RowParser
-from cassandra import cqltypes
+from cassandra import cqltypes, DriverException
 from cassandra.util import is_little_endian
 
 import numpy as np
@@ -67,6 +67,12 @@ _cqltype_to_numpy = {
     cqltypes.ShortType:         np.dtype('>i2'),
     cqltypes.FloatType:         np.dtype('>f4'),
     cqltypes.DoubleType:        np.dtype('>f8'),
+    cqltypes._RawDateType:      np.dtype('>i8'),
+}
+
+# columns decoded as integers that are returned as another dtype
+_cqltype_to_numpy_view = {
+    cqltypes._RawDateType:      np.dtype('datetime64[ms]'),
 }
 
 obj_dtype = np.dtype('O')
@@ -85,9 +91,15 @@ cdef class NumpyParser(ColumnParser):
         array_descs, arrays = make_arrays(desc, rowcount)
         arrs = &array_descs[0]
 
-        _parse_rows(reader, desc, arrs, rowcount)
+        if obj_dtype not in [arr.dtype for arr in arrays]:
+            _parse_fixed_width_rows(reader, desc, arrs, rowcount)
+        else:
+            _parse_rows(reader, desc, arrs, rowcount)
 
         arrays = [make_native_byteorder(arr) for arr in arrays]
+        for i, coltype in enumerate(desc.coltypes):
+            if coltype in _cqltype_to_numpy_view:
+                arrays[i] = arrays[i].view(_cqltype_to_numpy_view[coltype])
         result = dict(zip(desc.colnames, arrays))
         return result
 
@@ -100,6 +112,28 @@ cdef _parse_rows(BytesIOReader reader, ParseDesc desc,
         unpack_row(reader, desc, arrs)
 
 
+cdef int _parse_fixed_width_rows(BytesIOReader reader, ParseDesc desc,
+                                 ArrDesc *arrs, Py_ssize_t rowcount) except -1:
+    """
+    Parse rows of fixed-width columns only, which need no Python objects:
+    the GIL is released meanwhile, so that other threads can run.
+    """
+    cdef char *ptr = reader.buf_ptr + reader.pos
+    cdef char *end = reader.buf_ptr + reader.size
+    cdef Py_ssize_t rowsize = desc.rowsize, bad_column = -1
+    cdef int res
+
+    with nogil:
+        res = unpack_fixed_width_rows(&ptr, end, rowsize, arrs, rowcount, &bad_column)
+
+    reader.pos = ptr - reader.buf_ptr
+    if res == -1:
+        raise EOFError("Cannot read past the end of the file")
+    elif res == -2:
+        raise_bad_cell_size(desc, arrs, bad_column)
+    return 0
+
+
 ### Helper functions to create NumPy arrays and array descriptors
 
 def make_arrays(ParseDesc desc, array_size):
@@ -159,10 +193,8 @@ cdef inline int unpack_row(
             val = from_binary(deserializer, &buf, desc.protocol_version)
             Py_INCREF(val)
             (<PyObject **> arr.buf_ptr)[0] = <PyObject *> val
-        elif buf.size >= 0:
-            memcpy(<char *> arr.buf_ptr, buf.ptr, buf.size)
-        else:
-            memcpy(<char *>arr.mask_ptr, &mask_true, 1)
+        elif copy_cell(&arr, buf.ptr, buf.size) == -1:
+            raise_bad_cell_size(desc, arrays, i)
 
         # Update the pointer into the array for the next time
         arrays[i].buf_ptr += arr.stride
@@ -171,6 +203,69 @@ cdef inline int unpack_row(
     return 0
 
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline int unpack_fixed_width_rows(
+        char **pos, char *end, Py_ssize_t rowsize, ArrDesc *arrays,
+        Py_ssize_t rowcount, Py_ssize_t *bad_column) nogil:
+    """
+    Copy `rowcount` rows of fixed-width cells starting at `pos` into the
+    arrays, leaving `pos` after the last row read.
+
+    Returns -1 if the rows run past `end`, or -2 if a cell does not have the
+    size of its column's values, which column is then set in `bad_column`.
+    """
+    cdef Py_ssize_t i, j, size
+    cdef char *ptr = pos[0]
+
+    for j in range(rowcount):
+        for i in range(rowsize):
+            if end - ptr < 4:
+                pos[0] = ptr
+                return -1
+            size = read_int_nogil(ptr)
+            ptr += 4
+            if size > end - ptr:
+                pos[0] = ptr
+                return -1
+            if copy_cell(&arrays[i], ptr, size) == -1:
+                bad_column[0] = i
+                pos[0] = ptr
+                return -2
+            if size > 0:
+                ptr += size
+            arrays[i].buf_ptr += arrays[i].stride
+            arrays[i].mask_ptr += 1
+
+    pos[0] = ptr
+    return 0
+
+
+cdef inline int copy_cell(ArrDesc *arr, char *ptr, Py_ssize_t size) nogil:
+    """
+    Copy a (big-endian) cell into a fixed-width array, masking null and empty
+    values. Returns -1 if the cell is not as wide as the array's values.
+    """
+    if size <= 0:
+        memcpy(<char *> arr.mask_ptr, &mask_true, 1)
+    elif size == arr.stride:
+        memcpy(<char *> arr.buf_ptr, ptr, size)
+    else:
+        return -1
+    return 0
+
+
+cdef inline int32_t read_int_nogil(char *ptr) nogil:
+    cdef uint8_t *p = <uint8_t *> ptr
+    return <int32_t> ((<uint32_t> p[0] << 24) | (<uint32_t> p[1] << 16) |
+                      (<uint32_t> p[2] << 8) | <uint32_t> p[3])
+
+
+cdef raise_bad_cell_size(ParseDesc desc, ArrDesc *arrays, Py_ssize_t i):
+    raise DriverException('Failed decoding result column "%s" of type %s: expected %d bytes per value' %
+                          (desc.colnames[i], desc.coltypes[i].cql_parameterized_type(), arrays[i].stride))
+
+
 def make_native_byteorder(arr):
     """
     Make sure all values have a native endian in the NumPy arrays.
@@ -14,23 +14,211 @@
 
 include "ioutils.pyx"
 
-from cassandra import DriverException
+from cassandra import DriverException, cqltypes
+from cassandra.util import OrderedDict
 from cassandra.bytesio cimport BytesIOReader
 from cassandra.deserializers cimport Deserializer, from_binary
 from cassandra.parsing cimport ParseDesc, ColumnParser, RowParser
 from cassandra.tuple cimport tuple_new, tuple_set
 
+from cpython.dict cimport PyDict_SetItem
+from cpython.ref cimport PyObject, Py_DECREF
+from cpython cimport array
+from libc.stdlib cimport malloc, free
+
+from cassandra.buffer cimport Buffer
+
+
+cdef extern from "Python.h":
+    ctypedef struct PyTypeObject:
+        PyObject *(*tp_alloc)(PyTypeObject *, Py_ssize_t) except NULL
+
+
+cdef enum RowKind:
+    TUPLE_ROWS
+    NAMED_TUPLE_ROWS
+    DICT_ROWS
+
+
+cdef enum ColumnKind:
+    OBJECT_COLUMN
+    INT64_COLUMN
+    DOUBLE_COLUMN
+
 
 cdef class ListParser(ColumnParser):
-    """Decode a ResultMessage into a list of tuples (or other objects)"""
+    """
+    Decode a ResultMessage into a list of tuples (or other objects).
+
+    Given one of the row factories tuple_factory, named_tuple_factory or
+    dict_factory, rows are built as that factory's rows while decoding, rather
+    than as tuples that the factory then turns into rows.
+    """
+
+    cdef readonly object row_factory
+    cdef RowKind row_kind
+
+    def __init__(self, row_factory=None):
+        self.row_factory = row_factory
+        if row_factory is None:
+            # built while cassandra.protocol is imported, which cassandra.query imports
+            self.row_kind = TUPLE_ROWS
+            return
+
+        from cassandra import query
+
+        if row_factory is query.tuple_factory:
+            self.row_kind = TUPLE_ROWS
+        elif row_factory is query.named_tuple_factory:
+            self.row_kind = NAMED_TUPLE_ROWS
+        elif row_factory is query.dict_factory:
+            self.row_kind = DICT_ROWS
+        else:
+            raise ValueError("Rows cannot be built for row factory %r" % (row_factory,))
+
+    def with_row_factory(self, row_factory):
+        """
+        Returns a ListParser building rows for `row_factory` (or a
+        ColumnarParser for columnar_factory), or None if it is not one of the
+        row factories supported.
+        """
+        from cassandra import query
+
+        if row_factory is query.columnar_factory:
+            return ColumnarParser()
+        try:
+            return ListParser(row_factory)
+        except ValueError:
+            return None
 
     cpdef parse_rows(self, BytesIOReader reader, ParseDesc desc):
         cdef Py_ssize_t i, rowcount
         rowcount = read_int(reader)
-        cdef RowParser rowparser = TupleRowParser()
+        cdef RowParser rowparser
+        if self.row_kind == NAMED_TUPLE_ROWS:
+            from cassandra.query import row_class_cache
+            rowparser = NamedTupleRowParser(row_class_cache.get(desc.colnames))
+        elif self.row_kind == DICT_ROWS:
+            rowparser = DictRowParser()
+        else:
+            rowparser = TupleRowParser()
         return [rowparser.unpack_row(reader, desc) for i in range(rowcount)]
 
 
+_int64_column_types = frozenset([cqltypes.ByteType, cqltypes.ShortType, cqltypes.Int32Type, cqltypes.LongType,
+                                  cqltypes.CounterColumnType, cqltypes._RawDateType])
+_double_column_types = frozenset([cqltypes.FloatType, cqltypes.DoubleType])
+# decoded as objects, then made arrays like columnar_factory does if every value fits in 64 bits
+_varint_column_types = frozenset([cqltypes.IntegerType])
+
+
+cdef class ColumnarParser(ColumnParser):
+    """
+    Decode a ResultMessage into a dict of columns, as built by
+    columnar_factory: integer columns into arrays of 64-bit integers, float
+    and double columns into arrays of doubles, and other columns into lists.
+    Varint columns are arrays when all of their values fit in 64 bits.
+    """
+
+    cdef readonly object row_factory
+
+    def __init__(self):
+        from cassandra import query
+        self.row_factory = query.columnar_factory
+
+    cpdef parse_rows(self, BytesIOReader reader, ParseDesc desc):
+        from cassandra.query import int64_typecode, _make_column
+
+        cdef Py_ssize_t i, j, rowcount, rowsize = desc.rowsize
+        cdef Buffer buf
+        cdef list columns = []
+        cdef list nulls = [None] * rowsize
+        cdef array.array column_array
+        cdef ColumnKind *kinds
+        cdef char **data
+
+        rowcount = read_int(reader)
+        kinds = <ColumnKind *>malloc(rowsize * sizeof(ColumnKind))
+        data = <char **>malloc(rowsize * sizeof(char *))
+        if (kinds is NULL or data is NULL) and rowsize:
+            free(kinds)
+            free(data)
+            raise MemoryError()
+
+        try:
+            for i in range(rowsize):
+                coltype = desc.coltypes[i]
+                # empty pages are lists, as built by columnar_factory
+                if rowcount and int64_typecode and coltype in _int64_column_types:
+                    kinds[i] = INT64_COLUMN
+                    column_array = array.clone(array.array(int64_typecode), rowcount, False)
+                elif rowcount and coltype in _double_column_types:
+                    kinds[i] = DOUBLE_COLUMN
+                    column_array = array.clone(array.array('d'), rowcount, False)
+                else:
+                    kinds[i] = OBJECT_COLUMN
+                    columns.append([None] * rowcount)
+                    continue
+                data[i] = column_array.data.as_chars
+                columns.append(column_array)
+
+            for j in range(rowcount):
+                for i in range(rowsize):
+                    if kinds[i] == OBJECT_COLUMN:
+                        (<list>columns[i])[j] = unpack_cell(reader, desc, i)
+                        continue
+
+                    get_buf(reader, &buf)
+                    if buf.size <= 0:
+                        # null, like empty numbers: the column will be a list
+                        if nulls[i] is None:
+                            nulls[i] = []
+                        nulls[i].append(j)
+                    elif kinds[i] == INT64_COLUMN:
+                        (<int64_t *>data[i])[j] = unpack_int64(&buf, desc, i)
+                    else:
+                        (<double *>data[i])[j] = unpack_double(&buf, desc, i)
+        finally:
+            free(kinds)
+            free(data)
+
+        for i in range(rowsize):
+            if nulls[i] is not None:
+                column = columns[i].tolist()
+                for j in nulls[i]:
+                    column[j] = None
+                columns[i] = column
+            elif desc.coltypes[i] in _varint_column_types:
+                columns[i] = _make_column(columns[i])
+
+        return dict(zip(desc.colnames, columns))
+
+
+cdef inline int64_t unpack_int64(Buffer *buf, ParseDesc desc, Py_ssize_t i) except? -1:
+    if buf.size == 8:
+        return unpack_num[int64_t](buf)
+    elif buf.size == 4:
+        return unpack_num[int32_t](buf)
+    elif buf.size == 2:
+        return unpack_num[int16_t](buf)
+    elif buf.size == 1:
+        return unpack_num[int8_t](buf)
+    raise_bad_size(buf, desc, i)
+
+
+cdef inline double unpack_double(Buffer *buf, ParseDesc desc, Py_ssize_t i) except? -1:
+    if buf.size == 8:
+        return unpack_num[double](buf)
+    elif buf.size == 4:
+        return unpack_num[float](buf)
+    raise_bad_size(buf, desc, i)
+
+
+cdef raise_bad_size(Buffer *buf, ParseDesc desc, Py_ssize_t i):
+    raise DriverException('Failed decoding result column "%s" of type %s: unexpected size %d' %
+                          (desc.colnames[i], desc.coltypes[i].cql_parameterized_type(), buf.size))
+
+
 cdef class LazyParser(ColumnParser):
     """Decode a ResultMessage lazily using a generator"""
 
@@ -40,6 +228,130 @@ cdef class LazyParser(ColumnParser):
         return parse_rows_lazy(reader, desc)
 
 
+cdef struct Cell:
+    Py_ssize_t offset
+    Py_ssize_t size
+
+
+cdef object _undecoded = object()
+
+
+cdef class _LazyPage:
+    """The data and description shared by the LazyRows of a page"""
+
+    cdef bytes data
+    cdef ParseDesc desc
+    cdef dict name_index
+
+    def __init__(self, bytes data, ParseDesc desc):
+        self.data = data
+        self.desc = desc
+        self.name_index = dict((name, i) for i, name in enumerate(desc.colnames))
+
+
+cdef class LazyRow:
+    """
+    A result row that decodes each of its columns on first access, and keeps
+    the result. Columns are accessed by position or by name:
+
+        row[0], row['name'], row[-2:]
+
+    Rows otherwise behave as tuples of all their (decoded) values. A row keeps
+    the data of its whole result page alive.
+    """
+
+    cdef _LazyPage page
+    cdef Cell *cells
+    cdef list values
+
+    def __init__(self):
+        raise TypeError("LazyRows are created by LazyRowParser")
+
+    def __dealloc__(self):
+        free(self.cells)
+
+    cdef object get(self, Py_ssize_t i):
+        cdef Buffer buf
+        val = self.values[i]
+        if val is _undecoded:
+            # Cells without a value (null or empty) have no position in the page
+            buf.ptr = <char *>self.page.data + self.cells[i].offset if self.cells[i].size > 0 else NULL
+            buf.size = self.cells[i].size
+            val = decode_cell(&buf, self.page.desc, i)
+            self.values[i] = val
+        return val
+
+    def __getitem__(self, key):
+        cdef Py_ssize_t i, rowsize = len(self.values)
+        if isinstance(key, slice):
+            return tuple([self.get(i) for i in range(*key.indices(rowsize))])
+        if isinstance(key, (int, long)):
+            i = key
+            if i < 0:
+                i += rowsize
+            if not 0 <= i < rowsize:
+                raise IndexError("row index out of range")
+            return self.get(i)
+        return self.get(self.page.name_index[key])
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        cdef Py_ssize_t i
+        return iter([self.get(i) for i in range(len(self.values))])
+
+    def _asdict(self):
+        """Returns an ordered dict relating column names to (decoded) values"""
+        return OrderedDict(zip(self.page.desc.colnames, self))
+
+    def __richcmp__(self, other, int op):
+        if op == 2:
+            return tuple(self) == other
+        elif op == 3:
+            return tuple(self) != other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __reduce__(self):
+        return tuple, (tuple(self),)
+
+    def __repr__(self):
+        return "LazyRow(%s)" % ", ".join("%s=%r" % (name, val) for name, val in zip(self.page.desc.colnames, self))
+
+
+cdef class LazyRowParser(ColumnParser):
+    """
+    Decode a ResultMessage into a list of LazyRows, which only locate their
+    columns up front and decode each of them on first access
+    """
+
+    cpdef parse_rows(self, BytesIOReader reader, ParseDesc desc):
+        cdef Py_ssize_t i, j, rowcount
+        cdef Buffer buf
+        cdef LazyRow row
+        cdef char *page_ptr = reader.buf_ptr
+        cdef _LazyPage page = _LazyPage(reader.buf, desc)
+        cdef list rows = []
+
+        rowcount = read_int(reader)
+        for i in range(rowcount):
+            row = LazyRow.__new__(LazyRow)
+            row.page = page
+            row.values = [_undecoded] * desc.rowsize
+            row.cells = <Cell *>malloc(desc.rowsize * sizeof(Cell))
+            if row.cells is NULL and desc.rowsize:
+                raise MemoryError()
+            for j in range(desc.rowsize):
+                get_buf(reader, &buf)
+                row.cells[j].offset = buf.ptr - page_ptr if buf.size > 0 else 0
+                row.cells[j].size = buf.size
+            rows.append(row)
+        return rows
+
+
 def parse_rows_lazy(BytesIOReader reader, ParseDesc desc):
     cdef Py_ssize_t i, rowcount
     rowcount = read_int(reader)
@@ -57,24 +369,82 @@ cdef class TupleRowParser(RowParser):
     cpdef unpack_row(self, BytesIOReader reader, ParseDesc desc):
         assert desc.rowsize >= 0
 
-        cdef Buffer buf
         cdef Py_ssize_t i, rowsize = desc.rowsize
-        cdef Deserializer deserializer
         cdef tuple res = tuple_new(desc.rowsize)
 
         for i in range(rowsize):
-            # Read the next few bytes
-            get_buf(reader, &buf)
-
-            # Deserialize bytes to python object
-            deserializer = desc.deserializers[i]
-            try:
-                val = from_binary(deserializer, &buf, desc.protocol_version)
-            except Exception as e:
-                raise DriverException('Failed decoding result column "%s" of type %s: %s' % (desc.colnames[i],
-                                                                                             desc.coltypes[i].cql_parameterized_type(),
-                                                                                             str(e)))
             # Insert new object into tuple
-            tuple_set(res, i, val)
+            tuple_set(res, i, unpack_cell(reader, desc, i))
+
+        return res
+
+
+cdef class NamedTupleRowParser(RowParser):
+    """
+    Parse a single returned row into an instance of a namedtuple class, as
+    built by named_tuple_factory:
+
+        Row(obj1, ..., objN)
+    """
+
+    cdef object row_class
+
+    def __init__(self, row_class):
+        self.row_class = row_class
+
+    cpdef unpack_row(self, BytesIOReader reader, ParseDesc desc):
+        assert desc.rowsize >= 0
+
+        cdef Py_ssize_t i, rowsize = desc.rowsize
+        cdef PyTypeObject *row_type = <PyTypeObject *>self.row_class
+        # A namedtuple class only adds methods to tuple, so its instances are
+        # tuples of another type: allocate one and fill it in place
+        cdef tuple res = <tuple>row_type.tp_alloc(row_type, rowsize)
+        # tp_alloc returns a new reference, which the cast above has taken
+        # another one on
+        Py_DECREF(res)
+
+        for i in range(rowsize):
+            tuple_set(res, i, unpack_cell(reader, desc, i))
 
         return res
+
+
+cdef class DictRowParser(RowParser):
+    """
+    Parse a single returned row into a dict, as built by dict_factory:
+
+        {name1: obj1, ..., nameN: objN}
+    """
+
+    cpdef unpack_row(self, BytesIOReader reader, ParseDesc desc):
+        assert desc.rowsize >= 0
+
+        cdef Py_ssize_t i, rowsize = desc.rowsize
+        cdef dict res = {}
+
+        for i in range(rowsize):
+            PyDict_SetItem(res, desc.colnames[i], unpack_cell(reader, desc, i))
+
+        return res
+
+
+cdef inline object unpack_cell(BytesIOReader reader, ParseDesc desc, Py_ssize_t i):
+    cdef Buffer buf
+
+    # Read the next few bytes
+    get_buf(reader, &buf)
+    return decode_cell(&buf, desc, i)
+
+
+cdef inline object decode_cell(Buffer *buf, ParseDesc desc, Py_ssize_t i):
+    cdef Deserializer deserializer
+
+    # Deserialize bytes to python object
+    deserializer = desc.deserializers[i]
+    try:
+        return from_binary(deserializer, buf, desc.protocol_version)
+    except Exception as e:
+        raise DriverException('Failed decoding result column "%s" of type %s: %s' % (desc.colnames[i],
+                                                                                     desc.coltypes[i].cql_parameterized_type(),
+                                                                                     str(e)))
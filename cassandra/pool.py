@@ -347,10 +347,9 @@ class HostConnection(object):
         start = time.time()
         remaining = timeout
         while True:
-            with conn.lock:
-                if conn.in_flight <= conn.max_request_id:
-                    conn.in_flight += 1
-                    return conn, conn.get_request_id()
+            request_id = conn.get_request_id()
+            if request_id is not None:
+                return conn, request_id
             if timeout is not None:
                 remaining = timeout - time.time() + start
                 if remaining < 0:
@@ -361,8 +360,6 @@ class HostConnection(object):
         raise NoConnectionsAvailable("All request IDs are currently in use")
 
     def return_connection(self, connection):
-        with connection.lock:
-            connection.in_flight -= 1
         with self._stream_available_condition:
             self._stream_available_condition.notify()
 
@@ -524,19 +521,13 @@ class HostConnectionPool(object):
             request_id = None
             # to avoid another thread closing this connection while
             # trashing it (through the return_connection process), hold
-            # the connection lock from this point until we've incremented
-            # its in_flight count
-            need_to_wait = False
+            # the connection lock while taking a request id, which
+            # increments its in_flight count
             with least_busy.lock:
-                if least_busy.in_flight < least_busy.max_request_id:
-                    least_busy.in_flight += 1
-                    request_id = least_busy.get_request_id()
-                else:
-                    # once we release the lock, wait for another connection
-                    need_to_wait = True
+                request_id = least_busy.get_request_id(least_busy.max_request_id)
 
-            if need_to_wait:
-                # wait_for_conn will increment in_flight on the conn
+            if request_id is None:
+                # wait_for_conn will take a request id on the conn
                 least_busy, request_id = self._wait_for_conn(timeout)
 
             # if we have too many requests on this connection but we still
@@ -634,18 +625,17 @@ class HostConnectionPool(object):
             if conns:
                 least_busy = min(conns, key=lambda c: c.in_flight)
                 with least_busy.lock:
-                    if least_busy.in_flight < least_busy.max_request_id:
-                        least_busy.in_flight += 1
-                        return least_busy, least_busy.get_request_id()
+                    request_id = least_busy.get_request_id(least_busy.max_request_id)
+                if request_id is not None:
+                    return least_busy, request_id
 
             remaining = timeout - (time.time() - start)
 
         raise NoConnectionsAvailable()
 
     def return_connection(self, connection):
-        with connection.lock:
-            connection.in_flight -= 1
-            in_flight = connection.in_flight
+        # the request id was released when the response was processed
+        in_flight = connection.in_flight
 
         if connection.is_defunct or connection.is_closed:
             if not connection.signaled_error:
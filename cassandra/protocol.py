@@ -16,6 +16,7 @@ from __future__ import absolute_import  # to enable import io from stdlib
 from collections import namedtuple
 import logging
 import socket
+from threading import Lock
 from uuid import UUID
 
 import six
@@ -39,7 +40,8 @@ from cassandra.cqltypes import (AsciiType, BytesType, BooleanType,
                                 LongType, MapType, SetType, TimeUUIDType,
                                 UTF8Type, VarcharType, UUIDType, UserType,
                                 TupleType, lookup_casstype, SimpleDateType,
-                                TimeType, ByteType, ShortType, DurationType)
+                                TimeType, ByteType, ShortType, DurationType,
+                                raw_scalar_types, blob_memoryview_types)
 from cassandra.policies import WriteType
 from cassandra.cython_deps import HAVE_CYTHON, HAVE_NUMPY
 from cassandra import util
@@ -595,6 +597,18 @@ class ResultMessage(_MessageType):
     results = None
     paging_state = None
 
+    row_factory = None
+    """
+    For ROWS results ``(colnames, rows)``, the row factory that the rows were
+    built with while decoding, or None if they are tuples.
+    """
+
+    type_overrides = None
+    """
+    An optional dict mapping result column types to the types used to decode
+    them instead. The column types reported in ``col_types`` are unchanged.
+    """
+
     # Names match type name in module scope. Most are imported from cassandra.cqltypes (except CUSTOM_TYPE)
     type_codes = _cqltypes_by_code = dict((v, globals()[k]) for k, v in type_codes.__dict__.items() if not k.startswith('_'))
 
@@ -637,22 +651,33 @@ class ResultMessage(_MessageType):
         rows = [cls.recv_row(f, len(column_metadata)) for _ in range(rowcount)]
         colnames = [c[2] for c in column_metadata]
         coltypes = [c[3] for c in column_metadata]
+        decode_types = cls.decode_types(coltypes)
         try:
             parsed_rows = [
                 tuple(ctype.from_binary(val, protocol_version)
-                      for ctype, val in zip(coltypes, row))
+                      for ctype, val in zip(decode_types, row))
                 for row in rows]
         except Exception:
             for row in rows:
                 for i in range(len(row)):
                     try:
-                        coltypes[i].from_binary(row[i], protocol_version)
+                        decode_types[i].from_binary(row[i], protocol_version)
                     except Exception as e:
                         raise DriverException('Failed decoding result column "%s" of type %s: %s' % (colnames[i],
                                                                                                      coltypes[i].cql_parameterized_type(),
                                                                                                      str(e)))
         return paging_state, coltypes, (colnames, parsed_rows)
 
+    @classmethod
+    def decode_types(cls, coltypes):
+        """
+        Returns the types to decode columns of the given types with.
+        """
+        overrides = cls.type_overrides
+        if not overrides:
+            return coltypes
+        return [overrides.get(ctype, ctype) for ctype in coltypes]
+
     @classmethod
     def recv_results_prepared(cls, f, protocol_version, user_type_map):
         query_id = read_binary_string(f)
@@ -985,6 +1010,14 @@ class _ProtocolHandler(object):
     result decoding implementations.
     """
 
+    @classmethod
+    def _for_row_factory(cls, row_factory):
+        """
+        Returns a handler decoding rows straight into rows of `row_factory` if
+        there is one, or this handler.
+        """
+        return cls
+
     @classmethod
     def encode_message(cls, msg, stream_id, protocol_version, compressor, allow_beta_protocol_version):
         """
@@ -1088,12 +1121,17 @@ class _ProtocolHandler(object):
 
         return msg
 
+
+# handlers kept per Cython protocol handler for (handler class, row factory) pairs
+_row_factory_handlers_maxsize = 64
+
+
 def cython_protocol_handler(colparser):
     """
     Given a column parser to deserialize ResultMessages, return a suitable
     Cython-based protocol handler.
 
-    There are three Cython-based protocol handlers:
+    There are five Cython-based protocol handlers:
 
         - obj_parser.ListParser
             decodes result messages into a list of tuples
@@ -1101,12 +1139,25 @@ def cython_protocol_handler(colparser):
         - obj_parser.LazyParser
             decodes result messages lazily by returning an iterator
 
+        - obj_parser.LazyRowParser
+            decodes result messages into a list of rows decoding each of
+            their columns on first access
+
+        - json_parser.JsonParser
+            decodes result messages into JSON documents
+
         - numpy_parser.NumPyParser
             decodes result messages into NumPy arrays
 
     The default is to use obj_parser.ListParser
     """
     from cassandra.row_parser import make_recv_results_rows
+    from cassandra.message_encoder import encode_message as encode_request_frame
+
+    # (handler class, row factory) -> handler building the factory's rows, least recently
+    # used first: factories may be built per request, so this keeps the last few only
+    row_factory_handlers = util.OrderedDict()
+    row_factory_handlers_lock = Lock()
 
     class FastResultMessage(ResultMessage):
         """
@@ -1116,10 +1167,12 @@ def cython_protocol_handler(colparser):
         # type_codes = ResultMessage.type_codes.copy()
         code_to_type = dict((v, k) for k, v in ResultMessage.type_codes.items())
         recv_results_rows = classmethod(make_recv_results_rows(colparser))
+        row_factory = staticmethod(getattr(colparser, 'row_factory', None))
 
     class CythonProtocolHandler(_ProtocolHandler):
         """
-        Use FastResultMessage to decode query result message messages.
+        Use FastResultMessage to decode query result message messages,
+        and encode QUERY, EXECUTE and BATCH messages in Cython.
         """
 
         my_opcodes = _ProtocolHandler.message_types_by_opcode.copy()
@@ -1128,17 +1181,56 @@ def cython_protocol_handler(colparser):
 
         col_parser = colparser
 
+        @classmethod
+        def _for_row_factory(cls, row_factory):
+            key = (cls, row_factory)
+            with row_factory_handlers_lock:
+                handler = row_factory_handlers.pop(key, None)
+                if handler is not None:
+                    row_factory_handlers[key] = handler
+                    return handler
+
+            result_message = cls.message_types_by_opcode[ResultMessage.opcode]
+            with_row_factory = getattr(cls.col_parser, 'with_row_factory', None)
+            parser = with_row_factory(row_factory) if with_row_factory else None
+            if parser is None or not issubclass(result_message, FastResultMessage):
+                # unsupported factory, or results decoded by a message of the user's
+                handler = cls
+            else:
+                result_message = type(result_message.__name__, (result_message,), {
+                    'recv_results_rows': classmethod(make_recv_results_rows(parser)),
+                    'row_factory': staticmethod(row_factory)})
+                opcodes = cls.message_types_by_opcode.copy()
+                opcodes[ResultMessage.opcode] = result_message
+                handler = type(cls.__name__, (cls,), {'message_types_by_opcode': opcodes, 'col_parser': parser})
+
+            with row_factory_handlers_lock:
+                row_factory_handlers[key] = handler
+                while len(row_factory_handlers) > _row_factory_handlers_maxsize:
+                    row_factory_handlers.popitem(last=False)
+            return handler
+
+        @classmethod
+        def encode_message(cls, msg, stream_id, protocol_version, compressor, allow_beta_protocol_version):
+            frame = encode_request_frame(msg, stream_id, protocol_version, compressor, allow_beta_protocol_version)
+            if frame is None:
+                frame = super(CythonProtocolHandler, cls).encode_message(msg, stream_id, protocol_version,
+                                                                         compressor, allow_beta_protocol_version)
+            return frame
+
     return CythonProtocolHandler
 
 
 if HAVE_CYTHON:
-    from cassandra.obj_parser import ListParser, LazyParser
+    from cassandra.obj_parser import ListParser, LazyParser, LazyRowParser
     ProtocolHandler = cython_protocol_handler(ListParser())
     LazyProtocolHandler = cython_protocol_handler(LazyParser())
+    LazyRowProtocolHandler = cython_protocol_handler(LazyRowParser())
 else:
     # Use Python-based ProtocolHandler
     ProtocolHandler = _ProtocolHandler
     LazyProtocolHandler = None
+    LazyRowProtocolHandler = None
 
 
 if HAVE_CYTHON and HAVE_NUMPY:
@@ -1148,6 +1240,90 @@ else:
     NumpyProtocolHandler = None
 
 
+def raw_scalar_protocol_handler(protocol_handler=ProtocolHandler):
+    """
+    Given a protocol handler, returns one that decodes result columns of the
+    types most costly to turn into Python objects as plain values instead:
+
+        - timestamp columns as integer milliseconds since the epoch, or as
+          ``datetime64[ms]`` arrays with :data:`NumpyProtocolHandler`
+        - uuid and timeuuid columns as their 16 bytes
+        - inet columns as the packed 4 or 16 address bytes
+
+    Values nested in collections, tuples and UDTs are decoded as usual.
+    This is meant for readers that never need the rich objects, and is
+    enabled per session::
+
+        >>> from cassandra.protocol import NumpyProtocolHandler, raw_scalar_protocol_handler
+        >>> session.client_protocol_handler = raw_scalar_protocol_handler(NumpyProtocolHandler)
+
+    .. versionadded:: 3.12.0
+    """
+    return _type_override_protocol_handler(protocol_handler, raw_scalar_types, 'RawScalar')
+
+
+def blob_memoryview_protocol_handler(protocol_handler=ProtocolHandler):
+    """
+    Given a protocol handler, returns one that decodes blob result columns as
+    read-only ``memoryview`` slices rather than ``bytes`` copies.
+
+    With the Cython-based handlers the views point straight into the received
+    result page, so cells are never copied. The page stays in memory for as
+    long as any view over it is alive; convert views that are kept around
+    with ``bytes(view)``. Blobs nested in collections, tuples and UDTs are
+    decoded as usual. This can be combined with :func:`raw_scalar_protocol_handler`::
+
+        >>> from cassandra.protocol import blob_memoryview_protocol_handler
+        >>> session.client_protocol_handler = blob_memoryview_protocol_handler()
+
+    .. versionadded:: 3.12.0
+    """
+    return _type_override_protocol_handler(protocol_handler, blob_memoryview_types, 'BlobMemoryview')
+
+
+def json_protocol_handler(page_documents=False, timestamp_format='iso', uuid_format='canonical'):
+    """
+    Returns a Cython-based protocol handler that writes result rows straight
+    into JSON documents, as UTF-8 encoded ``bytes``, without building Python
+    objects for the values of most column types. The rows of result sets are
+    then one JSON object per row, mapping column names to values, or a single
+    JSON array of these objects per page if `page_documents` is set.
+
+    `timestamp_format` is either ``'iso'`` (``"2017-06-01T12:30:05.123Z"``) or
+    ``'epoch_ms'`` (integer milliseconds since the epoch), and `uuid_format`
+    either ``'canonical'`` (``"d2177dd0-eaa2-11de-a572-001b779c76e3"``) or
+    ``'hex'`` (the same without dashes). Blobs are written as ``"0x..."``
+    strings and non-ASCII text as is. Columns of other types are decoded, and
+    encoded with :mod:`json`: decimals, dates and times as strings, collections
+    and tuples as arrays, maps and user types as objects.
+
+    The documents are the rows whatever the session's row factory, which is
+    not applied to them::
+
+        >>> from cassandra.protocol import json_protocol_handler
+        >>> session.client_protocol_handler = json_protocol_handler(timestamp_format='epoch_ms')
+        >>> documents = list(session.execute("SELECT * FROM users"))
+
+    This requires the Cython extensions.
+
+    .. versionadded:: 3.12.0
+    """
+    if not HAVE_CYTHON:
+        raise DriverException("json_protocol_handler requires the Cython extensions")
+    from cassandra.json_parser import JsonParser
+    return cython_protocol_handler(JsonParser(page_documents, timestamp_format, uuid_format))
+
+
+def _type_override_protocol_handler(protocol_handler, type_overrides, name_prefix):
+    result_message = protocol_handler.message_types_by_opcode[ResultMessage.opcode]
+    overrides = dict(result_message.type_overrides or {})
+    overrides.update(type_overrides)
+    result_message = type(result_message.__name__, (result_message,), {'type_overrides': overrides})
+    opcodes = protocol_handler.message_types_by_opcode.copy()
+    opcodes[ResultMessage.opcode] = result_message
+    return type(name_prefix + protocol_handler.__name__, (protocol_handler,), {'message_types_by_opcode': opcodes})
+
+
 def read_byte(f):
     return int8_unpack(f.read(1))
 
@@ -18,20 +18,34 @@ specifying consistency levels and retry policies for individual
 queries.
 """
 
+from array import array
 from collections import namedtuple
 from datetime import datetime, timedelta
 import re
 import struct
+from threading import Lock
 import time
 import six
 from six.moves import range, zip
 
-from cassandra import ConsistencyLevel, OperationTimedOut
+from cassandra import ConsistencyLevel, OperationTimedOut, cqltypes
+from cassandra.cython_deps import HAVE_CYTHON, HAVE_NUMPY
 from cassandra.util import unix_time_from_uuid1
 from cassandra.encoder import Encoder
+from cassandra.marshal import uint16_pack
 import cassandra.encoder
 from cassandra.protocol import _UNSET_VALUE
-from cassandra.util import OrderedDict, _sanitize_identifiers
+from cassandra.util import OrderedDict, _sanitize_identifiers, int64_typecode
+
+if HAVE_CYTHON:
+    from cassandra.serializers import make_serializers
+else:
+    make_serializers = None  # NOQA
+
+if HAVE_NUMPY:
+    import numpy as np
+else:
+    np = None  # NOQA
 
 import logging
 log = logging.getLogger(__name__)
@@ -113,9 +127,14 @@ def named_tuple_factory(colnames, rows):
     .. versionchanged:: 2.0.0
         moved from ``cassandra.decoder`` to ``cassandra.query``
     """
+    Row = row_class_cache.get(colnames)
+    return [Row(*row) for row in rows]
+
+
+def _make_row_class(colnames):
     clean_column_names = map(_clean_column_name, colnames)
     try:
-        Row = namedtuple('Row', clean_column_names)
+        return namedtuple('Row', clean_column_names)
     except Exception:
         clean_column_names = list(map(_clean_column_name, colnames))  # create list because py3 map object will be consumed by first attempt
         log.warning("Failed creating named tuple for results with column names %s (cleaned: %s) "
@@ -124,9 +143,87 @@ def named_tuple_factory(colnames, rows):
                     "Avoid this by choosing different names, using SELECT \"<col name>\" AS aliases, "
                     "or specifying a different row_factory on your Session" %
                     (colnames, clean_column_names))
-        Row = namedtuple('Row', _sanitize_identifiers(clean_column_names))
+        return namedtuple('Row', _sanitize_identifiers(clean_column_names))
 
-    return [Row(*row) for row in rows]
+
+class RowClassCache(object):
+    """
+    A least-recently-used cache of the `namedtuple` row classes built by
+    :func:`named_tuple_factory`, keyed by the tuple of result column names.
+    Building a namedtuple class is far more expensive than building a row,
+    so it is done once per distinct set of columns rather than once per
+    result page.
+
+    The module-level instance used by the driver is :data:`row_class_cache`.
+
+    .. versionadded:: 3.12.0
+    """
+
+    maxsize = 256
+    """
+    The number of row classes kept before the least recently used is evicted.
+    """
+
+    hits = 0
+    """
+    The number of lookups answered from the cache.
+    """
+
+    misses = 0
+    """
+    The number of lookups that had to build a new row class.
+    """
+
+    evictions = 0
+    """
+    The number of row classes evicted to stay within :attr:`maxsize`.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._classes = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, colnames):
+        """
+        Returns the row class for `colnames`, building it if needed.
+        """
+        key = tuple(colnames)
+        with self._lock:
+            Row = self._classes.pop(key, None)
+            if Row is not None:
+                self._classes[key] = Row
+                self.hits += 1
+                return Row
+            self.misses += 1
+
+        Row = _make_row_class(key)
+        with self._lock:
+            self._classes[key] = Row
+            while len(self._classes) > self.maxsize:
+                self._classes.popitem(last=False)
+                self.evictions += 1
+        return Row
+
+    def clear(self):
+        """
+        Drops all cached row classes and resets the counters.
+        """
+        with self._lock:
+            self._classes.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._classes)
+
+
+row_class_cache = RowClassCache()
+"""
+The :class:`RowClassCache` shared by :func:`named_tuple_factory` and the
+Cython result parsers.
+
+.. versionadded:: 3.12.0
+"""
 
 
 def dict_factory(colnames, rows):
@@ -159,6 +256,46 @@ def ordered_dict_factory(colnames, rows):
     return [OrderedDict(zip(colnames, row)) for row in rows]
 
 
+def columnar_factory(colnames, rows):
+    """
+    Returns each page of rows as a dict of columns by column name. This is
+    meant for aggregations over many rows, without NumPy: a column is an
+    :class:`array.array` of 64-bit integers (typecode ``'q'``) if all of its
+    values are integers (tinyint, smallint, int, bigint, counter, and varint
+    values that fit in 64 bits), or of doubles (typecode ``'d'``) if they are
+    all floats or doubles. Other columns, and numeric columns holding nulls,
+    are lists.
+
+    The rows of a result set are then pages rather than rows::
+
+        >>> from cassandra.query import columnar_factory
+        >>> session.row_factory = columnar_factory
+        >>> total = 0
+        >>> for page in session.execute("SELECT id, value FROM readings"):
+        ...     total += sum(page['value'])
+
+    With the Cython extensions, :class:`~cassandra.protocol.ProtocolHandler`
+    decodes result pages straight into these columns, without building rows.
+
+    .. versionadded:: 3.12.0
+    """
+    return dict((name, _make_column([row[i] for row in rows])) for i, name in enumerate(colnames))
+
+
+def _make_column(values):
+    value_types = set(type(v) for v in values)
+    if not value_types:
+        return values
+    if int64_typecode and value_types <= set(six.integer_types):
+        try:
+            return array(int64_typecode, values)
+        except OverflowError:  # varint
+            return values
+    if value_types == set([float]):
+        return array('d', values)
+    return values
+
+
 FETCH_SIZE_UNSET = object()
 
 
@@ -393,7 +530,7 @@ class PreparedStatement(object):
     query_string = None
     result_metadata = None
     routing_key_indexes = None
-    _routing_key_index_set = None
+    _bind_plan = None
     serial_consistency_level = None
 
     def __init__(self, column_metadata, query_id, routing_key_indexes, query,
@@ -446,10 +583,39 @@ class PreparedStatement(object):
         """
         return BoundStatement(self).bind(values)
 
+    def bind_columns(self, columns):
+        """
+        Binds whole columns of values at once and returns an iterator of
+        :class:`BoundStatement`, one per row, ready for :func:`.execute_concurrent`.
+
+        `columns` is either a dict relating bind parameter names to sequences of
+        values, or a sequence of such columns in bind order. All columns must have
+        the same length. Missing columns follow the rules of :meth:`BoundStatement.bind`
+        for missing values.
+
+        One-dimensional NumPy arrays bound to int, bigint, smallint, tinyint, counter,
+        float, double, boolean or timestamp parameters are packed with one vectorized
+        conversion per column rather than one call per value. Timestamps may be given
+        as ``datetime64`` or as integer milliseconds since the epoch. Masked entries
+        of a ``numpy.ma.MaskedArray`` are bound as null.
+
+        .. versionadded:: 3.12.0
+        """
+        plan = self._get_bind_plan()
+        raw_columns, serialized_columns = plan.serialize_columns(columns)
+        for raw_values, values in zip(zip(*raw_columns), zip(*serialized_columns)):
+            bound = BoundStatement(self)
+            bound.raw_values = raw_values
+            bound.values = list(values)
+            yield bound
+
     def is_routing_key_index(self, i):
-        if self._routing_key_index_set is None:
-            self._routing_key_index_set = set(self.routing_key_indexes) if self.routing_key_indexes else set()
-        return i in self._routing_key_index_set
+        return i in self._get_bind_plan().routing_key_index_set
+
+    def _get_bind_plan(self):
+        if self._bind_plan is None:
+            self._bind_plan = _BindPlan(self)
+        return self._bind_plan
 
     def __str__(self):
         consistency = ConsistencyLevel.value_to_name.get(self.consistency_level, 'Not Set')
@@ -458,6 +624,199 @@ class PreparedStatement(object):
     __repr__ = __str__
 
 
+class _BindPlan(object):
+    """
+    Everything :meth:`BoundStatement.bind` derives from a :class:`PreparedStatement`,
+    computed once per statement.
+    """
+
+    def __init__(self, prepared_statement):
+        self.column_metadata = col_meta = prepared_statement.column_metadata or []
+        self.protocol_version = prepared_statement.protocol_version
+        self.allow_unset = self.protocol_version >= 4
+
+        # an object with a serialize(value, protocol_version) method per column:
+        # Cython serializers when the extensions are built, the cqltypes otherwise
+        col_types = [c.type for c in col_meta]
+        self.serializers = make_serializers(col_types) if make_serializers else col_types
+        self.columns = list(zip(col_meta, self.serializers))
+        # bind markers may share a name (e.g. "a > ? AND a < ?"), so dicts are
+        # resolved by walking the names rather than through a name -> index map
+        self.names = [c.name for c in col_meta]
+
+        self.routing_key_indexes = tuple(prepared_statement.routing_key_indexes or ())
+        self.routing_key_index_set = frozenset(self.routing_key_indexes)
+
+    # big-endian dtypes of the fixed-width types that bind_columns packs a column at a time
+    _numpy_dtypes = {
+        cqltypes.Int32Type: '>i4',
+        cqltypes.LongType: '>i8',
+        cqltypes.CounterColumnType: '>i8',
+        cqltypes.ShortType: '>i2',
+        cqltypes.ByteType: '>i1',
+        cqltypes.FloatType: '>f4',
+        cqltypes.DoubleType: '>f8',
+        cqltypes.BooleanType: '?',
+        cqltypes.DateType: '>i8',
+        cqltypes.TimestampType: '>i8',
+    }
+
+    def values_from_dict(self, values_dict):
+        try:
+            return [values_dict[name] for name in self.names]
+        except KeyError as exc:
+            if not self.allow_unset:
+                raise KeyError('Column name `%s` not found in bound dict.' % (exc.args[0],))
+            return [values_dict.get(name, UNSET_VALUE) for name in self.names]
+
+    def type_error(self, col_spec, value, exc):
+        actual_type = type(value)
+        message = ('Received an argument of invalid type for column "%s". '
+                   'Expected: %s, Got: %s; (%s)' % (col_spec.name, col_spec.type, actual_type, exc))
+        return TypeError(message)
+
+    def serialize_columns(self, columns):
+        """
+        Returns the raw and the serialized values of each column given to
+        :meth:`PreparedStatement.bind_columns`, as two lists of equal-length sequences.
+        """
+        if isinstance(columns, dict):
+            columns = self.values_from_dict(columns)
+        columns = list(columns)
+
+        col_meta_len = len(self.columns)
+        if len(columns) > col_meta_len:
+            raise ValueError(
+                "Too many columns provided to bind_columns() (got %d, expected %d)" %
+                (len(columns), col_meta_len))
+        if not self.allow_unset and len(columns) < len(self.routing_key_indexes):
+            raise ValueError(
+                "Too few columns provided to bind_columns() (got %d, required %d for routing key)" %
+                (len(columns), len(self.routing_key_indexes)))
+
+        num_rows = None
+        for column in columns:
+            if column is not UNSET_VALUE:
+                if num_rows is None:
+                    num_rows = len(column)
+                elif len(column) != num_rows:
+                    raise ValueError("All columns must have the same length (got %d and %d)" %
+                                     (num_rows, len(column)))
+        num_rows = num_rows or 0
+
+        if self.allow_unset and len(columns) < col_meta_len:
+            columns.extend([UNSET_VALUE] * (col_meta_len - len(columns)))
+
+        raw_columns = []
+        serialized_columns = []
+        for i, column in enumerate(columns):
+            if column is UNSET_VALUE:
+                self.check_unset(i)
+                raw_columns.append([UNSET_VALUE] * num_rows)
+                serialized_columns.append([UNSET_VALUE] * num_rows)
+                continue
+
+            serialized = self._pack_numpy_column(i, column) if np is not None else None
+            if isinstance(column, np.ndarray if np is not None else ()):
+                if column.dtype.kind == 'M':
+                    # as datetimes, rather than integers for units finer than us
+                    column = column.astype('datetime64[us]')
+                column = column.tolist()
+            if serialized is None:
+                serialized = self._serialize_column(i, column)
+            raw_columns.append(column)
+            serialized_columns.append(serialized)
+        return raw_columns, serialized_columns
+
+    def _serialize_column(self, index, column):
+        col_spec, serializer = self.columns[index]
+        proto_version = self.protocol_version
+        serialized = []
+        append = serialized.append
+        for value in column:
+            if value is None:
+                append(None)
+            elif value is UNSET_VALUE:
+                self.check_unset(index)
+                append(UNSET_VALUE)
+            else:
+                try:
+                    append(serializer.serialize(value, proto_version))
+                except (TypeError, struct.error) as exc:
+                    raise self.type_error(col_spec, value, exc)
+        return serialized
+
+    def _pack_numpy_column(self, index, column):
+        """
+        Serializes a NumPy column of a fixed-width type with a single conversion to
+        big-endian, or returns None if it must be serialized value by value.
+        """
+        col_spec = self.column_metadata[index]
+        dtype = self._numpy_dtypes.get(col_spec.type)
+        if dtype is None or not isinstance(column, np.ndarray) or column.ndim != 1:
+            return None
+
+        mask = None
+        if isinstance(column, np.ma.MaskedArray):
+            mask = np.ma.getmaskarray(column)
+            column = column.data
+
+        kind = column.dtype.kind
+        target = np.dtype(dtype)
+        if target.kind == 'b':
+            if kind != 'b':
+                return None
+        elif target.kind == 'f':
+            # float32 is only packed from floats that already fit
+            if kind not in 'iuf' or (target.itemsize == 4 and column.dtype.itemsize > 4):
+                return None
+        elif kind == 'M':
+            if col_spec.type not in (cqltypes.DateType, cqltypes.TimestampType):
+                return None
+            column = column.astype('datetime64[ms]').view('i8')
+            # NaT is bound as null, like the None it becomes in tolist()
+            nat = column == np.iinfo('i8').min
+            mask = nat if mask is None else mask | nat
+        elif kind in 'iu':
+            # out of range values are left to the serializers to reject
+            info = np.iinfo(target)
+            valid = column if mask is None else column[~mask]
+            if valid.size and (valid.min() < info.min or valid.max() > info.max):
+                return None
+        else:
+            return None
+
+        packed = column.astype(target).tobytes()
+        width = target.itemsize
+        serialized = [packed[i:i + width] for i in range(0, len(packed), width)]
+        if mask is not None:
+            for i in np.flatnonzero(mask):
+                serialized[i] = None
+        return serialized
+
+    def check_unset(self, index):
+        if not self.allow_unset:
+            raise ValueError("Attempt to bind UNSET_VALUE while using unsuitable protocol version (%d < 4)" % self.protocol_version)
+        if index in self.routing_key_index_set:
+            raise ValueError("Cannot bind UNSET_VALUE as a part of the routing key '%s'" % self.names[index])
+
+    def routing_key(self, values):
+        """
+        Assembles the routing key from serialized `values`, as
+        :attr:`.Statement.routing_key` does for a sequence of components.
+        """
+        indexes = self.routing_key_indexes
+        if len(indexes) == 1:
+            return values[indexes[0]]
+        parts = []
+        for i in indexes:
+            value = values[i]
+            parts.append(uint16_pack(len(value)))
+            parts.append(value)
+            parts.append(b'\x00')
+        return b''.join(parts)
+
+
 class BoundStatement(Statement):
     """
     A prepared statement that has been bound to a particular set of values.
@@ -521,90 +880,60 @@ class BoundStatement(Statement):
         """
         if values is None:
             values = ()
-        proto_version = self.prepared_statement.protocol_version
-        col_meta = self.prepared_statement.column_metadata
+        plan = self.prepared_statement._get_bind_plan()
+        proto_version = plan.protocol_version
 
         # special case for binding dicts
         if isinstance(values, dict):
-            values_dict = values
-            values = []
-
-            # sort values accordingly
-            for col in col_meta:
-                try:
-                    values.append(values_dict[col.name])
-                except KeyError:
-                    if proto_version >= 4:
-                        values.append(UNSET_VALUE)
-                    else:
-                        raise KeyError(
-                            'Column name `%s` not found in bound dict.' %
-                            (col.name))
+            values = plan.values_from_dict(values)
 
         value_len = len(values)
-        col_meta_len = len(col_meta)
+        col_meta_len = len(plan.columns)
 
         if value_len > col_meta_len:
             raise ValueError(
                 "Too many arguments provided to bind() (got %d, expected %d)" %
-                (len(values), len(col_meta)))
+                (value_len, col_meta_len))
 
         # this is fail-fast for clarity pre-v4. When v4 can be assumed,
         # the error will be better reported when UNSET_VALUE is implicitly added.
-        if proto_version < 4 and self.prepared_statement.routing_key_indexes and \
-           value_len < len(self.prepared_statement.routing_key_indexes):
+        if not plan.allow_unset and value_len < len(plan.routing_key_indexes):
             raise ValueError(
                 "Too few arguments provided to bind() (got %d, required %d for routing key)" %
-                (value_len, len(self.prepared_statement.routing_key_indexes)))
+                (value_len, len(plan.routing_key_indexes)))
 
         self.raw_values = values
-        self.values = []
-        for value, col_spec in zip(values, col_meta):
+        self.values = bound = []
+        append = bound.append
+        for value, (col_spec, serializer) in zip(values, plan.columns):
             if value is None:
-                self.values.append(None)
+                append(None)
             elif value is UNSET_VALUE:
-                if proto_version >= 4:
-                    self._append_unset_value()
-                else:
-                    raise ValueError("Attempt to bind UNSET_VALUE while using unsuitable protocol version (%d < 4)" % proto_version)
+                plan.check_unset(len(bound))
+                append(UNSET_VALUE)
             else:
                 try:
-                    self.values.append(col_spec.type.serialize(value, proto_version))
+                    append(serializer.serialize(value, proto_version))
                 except (TypeError, struct.error) as exc:
-                    actual_type = type(value)
-                    message = ('Received an argument of invalid type for column "%s". '
-                               'Expected: %s, Got: %s; (%s)' % (col_spec.name, col_spec.type, actual_type, exc))
-                    raise TypeError(message)
+                    raise plan.type_error(col_spec, value, exc)
 
-        if proto_version >= 4:
-            diff = col_meta_len - len(self.values)
-            if diff:
-                for _ in range(diff):
-                    self._append_unset_value()
+        if plan.allow_unset and value_len < col_meta_len:
+            for i in range(value_len, col_meta_len):
+                plan.check_unset(i)
+            bound.extend([UNSET_VALUE] * (col_meta_len - value_len))
 
         return self
 
-    def _append_unset_value(self):
-        next_index = len(self.values)
-        if self.prepared_statement.is_routing_key_index(next_index):
-            col_meta = self.prepared_statement.column_metadata[next_index]
-            raise ValueError("Cannot bind UNSET_VALUE as a part of the routing key '%s'" % col_meta.name)
-        self.values.append(UNSET_VALUE)
-
     @property
     def routing_key(self):
-        if not self.prepared_statement.routing_key_indexes:
+        plan = self.prepared_statement._get_bind_plan()
+        if not plan.routing_key_indexes:
             return None
 
         if self._routing_key is not None:
             return self._routing_key
 
-        routing_indexes = self.prepared_statement.routing_key_indexes
-        if len(routing_indexes) == 1:
-            self._routing_key = self.values[routing_indexes[0]]
-        else:
-            self._routing_key = b"".join(self._key_parts_packed(self.values[i] for i in routing_indexes))
-
+        self._routing_key = plan.routing_key(self.values)
         return self._routing_key
 
     def __str__(self):
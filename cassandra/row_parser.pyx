@@ -14,7 +14,7 @@
 
 from cassandra.parsing cimport ParseDesc, ColumnParser
 from cassandra.obj_parser import TupleRowParser
-from cassandra.deserializers import make_deserializers
+from cassandra.deserializers import make_deserializers, attach_page
 
 include "ioutils.pyx"
 
@@ -31,9 +31,12 @@ def make_recv_results_rows(ColumnParser colparser):
         colnames = [c[2] for c in column_metadata]
         coltypes = [c[3] for c in column_metadata]
 
-        desc = ParseDesc(colnames, coltypes, make_deserializers(coltypes),
-                         protocol_version)
+        decode_types = cls.decode_types(coltypes)
+
+        deserializers = make_deserializers(decode_types)
+        desc = ParseDesc(colnames, decode_types, deserializers, protocol_version)
         reader = BytesIOReader(f.read())
+        attach_page(deserializers, reader.buf)
         try:
             parsed_rows = colparser.parse_rows(reader, desc)
         except Exception as e:
@@ -44,6 +47,8 @@ def make_recv_results_rows(ColumnParser colparser):
             rowcount = read_int(reader)
             for i in range(rowcount):
                 rowparser.unpack_row(reader, desc)
+            # the columns decoded fine as tuples, so the error is the parser's own
+            raise
 
         return (paging_state, coltypes, (colnames, parsed_rows))
 
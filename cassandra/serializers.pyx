@@ -0,0 +1,410 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Cython-based serializers for binding values, the counterpart of deserializers.pyx.
+
+Each serializer packs the exact Python types it expects (``int``, ``float``,
+``str``, ``UUID``, naive ``datetime``, ...) directly, and hands any other value to
+the ``serialize`` method of its cqltype, so that the results, and the errors
+raised for invalid values, are the same as for the pure-Python path.
+"""
+
+from libc.stdint cimport int8_t, int16_t, int32_t, int64_t, uint16_t, uint32_t, uint64_t
+from libc.string cimport memcpy
+from libc.float cimport FLT_MAX
+from cpython.bytes cimport PyBytes_FromStringAndSize, PyBytes_AS_STRING, PyBytes_GET_SIZE, PyBytes_CheckExact
+
+import six
+from datetime import datetime
+from uuid import UUID
+
+from cassandra import cqltypes
+
+cdef bint PY2 = six.PY2
+cdef object text_type = six.text_type
+cdef object string_types = six.string_types
+cdef object iteritems = six.iteritems
+
+cdef enum:
+    DAYS_TO_EPOCH = 719163  # date(1970, 1, 1).toordinal()
+
+
+cdef inline bint is_int(val):
+    return type(val) is int or (PY2 and type(val) is long)
+
+
+cdef inline void put_be(char *out, uint64_t v, int size):
+    cdef int i
+    for i in range(size):
+        out[i] = <char>(v >> (8 * (size - i - 1)))
+
+
+cdef inline bytes pack_be(uint64_t v, int size):
+    cdef bytes out = PyBytes_FromStringAndSize(NULL, size)
+    put_be(PyBytes_AS_STRING(out), v, size)
+    return out
+
+
+cdef inline bint int_fits(val, int64_t lo, int64_t hi, int64_t *out):
+    """ Converts val to out if it is an int in [lo, hi] """
+    if not is_int(val):
+        return False
+    try:
+        out[0] = val
+    except OverflowError:
+        return False
+    return lo <= out[0] <= hi
+
+
+cdef class Serializer:
+    """Cython-based serializer class for a cqltype"""
+
+    def __init__(self, cqltype):
+        self.cqltype = cqltype
+
+    cpdef serialize(self, val, int protocol_version):
+        return self.cqltype.serialize(val, protocol_version)
+
+
+cdef class SerBytesType(Serializer):
+    cpdef serialize(self, val, int protocol_version):
+        if PyBytes_CheckExact(val):
+            return val
+        return self.cqltype.serialize(val, protocol_version)
+
+
+cdef class SerUTF8Type(Serializer):
+    cpdef serialize(self, val, int protocol_version):
+        if type(val) is text_type:
+            return val.encode('utf-8')
+        return self.cqltype.serialize(val, protocol_version)
+
+
+cdef class SerVarcharType(SerUTF8Type):
+    pass
+
+
+cdef class SerAsciiType(Serializer):
+    cpdef serialize(self, val, int protocol_version):
+        if not PY2 and type(val) is str:
+            return val.encode('ascii')
+        return self.cqltype.serialize(val, protocol_version)
+
+
+cdef class SerBooleanType(Serializer):
+    cpdef serialize(self, val, int protocol_version):
+        if val is True:
+            return b'\x01'
+        elif val is False:
+            return b'\x00'
+        return self.cqltype.serialize(val, protocol_version)
+
+
+cdef class SerByteType(Serializer):
+    cpdef serialize(self, val, int protocol_version):
+        cdef int64_t n
+        if int_fits(val, -2 ** 7, 2 ** 7 - 1, &n):
+            return pack_be(<uint64_t>n, 1)
+        return self.cqltype.serialize(val, protocol_version)
+
+
+cdef class SerShortType(Serializer):
+    cpdef serialize(self, val, int protocol_version):
+        cdef int64_t n
+        if int_fits(val, -2 ** 15, 2 ** 15 - 1, &n):
+            return pack_be(<uint64_t>n, 2)
+        return self.cqltype.serialize(val, protocol_version)
+
+
+cdef class SerInt32Type(Serializer):
+    cpdef serialize(self, val, int protocol_version):
+        cdef int64_t n
+        if int_fits(val, -2 ** 31, 2 ** 31 - 1, &n):
+            return pack_be(<uint64_t>n, 4)
+        return self.cqltype.serialize(val, protocol_version)
+
+
+cdef class SerLongType(Serializer):
+    cpdef serialize(self, val, int protocol_version):
+        cdef int64_t n
+        if int_fits(val, -2 ** 63, 2 ** 63 - 1, &n):
+            return pack_be(<uint64_t>n, 8)
+        return self.cqltype.serialize(val, protocol_version)
+
+
+cdef class SerCounterColumnType(SerLongType):
+    pass
+
+
+cdef class SerFloatType(Serializer):
+    cpdef serialize(self, val, int protocol_version):
+        cdef double d
+        cdef float f
+        cdef uint32_t bits
+        if type(val) is float:
+            d = val
+            # out of range values raise from struct.pack, as in the Python path
+            if -FLT_MAX <= d <= FLT_MAX:
+                f = <float>d
+                memcpy(&bits, &f, 4)
+                return pack_be(bits, 4)
+        return self.cqltype.serialize(val, protocol_version)
+
+
+cdef class SerDoubleType(Serializer):
+    cpdef serialize(self, val, int protocol_version):
+        cdef double d
+        cdef uint64_t bits
+        if type(val) is float:
+            d = val
+            memcpy(&bits, &d, 8)
+            return pack_be(bits, 8)
+        return self.cqltype.serialize(val, protocol_version)
+
+
+cdef class SerUUIDType(Serializer):
+    cpdef serialize(self, val, int protocol_version):
+        if type(val) is UUID:
+            return val.bytes
+        return self.cqltype.serialize(val, protocol_version)
+
+
+cdef class SerTimeUUIDType(SerUUIDType):
+    pass
+
+
+cdef class SerDateType(Serializer):
+    cpdef serialize(self, val, int protocol_version):
+        cdef int64_t seconds
+        cdef double millis
+        if type(val) is datetime and val.tzinfo is None:
+            # the same arithmetic as DateType.serialize, without building a time tuple
+            seconds = ((<int64_t>val.toordinal() - DAYS_TO_EPOCH) * 86400 +
+                       val.hour * 3600 + val.minute * 60 + val.second)
+            millis = <double>seconds * 1e3 + val.microsecond / 1e3
+            return pack_be(<uint64_t><int64_t>millis, 8)
+        return self.cqltype.serialize(val, protocol_version)
+
+
+cdef class SerTimestampType(SerDateType):
+    pass
+
+
+#--------------------------------------------------------------------------
+# Collections, tuples and UDTs
+
+cdef class _SerParameterizedType(Serializer):
+
+    cdef list serializers
+    cdef Py_ssize_t subtypes_len
+
+    def __init__(self, cqltype):
+        super(_SerParameterizedType, self).__init__(cqltype)
+        self.serializers = make_serializers(cqltype.subtypes)
+        self.subtypes_len = len(self.serializers)
+
+
+cdef bytes join_items(list items, int length_size, bint null_is_negative):
+    """
+    Concatenates serialized items, each prefixed by its length as a signed int of
+    length_size bytes (an unsigned short in collections before protocol v3).
+    None items are written with length -1 if null_is_negative.
+    """
+    cdef Py_ssize_t size = 0
+    cdef Py_ssize_t n
+    cdef char *out
+    cdef bytes result
+    for item in items:
+        size += length_size
+        if item is not None:
+            size += PyBytes_GET_SIZE(item)
+
+    result = PyBytes_FromStringAndSize(NULL, size)
+    out = PyBytes_AS_STRING(result)
+    for item in items:
+        if item is None:
+            put_be(out, <uint64_t>-1, length_size)
+            out += length_size
+        else:
+            n = PyBytes_GET_SIZE(item)
+            put_be(out, <uint64_t>n, length_size)
+            memcpy(out + length_size, PyBytes_AS_STRING(item), n)
+            out += length_size + n
+    return result
+
+
+cdef inline bytes pack_collection_len(Py_ssize_t n, int protocol_version):
+    if protocol_version >= 3:
+        return cqltypes.int32_pack(n) if n > 2 ** 31 - 1 else pack_be(<uint64_t>n, 4)
+    return cqltypes.uint16_pack(n) if n > 2 ** 16 - 1 else pack_be(<uint64_t>n, 2)
+
+
+cdef int check_item_len(bytes item, int protocol_version) except -1:
+    if protocol_version < 3 and PyBytes_GET_SIZE(item) > 2 ** 16 - 1:
+        cqltypes.uint16_pack(PyBytes_GET_SIZE(item))  # raises struct.error, as in the Python path
+    return 0
+
+
+cdef class SerListType(_SerParameterizedType):
+
+    cdef Serializer serializer
+
+    def __init__(self, cqltype):
+        super(SerListType, self).__init__(cqltype)
+        self.serializer, = self.serializers
+
+    cpdef serialize(self, val, int protocol_version):
+        cdef int inner_proto = max(3, protocol_version)
+        cdef list parts = []
+        if isinstance(val, string_types):
+            raise TypeError("Received a string for a type that expects a sequence")
+
+        header = pack_collection_len(len(val), protocol_version)
+        for item in val:
+            itembytes = to_binary(self.serializer, item, inner_proto)
+            check_item_len(itembytes, protocol_version)
+            parts.append(itembytes)
+        return header + join_items(parts, 4 if protocol_version >= 3 else 2, False)
+
+
+cdef class SerSetType(SerListType):
+    pass
+
+
+cdef class SerMapType(_SerParameterizedType):
+
+    cdef Serializer key_serializer, val_serializer
+
+    def __init__(self, cqltype):
+        super(SerMapType, self).__init__(cqltype)
+        self.key_serializer, self.val_serializer = self.serializers
+
+    cpdef serialize(self, val, int protocol_version):
+        cdef int inner_proto = max(3, protocol_version)
+        cdef list parts = []
+        header = pack_collection_len(len(val), protocol_version)
+        try:
+            items = iteritems(val)
+        except AttributeError:
+            raise TypeError("Got a non-map object for a map value")
+        for key, value in items:
+            keybytes = to_binary(self.key_serializer, key, inner_proto)
+            valbytes = to_binary(self.val_serializer, value, inner_proto)
+            check_item_len(keybytes, protocol_version)
+            check_item_len(valbytes, protocol_version)
+            parts.append(keybytes)
+            parts.append(valbytes)
+        return header + join_items(parts, 4 if protocol_version >= 3 else 2, False)
+
+
+cdef class SerTupleType(_SerParameterizedType):
+
+    cpdef serialize(self, val, int protocol_version):
+        cdef Serializer serializer
+        cdef list parts = []
+        if len(val) > self.subtypes_len:
+            raise ValueError("Expected %d items in a tuple, but got %d: %s" %
+                             (self.subtypes_len, len(val), val))
+
+        for item, serializer in zip(val, self.serializers):
+            parts.append(None if item is None else serializer.serialize(item, max(3, protocol_version)))
+        return join_items(parts, 4, True)
+
+
+cdef class SerUserType(_SerParameterizedType):
+
+    cdef tuple fieldnames
+
+    def __init__(self, cqltype):
+        super(SerUserType, self).__init__(cqltype)
+        self.fieldnames = tuple(cqltype.fieldnames)
+
+    cpdef serialize(self, val, int protocol_version):
+        cdef Py_ssize_t i
+        cdef Serializer serializer
+        cdef list parts = []
+        for i, (fieldname, serializer) in enumerate(zip(self.fieldnames, self.serializers)):
+            # first treat as a tuple, else by custom type
+            try:
+                item = val[i]
+            except TypeError:
+                item = getattr(val, fieldname)
+            parts.append(None if item is None else serializer.serialize(item, max(3, protocol_version)))
+        return join_items(parts, 4, True)
+
+
+cdef class SerReversedType(_SerParameterizedType):
+    cpdef serialize(self, val, int protocol_version):
+        return to_binary(self.serializers[0], val, protocol_version)
+
+
+cdef class SerFrozenType(SerReversedType):
+    pass
+
+#--------------------------------------------------------------------------
+# Helper utilities
+
+cdef dict _primitive_serializers = {
+    cqltypes.BytesType: SerBytesType,
+    cqltypes.UTF8Type: SerUTF8Type,
+    cqltypes.VarcharType: SerVarcharType,
+    cqltypes.AsciiType: SerAsciiType,
+    cqltypes.BooleanType: SerBooleanType,
+    cqltypes.ByteType: SerByteType,
+    cqltypes.ShortType: SerShortType,
+    cqltypes.Int32Type: SerInt32Type,
+    cqltypes.LongType: SerLongType,
+    cqltypes.CounterColumnType: SerCounterColumnType,
+    cqltypes.FloatType: SerFloatType,
+    cqltypes.DoubleType: SerDoubleType,
+    cqltypes.UUIDType: SerUUIDType,
+    cqltypes.TimeUUIDType: SerTimeUUIDType,
+    cqltypes.DateType: SerDateType,
+    cqltypes.TimestampType: SerTimestampType,
+}
+
+
+def make_serializers(cqltypes):
+    """Create a list of Serializers for each given cqltype in cqltypes"""
+    return [find_serializer(ct) for ct in cqltypes]
+
+
+cpdef Serializer find_serializer(cqltype):
+    """Find a serializer for a cqltype"""
+    cls = _primitive_serializers.get(cqltype)
+    if cls is not None:
+        pass
+    elif (not isinstance(cqltype, type) or not issubclass(cqltype, cqltypes._ParameterizedType)
+          or not cqltype.subtypes):
+        cls = Serializer
+    elif issubclass(cqltype, cqltypes.ListType):
+        cls = SerListType
+    elif issubclass(cqltype, cqltypes.SetType):
+        cls = SerSetType
+    elif issubclass(cqltype, cqltypes.MapType):
+        cls = SerMapType
+    elif issubclass(cqltype, cqltypes.UserType):
+        # UserType is a subclass of TupleType, so should precede it
+        cls = SerUserType
+    elif issubclass(cqltype, cqltypes.TupleType):
+        cls = SerTupleType
+    elif issubclass(cqltype, cqltypes.ReversedType):
+        cls = SerReversedType
+    elif issubclass(cqltype, cqltypes.FrozenType):
+        cls = SerFrozenType
+    else:
+        cls = Serializer
+
+    return cls(cqltype)
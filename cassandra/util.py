@@ -13,6 +13,7 @@
 # limitations under the License.
 
 from __future__ import with_statement
+from array import array
 import calendar
 import datetime
 from functools import total_ordering
@@ -26,6 +27,19 @@ DATETIME_EPOC = datetime.datetime(1970, 1, 1)
 assert sys.byteorder in ('little', 'big')
 is_little_endian = sys.byteorder == 'little'
 
+
+def _int64_typecode():
+    for typecode in ('q', 'l'):
+        try:
+            if array(typecode).itemsize == 8:
+                return typecode
+        except ValueError:  # 'q' before Python 3.3
+            pass
+    return None
+
+# array typecode of 64-bit integers, or None if there is none (64-bit integers are then kept in lists)
+int64_typecode = _int64_typecode()
+
 def datetime_from_timestamp(timestamp):
     """
     Creates a timezone-agnostic datetime from timestamp (in seconds) in a consistent manner.
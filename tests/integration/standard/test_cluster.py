@@ -17,7 +17,6 @@ try:
 except ImportError:
     import unittest  # noqa
 
-from collections import deque
 from copy import copy
 from mock import Mock, call, patch
 import time
@@ -27,6 +26,7 @@ import logging
 import cassandra
 from cassandra.cluster import Cluster, Session, NoHostAvailable, ExecutionProfile, EXEC_PROFILE_DEFAULT
 from cassandra.concurrent import execute_concurrent
+from cassandra.connection import HeartbeatFuture
 from cassandra.policies import (RoundRobinPolicy, ExponentialReconnectionPolicy,
                                 RetryPolicy, SimpleConvictionPolicy, HostDistance,
                                 AddressTranslator, TokenAwarePolicy, HostFilterPolicy)
@@ -667,27 +667,21 @@ class ClusterTests(unittest.TestCase):
             cluster.set_core_connections_per_host(HostDistance.LOCAL, 1)
         session = cluster.connect(wait_for_all_pools=True)
 
-        # This test relies on impl details of connection req id management to see if heartbeats
-        # are being sent. May need update if impl is changed
-        connection_request_ids = {}
         for h in cluster.get_connection_holders():
             for c in h.get_connections():
                 # make sure none are idle (should have startup messages
                 self.assertFalse(c.is_idle)
-                with c.lock:
-                    connection_request_ids[id(c)] = deque(c.request_ids)  # copy of request ids
 
         # let two heatbeat intervals pass (first one had startup messages in it)
-        time.sleep(2 * interval + interval/2)
+        with patch('cassandra.connection.HeartbeatFuture', wraps=HeartbeatFuture) as heartbeat_future:
+            time.sleep(2 * interval + interval/2)
 
         connections = [c for holders in cluster.get_connection_holders() for c in holders.get_connections()]
 
-        # make sure requests were sent on all connections
+        # make sure heartbeats were sent on all connections
+        heartbeat_connections = set(id(args[0]) for args, kwargs in heartbeat_future.call_args_list)
         for c in connections:
-            expected_ids = connection_request_ids[id(c)]
-            expected_ids.rotate(-1)
-            with c.lock:
-                self.assertListEqual(list(c.request_ids), list(expected_ids))
+            self.assertIn(id(c), heartbeat_connections)
 
         # assert idle status
         self.assertTrue(all(c.is_idle for c in connections))
@@ -739,7 +733,7 @@ class ClusterTests(unittest.TestCase):
         cluster.shutdown()
 
     def test_pool_management(self):
-        # Ensure that in_flight and request_ids quiesce after cluster operations
+        # Ensure that in_flight and request ids quiesce after cluster operations
         cluster = Cluster(protocol_version=PROTOCOL_VERSION, idle_heartbeat_interval=0)  # no idle heartbeat here, pool management is tested in test_idle_heartbeat
         session = cluster.connect()
         session2 = cluster.connect()
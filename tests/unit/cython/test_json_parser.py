@@ -0,0 +1,159 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+from tests.unit.cython.utils import cythontest
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest  # noqa
+
+from mock import Mock
+
+from cassandra import DriverException
+from cassandra.cluster import ResponseFuture, Session
+from cassandra.marshal import (int8_pack, int16_pack, int32_pack, int64_pack, uint16_pack,
+                               float_pack, double_pack)
+from cassandra.protocol import json_protocol_handler, raw_scalar_protocol_handler
+from cassandra.query import named_tuple_factory, dict_factory, tuple_factory
+from tests.unit.cython.test_obj_parser import make_rows_body, decode
+
+UUID_BYTES = b'\xd2\x17\x7d\xd0\xea\xa2\x11\xde\xa5\x72\x00\x1b\x77\x9c\x76\xe3'
+
+
+def collection(*cells):
+    return int32_pack(len(cells)) + b''.join(int32_pack(len(c)) + c for c in cells)
+
+
+def mapping(*items):
+    return int32_pack(len(items)) + b''.join(int32_pack(len(c)) + c for item in items for c in item)
+
+
+# (name, type code, serialized values, expected values)
+COLUMNS = [
+    ('i', 0x0009, [int32_pack(-2 ** 31), None, b''], [-2 ** 31, None, None]),
+    ('l', 0x0002, [int64_pack(2 ** 63 - 1), int64_pack(0), int64_pack(-1)], [2 ** 63 - 1, 0, -1]),
+    ('s', 0x0013, [int16_pack(-2), int16_pack(3), None], [-2, 3, None]),
+    ('t', 0x0014, [int8_pack(-128), int8_pack(127), int8_pack(0)], [-128, 127, 0]),
+    ('f', 0x0008, [float_pack(1.5), float_pack(0.1), float_pack(float('inf'))], [1.5, 0.10000000149011612, float('inf')]),
+    ('d', 0x0007, [double_pack(0.1), double_pack(-1e300), double_pack(2.0)], [0.1, -1e300, 2.0]),
+    ('b', 0x0004, [b'\x01', b'\x00', None], [True, False, None]),
+    ('v', 0x000D, [b'plain', b'', b'\xc3\xa9 "q" \\ \n\t\x01 \xe2\x82\xac'],
+     [u'plain', u'', u'\xe9 "q" \\ \n\t\x01 \u20ac']),
+    ('a', 0x0001, [b'ascii', None, b''], [u'ascii', None, u'']),
+    ('ts', 0x000B, [int64_pack(1496320205123), int64_pack(-1), int64_pack(0)],
+     [u'2017-06-01T12:30:05.123Z', u'1969-12-31T23:59:59.999Z', u'1970-01-01T00:00:00.000Z']),
+    ('u', 0x000C, [UUID_BYTES, None, UUID_BYTES],
+     [u'd2177dd0-eaa2-11de-a572-001b779c76e3', None, u'd2177dd0-eaa2-11de-a572-001b779c76e3']),
+    ('blob', 0x0003, [b'\x00\xff', b'', None], [u'0x00ff', u'0x', None]),
+    ('li', uint16_pack(0x0020) + uint16_pack(0x0009), [collection(int32_pack(1), int32_pack(2)), None, collection()],
+     [[1, 2], None, []]),
+    ('m', uint16_pack(0x0021) + uint16_pack(0x000D) + uint16_pack(0x000B),
+     [mapping((b'k', int64_pack(0))), None, mapping()], [{u'k': u'1970-01-01T00:00:00.000Z'}, None, {}]),
+    ('vi', 0x000E, [b'\x01\x00', b'\xff', None], [256, -1, None]),
+    ('dec', 0x0006, [int32_pack(2) + b'\x04\xd2', None, None], [u'12.34', None, None]),
+]
+
+
+class JsonParserTest(unittest.TestCase):
+
+    def decode_documents(self, handler, columns=COLUMNS):
+        return decode(handler, make_rows_body([c[:3] for c in columns])).results[1]
+
+    def expected_rows(self, columns=COLUMNS):
+        return [dict((name, values[j]) for name, _, _, values in columns) for j in range(3)]
+
+    @cythontest
+    def test_row_documents(self):
+        documents = self.decode_documents(json_protocol_handler())
+        self.assertEqual(len(documents), 3)
+        for document in documents:
+            self.assertIsInstance(document, bytes)
+        self.assertEqual([json.loads(d.decode('utf8')) for d in documents], self.expected_rows())
+        # compact, with the columns in order
+        self.assertTrue(documents[0].startswith(b'{"i":-2147483648,"l":9223372036854775807,"s":-2,'))
+
+    @cythontest
+    def test_session_row_factories(self):
+        session = Mock(spec=Session, row_factory=named_tuple_factory)
+        session.cluster._default_load_balancing_policy.make_query_plan.return_value = []
+        body = make_rows_body([c[:3] for c in COLUMNS])
+        for row_factory in (None, dict_factory, tuple_factory):
+            future = ResponseFuture(session, Mock(), Mock(), None, row_factory=row_factory)
+            handler = json_protocol_handler()._for_row_factory(future.row_factory)
+            # the documents are the rows, not passed through the row factory
+            future._set_result(None, None, None, decode(handler, body))
+            self.assertEqual([json.loads(d.decode('utf8')) for d in future.result()], self.expected_rows())
+
+    @cythontest
+    def test_page_documents(self):
+        documents = self.decode_documents(json_protocol_handler(page_documents=True))
+        self.assertEqual(len(documents), 1)
+        self.assertEqual(json.loads(documents[0].decode('utf8')), self.expected_rows())
+
+        empty = decode(json_protocol_handler(page_documents=True), make_rows_body([('i', 0x0009, [])])).results[1]
+        self.assertEqual(empty, [b'[]'])
+
+    @cythontest
+    def test_formats(self):
+        columns = [('ts', 0x000B, [int64_pack(1496320205123), int64_pack(-62135596800000), int64_pack(253402300799999)]),
+                   ('u', 0x000C, [UUID_BYTES, UUID_BYTES, None]),
+                   ('m', uint16_pack(0x0021) + uint16_pack(0x000C) + uint16_pack(0x000B),
+                    [mapping((UUID_BYTES, int64_pack(1))), None, None])]
+        body = make_rows_body(columns)
+
+        rows = [json.loads(d.decode('utf8')) for d in decode(json_protocol_handler(), body).results[1]]
+        self.assertEqual([r['ts'] for r in rows],
+                         [u'2017-06-01T12:30:05.123Z', u'0001-01-01T00:00:00.000Z', u'9999-12-31T23:59:59.999Z'])
+        self.assertEqual(rows[0]['m'], {u'd2177dd0-eaa2-11de-a572-001b779c76e3': u'1970-01-01T00:00:00.001Z'})
+
+        handler = json_protocol_handler(timestamp_format='epoch_ms', uuid_format='hex')
+        rows = [json.loads(d.decode('utf8')) for d in decode(handler, body).results[1]]
+        self.assertEqual([r['ts'] for r in rows], [1496320205123, -62135596800000, 253402300799999])
+        self.assertEqual([r['u'] for r in rows], [u'd2177dd0eaa211dea572001b779c76e3'] * 2 + [None])
+        self.assertEqual(rows[0]['m'], {u'd2177dd0eaa211dea572001b779c76e3': 1})
+
+        self.assertRaises(ValueError, json_protocol_handler, timestamp_format='rfc')
+        self.assertRaises(ValueError, json_protocol_handler, uuid_format='urn')
+
+    @cythontest
+    def test_raw_scalars(self):
+        columns = [('ts', 0x000B, [int64_pack(5)]), ('u', 0x000C, [UUID_BYTES]), ('ip', 0x0010, [b'\x7f\x00\x00\x01'])]
+        handler = raw_scalar_protocol_handler(json_protocol_handler())
+        documents = decode(handler, make_rows_body(columns)).results[1]
+        self.assertEqual(json.loads(documents[0].decode('utf8')),
+                         {u'ts': 5, u'u': u'0xd2177dd0eaa211dea572001b779c76e3', u'ip': u'0x7f000001'})
+
+    @cythontest
+    def test_decoding_errors(self):
+        for columns in ([('v', 0x000D, [b'\xff'])],
+                        [('v', 0x000D, [b'\xc3'])],
+                        [('v', 0x000D, [b'\xed\xa0\x80'])],  # surrogate
+                        [('v', 0x000D, [b'\xe0\x80\x80'])],  # overlong
+                        [('v', 0x000D, [b'\xf0\x80\x80\x80'])],  # overlong
+                        [('v', 0x000D, [b'\xf4\x90\x80\x80'])],  # past U+10FFFF
+                        [('d', 0x0007, [b'\x00' * 9])],
+                        [('u', 0x000C, [b'\x00' * 15])]):
+            with self.assertRaises(DriverException) as cm:
+                decode(json_protocol_handler(), make_rows_body(columns))
+            self.assertIn('Failed decoding result column "%s"' % columns[0][0], str(cm.exception))
+
+    @cythontest
+    def test_utf8_boundaries(self):
+        values = [b'\xe0\xa0\x80', b'\xed\x9f\xbf', b'\xee\x80\x80', b'\xf0\x90\x80\x80', b'\xf4\x8f\xbf\xbf']
+        documents = decode(json_protocol_handler(), make_rows_body([('v', 0x000D, values)])).results[1]
+        self.assertEqual([json.loads(d.decode('utf8'))['v'] for d in documents],
+                         [v.decode('utf8') for v in values])
@@ -0,0 +1,92 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from tests.unit.cython.utils import cythontest
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest  # noqa
+
+from cassandra import ConsistencyLevel
+from cassandra.cython_deps import HAVE_CYTHON
+from cassandra.protocol import (QueryMessage, ExecuteMessage, BatchMessage, PrepareMessage,
+                                ProtocolHandler, _ProtocolHandler, _UNSET_VALUE)
+from cassandra.query import BatchType
+
+if HAVE_CYTHON:
+    from cassandra.message_encoder import encode_message
+else:
+    encode_message = None
+
+
+def make_messages():
+    params = [b'\x00\x00\x00\x01', None, _UNSET_VALUE, b'', b'x' * 300]
+    execute_options = [
+        {},
+        {'fetch_size': 5000, 'paging_state': b'\x01\x02\x03'},
+        {'serial_consistency_level': ConsistencyLevel.LOCAL_SERIAL, 'timestamp': 1500000000123456},
+        {'skip_meta': True, 'fetch_size': 100},
+    ]
+    messages = []
+    for options in execute_options:
+        messages.append(ExecuteMessage(b'\xde\xad\xbe\xef', params, ConsistencyLevel.QUORUM, **options))
+        query_options = dict((k, v) for k, v in options.items() if k != 'skip_meta')
+        messages.append(QueryMessage(u'SELECT * FROM t WHERE k = \xe9', ConsistencyLevel.ONE, **query_options))
+    query = QueryMessage('SELECT * FROM t WHERE k = ?', ConsistencyLevel.ONE)
+    query._query_params = params
+    messages.append(query)
+    queries = [(False, u'INSERT INTO t (k) VALUES (\xe9)', []),
+               (True, b'\x01\x02', params),
+               (False, 'INSERT INTO t (k) VALUES (?)', [b'abc'])]
+    messages.append(BatchMessage(BatchType.LOGGED, queries, ConsistencyLevel.ALL))
+    messages.append(BatchMessage(BatchType.UNLOGGED, queries, ConsistencyLevel.ALL,
+                                 serial_consistency_level=ConsistencyLevel.SERIAL, timestamp=12345))
+    return messages
+
+
+class MessageEncoderTest(unittest.TestCase):
+
+    def assert_encoded_like_python(self, msg, protocol_version, compressor=None, allow_beta=False):
+        expected = _ProtocolHandler.encode_message(msg, 17, protocol_version, compressor, allow_beta)
+        frame = encode_message(msg, 17, protocol_version, compressor, allow_beta)
+        self.assertIsNotNone(frame)
+        self.assertEqual(frame, expected)
+        self.assertEqual(ProtocolHandler.encode_message(msg, 17, protocol_version, compressor, allow_beta), expected)
+
+    @cythontest
+    def test_matches_python_encoder(self):
+        for protocol_version in (3, 4, 5):
+            for msg in make_messages():
+                self.assert_encoded_like_python(msg, protocol_version)
+
+    @cythontest
+    def test_frame_flags(self):
+        for msg in make_messages():
+            msg.tracing = True
+            msg.custom_payload = {'a': b'1', u'b\xe9': b''}
+            self.assert_encoded_like_python(msg, 4, compressor=lambda body: body[::-1], allow_beta=True)
+
+    @cythontest
+    def test_falls_back_to_python(self):
+        msg = ExecuteMessage(b'id', [b'1'], ConsistencyLevel.ONE)
+        self.assertIsNone(encode_message(msg, 1, 2, None, False))
+        self.assertIsNone(encode_message(PrepareMessage('SELECT 1'), 1, 4, None, False))
+        self.assertIsNone(encode_message(ExecuteMessage(b'id', [bytearray(b'1')], ConsistencyLevel.ONE), 1, 4, None, False))
+        msg.custom_payload = {'a': b'1'}
+        self.assertIsNone(encode_message(msg, 1, 3, None, False))
+        # and the handler still encodes them
+        msg.custom_payload = None
+        self.assertEqual(ProtocolHandler.encode_message(msg, 1, 2, None, False),
+                         _ProtocolHandler.encode_message(msg, 1, 2, None, False))
@@ -0,0 +1,74 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from tests.unit.cython.utils import numpytest
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest  # noqa
+
+from cassandra import DriverException
+from cassandra.marshal import int16_pack, int32_pack, int64_pack, float_pack, double_pack
+from cassandra.protocol import NumpyProtocolHandler
+from tests.unit.cython.test_obj_parser import make_rows_body, decode
+
+# (name, type code, serialized values)
+FIXED_WIDTH_COLUMNS = [('i', 0x0009, [int32_pack(1), None, int32_pack(-2 ** 31)]),
+                       ('l', 0x0002, [int64_pack(2 ** 63 - 1), int64_pack(0), b'']),
+                       ('s', 0x0013, [int16_pack(-1), int16_pack(7), int16_pack(8)]),
+                       ('f', 0x0008, [float_pack(1.5), float_pack(-2.0), None]),
+                       ('d', 0x0007, [None, double_pack(3.25), double_pack(-1e300)])]
+
+
+class NumpyParserTest(unittest.TestCase):
+
+    def assert_fixed_width_arrays(self, arrays):
+        self.assertEqual(arrays['i'].tolist(), [1, None, -2 ** 31])
+        self.assertEqual(arrays['l'].tolist(), [2 ** 63 - 1, 0, None])
+        self.assertEqual(arrays['s'].tolist(), [-1, 7, 8])
+        self.assertEqual(arrays['f'].tolist(), [1.5, -2.0, None])
+        self.assertEqual(arrays['d'].tolist(), [None, 3.25, -1e300])
+        for name, dtype in (('i', 'i4'), ('l', 'i8'), ('s', 'i2'), ('f', 'f4'), ('d', 'f8')):
+            self.assertEqual(arrays[name].dtype.str[1:], dtype)
+
+    @numpytest
+    def test_fixed_width_columns(self):
+        arrays = decode(NumpyProtocolHandler, make_rows_body(FIXED_WIDTH_COLUMNS)).results[1]
+        self.assert_fixed_width_arrays(arrays)
+
+    @numpytest
+    def test_mixed_columns(self):
+        columns = FIXED_WIDTH_COLUMNS + [('t', 0x000D, [b'a', None, b''])]
+        arrays = decode(NumpyProtocolHandler, make_rows_body(columns)).results[1]
+        self.assert_fixed_width_arrays(arrays)
+        self.assertEqual(list(arrays['t']), [u'a', None, u''])
+
+    @numpytest
+    def test_no_rows(self):
+        arrays = decode(NumpyProtocolHandler, make_rows_body([('i', 0x0009, [])])).results[1]
+        self.assertEqual(len(arrays['i']), 0)
+
+    @numpytest
+    def test_invalid_cell_size(self):
+        for columns in ([('i', 0x0009, [int32_pack(1), int64_pack(2)])],
+                        [('i', 0x0009, [int32_pack(1), int64_pack(2)]), ('t', 0x000D, [b'a', b'b'])]):
+            with self.assertRaises(DriverException) as cm:
+                decode(NumpyProtocolHandler, make_rows_body(columns))
+            self.assertIn('Failed decoding result column "i"', str(cm.exception))
+
+    @numpytest
+    def test_truncated_page(self):
+        body = make_rows_body(FIXED_WIDTH_COLUMNS)
+        self.assertRaises(EOFError, decode, NumpyProtocolHandler, body[:-3])
@@ -0,0 +1,379 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from array import array
+from functools import partial
+import gc
+from mock import patch
+import os
+import subprocess
+import sys
+import weakref
+
+from tests.unit.cython.utils import cythontest
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest  # noqa
+
+from cassandra import DriverException
+from cassandra.marshal import int16_pack, int32_pack, int64_pack, uint16_pack, float_pack, double_pack
+from cassandra.protocol import (ProtocolHandler, _ProtocolHandler, NumpyProtocolHandler, LazyRowProtocolHandler,
+                                ResultMessage, RESULT_KIND_ROWS, raw_scalar_protocol_handler,
+                                blob_memoryview_protocol_handler, cython_protocol_handler)
+from tests.unit.cython.utils import numpytest
+from cassandra.query import (tuple_factory, named_tuple_factory, dict_factory, ordered_dict_factory,
+                             columnar_factory, int64_typecode, row_class_cache)
+
+# (name, type code, serialized values)
+COLUMNS = [('k', 0x0009, [int32_pack(1), int32_pack(2), int32_pack(-3)]),
+           ('v', 0x000D, [b'a', None, b'\xc3\xa9']),
+           ('valid name?', 0x0004, [b'\x01', b'\x00', None])]
+
+UUID_BYTES = b'\x12' * 16
+RAW_COLUMNS = [('ts', 0x000B, [int64_pack(1500000000123), None, int64_pack(-1)]),
+               ('id', 0x000C, [UUID_BYTES, UUID_BYTES, None]),
+               ('tid', 0x000F, [UUID_BYTES, None, UUID_BYTES]),
+               ('addr', 0x0010, [b'\x7f\x00\x00\x01', b'\x00' * 15 + b'\x01', None]),
+               ('k', 0x0009, [int32_pack(1), int32_pack(2), int32_pack(3)])]
+
+
+def write_string(s):
+    return uint16_pack(len(s)) + s
+
+
+def make_rows_body(columns=COLUMNS):
+    body = [int32_pack(RESULT_KIND_ROWS), int32_pack(0x0001), int32_pack(len(columns)),
+            write_string(b'ks'), write_string(b'tbl')]
+    for name, type_code, _ in columns:
+        body.append(write_string(name.encode('utf8')))
+        # type codes of parameterized types are given with their options
+        body.append(type_code if isinstance(type_code, bytes) else uint16_pack(type_code))
+
+    rows = list(zip(*[values for _, _, values in columns]))
+    body.append(int32_pack(len(rows)))
+    for row in rows:
+        for cell in row:
+            body.append(int32_pack(-1) if cell is None else int32_pack(len(cell)) + cell)
+    return b''.join(body)
+
+
+def decode(handler, body):
+    return handler.decode_message(4, {}, 0, 0, ResultMessage.opcode, body, None, None)
+
+
+class RowFactoryParserTest(unittest.TestCase):
+
+    def assert_rows_built(self, row_factory, row_type):
+        body = make_rows_body()
+        expected = row_factory(*decode(_ProtocolHandler, body).results)
+
+        handler = ProtocolHandler._for_row_factory(row_factory)
+        self.assertIsNot(handler, ProtocolHandler)
+        self.assertIs(ProtocolHandler._for_row_factory(row_factory), handler)
+        msg = decode(handler, body)
+        self.assertIs(msg.row_factory, row_factory)
+        colnames, rows = msg.results
+        self.assertEqual(colnames, ['k', 'v', 'valid name?'])
+        self.assertEqual(rows, expected)
+        for row in rows:
+            self.assertIs(type(row), row_type)
+        return rows
+
+    @cythontest
+    def test_tuple_rows(self):
+        self.assert_rows_built(tuple_factory, tuple)
+
+    @cythontest
+    def test_named_tuple_rows(self):
+        Row = row_class_cache.get(['k', 'v', 'valid name?'])
+        rows = self.assert_rows_built(named_tuple_factory, Row)
+        self.assertEqual(rows[2].k, -3)
+        self.assertEqual(rows[1], (2, None, False))
+        self.assertEqual(rows[0]._asdict()['v'], u'a')
+
+        # rows are proper objects: collectable, and hashable as tuples
+        gc.collect()
+        self.assertEqual(hash(rows[1]), hash((2, None, False)))
+        del rows
+        gc.collect()
+
+    @cythontest
+    def test_dict_rows(self):
+        rows = self.assert_rows_built(dict_factory, dict)
+        self.assertEqual(rows[0], {'k': 1, 'v': u'a', 'valid name?': True})
+
+    @cythontest
+    def test_unsupported_row_factories(self):
+        self.assertIs(ProtocolHandler._for_row_factory(ordered_dict_factory), ProtocolHandler)
+        self.assertIs(ProtocolHandler._for_row_factory(lambda colnames, rows: rows), ProtocolHandler)
+        self.assertIsNone(decode(ProtocolHandler, make_rows_body()).row_factory)
+
+        class CustomProtocolHandler(ProtocolHandler):
+            message_types_by_opcode = ProtocolHandler.message_types_by_opcode.copy()
+            message_types_by_opcode[ResultMessage.opcode] = ResultMessage
+
+        self.assertIs(CustomProtocolHandler._for_row_factory(named_tuple_factory), CustomProtocolHandler)
+        self.assertIs(_ProtocolHandler._for_row_factory(named_tuple_factory), _ProtocolHandler)
+
+    @cythontest
+    def test_unsupported_row_factory_cached(self):
+        from cassandra.obj_parser import ListParser
+        calls = []
+
+        class CountingParser(ListParser):
+            def with_row_factory(self, row_factory):
+                calls.append(row_factory)
+                return ListParser.with_row_factory(self, row_factory)
+
+        handler = cython_protocol_handler(CountingParser())
+        self.assertIs(handler._for_row_factory(ordered_dict_factory), handler)
+        self.assertIs(handler._for_row_factory(ordered_dict_factory), handler)
+        self.assertEqual(calls, [ordered_dict_factory])
+
+    @cythontest
+    def test_row_factory_handlers_bounded(self):
+        from cassandra.obj_parser import ListParser
+        handler = cython_protocol_handler(ListParser())
+
+        # factories built per request are not all kept alive
+        refs = []
+        with patch('cassandra.protocol._row_factory_handlers_maxsize', 2):
+            for _ in range(10):
+                factory = partial(ordered_dict_factory)
+                self.assertIs(handler._for_row_factory(factory), handler)
+                refs.append(weakref.ref(factory))
+            del factory
+            gc.collect()
+        self.assertEqual(len([ref for ref in refs if ref() is not None]), 2)
+
+        named_tuple_handler = handler._for_row_factory(named_tuple_factory)
+        self.assertIs(handler._for_row_factory(named_tuple_factory), named_tuple_handler)
+
+    @cythontest
+    def test_import_query_first(self):
+        # cassandra.query imports cassandra.protocol, which builds its default parser on import
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+        subprocess.check_call([sys.executable, '-c', 'import cassandra.query'], cwd=root)
+
+    @cythontest
+    def test_subclass_row_factories(self):
+        handler = raw_scalar_protocol_handler(ProtocolHandler)
+        named_tuple_handler = handler._for_row_factory(named_tuple_factory)
+        self.assertTrue(issubclass(named_tuple_handler, handler))
+        self.assertIsNot(named_tuple_handler, ProtocolHandler._for_row_factory(named_tuple_factory))
+
+        msg = decode(named_tuple_handler, make_rows_body(RAW_COLUMNS))
+        self.assertIs(msg.row_factory, named_tuple_factory)
+        self.assertEqual(msg.results[1][0].ts, 1500000000123)
+
+    @cythontest
+    def test_decoding_errors(self):
+        columns = [('k', 0x000D, [b'a', b'\xff'])]
+        handler = ProtocolHandler._for_row_factory(named_tuple_factory)
+        with self.assertRaises(DriverException) as cm:
+            decode(handler, make_rows_body(columns))
+        self.assertIn('Failed decoding result column "k"', str(cm.exception))
+
+
+class ColumnarParserTest(unittest.TestCase):
+
+    columns = [('i', 0x0009, [int32_pack(1), int32_pack(-2 ** 31), int32_pack(3)]),
+               ('l', 0x0002, [int64_pack(2 ** 63 - 1), int64_pack(0), int64_pack(-1)]),
+               ('s', 0x0013, [int16_pack(-1), int16_pack(7), None]),
+               ('t', 0x0014, [b'\x80', b'\x7f', b'']),
+               ('f', 0x0008, [float_pack(1.5), float_pack(-2.0), float_pack(0.25)]),
+               ('d', 0x0007, [double_pack(3.25), None, double_pack(-1e300)]),
+               ('v', 0x000D, [b'a', None, b'\xc3\xa9']),
+               ('b', 0x0004, [b'\x01', b'\x00', None])]
+
+    def assert_columns_like_python(self, columns):
+        body = make_rows_body(columns)
+        expected = columnar_factory(*decode(_ProtocolHandler, body).results)
+
+        handler = ProtocolHandler._for_row_factory(columnar_factory)
+        self.assertIsNot(handler, ProtocolHandler)
+        msg = decode(handler, body)
+        self.assertIs(msg.row_factory, columnar_factory)
+        result = msg.results[1]
+        self.assertEqual(result, expected)
+        for name in result:
+            self.assertIs(type(result[name]), type(expected[name]), name)
+            if isinstance(result[name], array):
+                self.assertEqual(result[name].typecode, expected[name].typecode, name)
+        return result
+
+    @cythontest
+    def test_columns(self):
+        result = self.assert_columns_like_python(self.columns)
+        self.assertEqual(result['i'], array(int64_typecode, [1, -2 ** 31, 3]))
+        self.assertEqual(result['t'], [-128, 127, None])
+        self.assertEqual(result['f'], array('d', [1.5, -2.0, 0.25]))
+        self.assertEqual(result['v'], [u'a', None, u'\xe9'])
+
+    @cythontest
+    def test_varint_columns(self):
+        result = self.assert_columns_like_python([
+            ('small', 0x000E, [b'\x01', b'\xff', b'\x7f\xff']),
+            ('big', 0x000E, [b'\x01', b'\x01' + b'\x00' * 8, b'\x02']),
+            ('null', 0x000E, [b'\x01', None, b'\x02'])])
+        self.assertEqual(result['small'], array(int64_typecode, [1, -1, 32767]))
+        self.assertEqual(result['big'], [1, 2 ** 64, 2])
+        self.assertEqual(result['null'], [1, None, 2])
+
+    @cythontest
+    def test_no_rows(self):
+        self.assertEqual(self.assert_columns_like_python([(name, code, []) for name, code, _ in self.columns]),
+                         dict((name, []) for name, _, _ in self.columns))
+
+    @cythontest
+    def test_invalid_cell_size(self):
+        with self.assertRaises(DriverException) as cm:
+            decode(ProtocolHandler._for_row_factory(columnar_factory),
+                   make_rows_body([('i', 0x0009, [int32_pack(1), b'\x00' * 5])]))
+        self.assertIn('Failed decoding result column "i"', str(cm.exception))
+
+
+class LazyRowTest(unittest.TestCase):
+
+    expected_rows = [(1, u'a', True), (2, None, False), (-3, u'\xe9', None)]
+
+    @cythontest
+    def test_rows(self):
+        rows = decode(LazyRowProtocolHandler, make_rows_body()).results[1]
+        self.assertEqual(rows, self.expected_rows)
+        self.assertEqual([tuple(row) for row in rows], self.expected_rows)
+        self.assertEqual(len(rows[0]), 3)
+        self.assertEqual(hash(rows[1]), hash((2, None, False)))
+        self.assertNotEqual(rows[0], rows[1])
+        self.assertEqual(rows[0]._asdict(), {'k': 1, 'v': u'a', 'valid name?': True})
+        self.assertEqual(repr(rows[1]), "LazyRow(k=2, v=None, valid name?=False)")
+
+    @cythontest
+    def test_access(self):
+        row = decode(LazyRowProtocolHandler, make_rows_body()).results[1][2]
+        self.assertEqual(row[0], -3)
+        self.assertEqual(row[-1], None)
+        self.assertEqual(row['v'], u'\xe9')
+        self.assertEqual(row[1:], (u'\xe9', None))
+        self.assertEqual(row[::-2], (None, -3))
+        self.assertRaises(IndexError, row.__getitem__, 3)
+        self.assertRaises(IndexError, row.__getitem__, -4)
+        self.assertRaises(KeyError, row.__getitem__, 'missing')
+        # decoded values are kept
+        self.assertIs(row['v'], row[1])
+        self.assertRaises(TypeError, type(row))
+
+    @cythontest
+    def test_empty_and_wide_cells(self):
+        columns = [('b', 0x0003, [b'', b'x' * 1000, None]),
+                   ('k', 0x0009, [int32_pack(i) for i in range(3)])]
+        rows = decode(LazyRowProtocolHandler, make_rows_body(columns)).results[1]
+        self.assertEqual(rows, [(b'', 0), (b'x' * 1000, 1), (None, 2)])
+
+        rows = decode(blob_memoryview_protocol_handler(LazyRowProtocolHandler), make_rows_body(columns)).results[1]
+        self.assertEqual(rows[1][0].tobytes(), b'x' * 1000)
+
+    @cythontest
+    def test_decoding_errors(self):
+        columns = [('k', 0x0009, [int32_pack(1), int32_pack(2)]),
+                   ('v', 0x000D, [b'a', b'\xff'])]
+        rows = decode(LazyRowProtocolHandler, make_rows_body(columns)).results[1]
+        # only the cells accessed are decoded
+        self.assertEqual(rows[1][0], 2)
+        with self.assertRaises(DriverException) as cm:
+            rows[1][1]
+        self.assertIn('Failed decoding result column "v"', str(cm.exception))
+
+    @cythontest
+    def test_rows_outlive_page(self):
+        rows = decode(LazyRowProtocolHandler, make_rows_body()).results[1]
+        row = rows[2]
+        del rows
+        gc.collect()
+        self.assertEqual(row, self.expected_rows[2])
+
+
+class RawScalarsTest(unittest.TestCase):
+
+    expected_rows = [(1500000000123, UUID_BYTES, UUID_BYTES, b'\x7f\x00\x00\x01', 1),
+                     (None, UUID_BYTES, None, b'\x00' * 15 + b'\x01', 2),
+                     (-1, None, UUID_BYTES, None, 3)]
+
+    def test_python_handler(self):
+        body = make_rows_body(RAW_COLUMNS)
+        msg = decode(raw_scalar_protocol_handler(_ProtocolHandler), body)
+        self.assertEqual(msg.results[1], self.expected_rows)
+        # column types are reported as usual
+        self.assertEqual(msg.col_types, decode(_ProtocolHandler, body).col_types)
+
+    @cythontest
+    def test_cython_handler(self):
+        body = make_rows_body(RAW_COLUMNS)
+        msg = decode(raw_scalar_protocol_handler(ProtocolHandler), body)
+        self.assertEqual(msg.results[1], self.expected_rows)
+        self.assertEqual(msg.col_types, decode(ProtocolHandler, body).col_types)
+
+    @numpytest
+    def test_numpy_handler(self):
+        import numpy as np
+
+        msg = decode(raw_scalar_protocol_handler(NumpyProtocolHandler), make_rows_body(RAW_COLUMNS))
+        arrays = msg.results[1]
+        self.assertEqual(arrays['ts'].dtype, np.dtype('datetime64[ms]'))
+        self.assertEqual(arrays['ts'][0], np.datetime64(1500000000123, 'ms'))
+        self.assertEqual(arrays['ts'][2], np.datetime64(-1, 'ms'))
+        self.assertEqual(list(arrays['ts'].mask), [False, True, False])
+        self.assertEqual(list(arrays['id']), [UUID_BYTES, UUID_BYTES, None])
+        self.assertEqual(list(arrays['k']), [1, 2, 3])
+
+
+class BlobMemoryviewTest(unittest.TestCase):
+
+    columns = [('b', 0x0003, [b'\x00\x01', b'', None, b'x' * 1000]),
+               ('k', 0x0009, [int32_pack(i) for i in range(4)])]
+
+    def assert_memoryviews(self, handler, body):
+        rows = decode(handler, body).results[1]
+        self.assertEqual([row[1] for row in rows], [0, 1, 2, 3])
+        blobs = [row[0] for row in rows]
+        self.assertIsNone(blobs[2])
+        for blob, expected in zip(blobs, (b'\x00\x01', b'', None, b'x' * 1000)):
+            if expected is not None:
+                self.assertIsInstance(blob, memoryview)
+                self.assertTrue(blob.readonly)
+                self.assertEqual(blob.tobytes(), expected)
+        return blobs
+
+    def test_python_handler(self):
+        self.assert_memoryviews(blob_memoryview_protocol_handler(_ProtocolHandler), make_rows_body(self.columns))
+
+    @cythontest
+    def test_cython_handler(self):
+        body = make_rows_body(self.columns)
+        blobs = self.assert_memoryviews(blob_memoryview_protocol_handler(ProtocolHandler), body)
+        if hasattr(blobs[0], 'obj'):  # Python 3
+            # the views share the page rather than copying it
+            self.assertIs(blobs[0].obj, blobs[3].obj)
+            self.assertIn(blobs[3].tobytes(), blobs[3].obj)
+
+        handler = raw_scalar_protocol_handler(blob_memoryview_protocol_handler(ProtocolHandler))
+        self.assert_memoryviews(handler._for_row_factory(named_tuple_factory), body)
+
+    @numpytest
+    def test_numpy_handler(self):
+        arrays = decode(blob_memoryview_protocol_handler(NumpyProtocolHandler), make_rows_body(self.columns)).results[1]
+        self.assertEqual([None if b is None else b.tobytes() for b in arrays['b']],
+                         [b'\x00\x01', b'', None, b'x' * 1000])
@@ -0,0 +1,149 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal
+import struct
+import uuid
+
+from tests.unit.cython.utils import cythontest
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest  # noqa
+
+from cassandra import cqltypes
+from cassandra.cqltypes import lookup_casstype
+from cassandra.cython_deps import HAVE_CYTHON
+from cassandra.protocol import ColumnMetadata
+from cassandra.query import PreparedStatement
+from cassandra.util import OrderedMapSerializedKey, sortedset
+
+if HAVE_CYTHON:
+    from cassandra.serializers import find_serializer, Serializer
+else:
+    find_serializer = Serializer = None
+
+
+Address = namedtuple('Address', ('street', 'zipcode'))
+
+
+class Street(object):
+
+    def __init__(self, street, zipcode):
+        self.street = street
+        self.zipcode = zipcode
+
+
+address_type = cqltypes.UserType.make_udt_class('ks', 'address', ('street', 'zipcode'),
+                                               (cqltypes.UTF8Type, cqltypes.Int32Type))
+
+VALUES = [
+    (cqltypes.Int32Type, [0, 1, -1, 2 ** 31 - 1, -2 ** 31]),
+    (cqltypes.LongType, [0, 42, -2 ** 63, 2 ** 63 - 1]),
+    (cqltypes.CounterColumnType, [7, -7]),
+    (cqltypes.ShortType, [0, -2 ** 15, 2 ** 15 - 1]),
+    (cqltypes.ByteType, [0, -128, 127]),
+    (cqltypes.FloatType, [0.0, -1.5, 3.4e38, float('inf')]),
+    (cqltypes.DoubleType, [0.0, 1.1, -1e308, float('-inf')]),
+    (cqltypes.BooleanType, [True, False]),
+    (cqltypes.UTF8Type, [u'', u'abc', u'\xe9\u20ac']),
+    (cqltypes.VarcharType, [u'xyz']),
+    (cqltypes.AsciiType, ['abc', '']),
+    (cqltypes.BytesType, [b'', b'\x00\xff']),
+    (cqltypes.UUIDType, [uuid.uuid4()]),
+    (cqltypes.TimeUUIDType, [uuid.uuid1()]),
+    (cqltypes.DateType, [datetime(1970, 1, 1), datetime(2017, 6, 1, 12, 30, 5, 123456),
+                         datetime(1900, 2, 3, 4, 5, 6, 999), datetime(9999, 12, 31, 23, 59, 59, 999999)]),
+    (cqltypes.TimestampType, [datetime(2000, 1, 1, 0, 0, 0, 1)]),
+    (lookup_casstype('ListType(Int32Type)'), [[], [1, 2, 3], (4, None)]),
+    (lookup_casstype('SetType(UTF8Type)'), [set(), sortedset([u'a', u'b'])]),
+    (lookup_casstype('MapType(UTF8Type, ListType(DoubleType))'),
+     [{}, {u'a': [1.0, 2.0], u'b': []}, OrderedMapSerializedKey(cqltypes.UTF8Type, 3)]),
+    (lookup_casstype('TupleType(Int32Type, UTF8Type, BooleanType)'), [(1, u'a', True), (None, u'b'), ()]),
+    (address_type, [Address(u'Main St', 12345), Address(None, 1), Street(u'Side St', None)]),
+    (lookup_casstype('ReversedType(LongType)'), [1, -1]),
+    (lookup_casstype('FrozenType(ListType(UTF8Type))'), [[u'frozen']]),
+]
+
+
+class SerializersTest(unittest.TestCase):
+
+    def assert_serialized_like_python(self, cqltype, value, protocol_version):
+        expected = cqltype.serialize(value, protocol_version)
+        serialized = find_serializer(cqltype).serialize(value, protocol_version)
+        self.assertEqual(serialized, expected, (cqltype, value, protocol_version))
+
+    @cythontest
+    def test_matches_cqltypes(self):
+        for protocol_version in (1, 2, 3, 4):
+            for cqltype, values in VALUES:
+                for value in values:
+                    self.assert_serialized_like_python(cqltype, value, protocol_version)
+
+    @cythontest
+    def test_falls_back_to_cqltypes(self):
+        # types not handled by the fast paths go through cqltype.serialize
+        self.assert_serialized_like_python(cqltypes.Int32Type, True, 4)
+        self.assert_serialized_like_python(cqltypes.DoubleType, 1, 4)
+        self.assert_serialized_like_python(cqltypes.ShortType, False, 4)
+        self.assert_serialized_like_python(cqltypes.BytesType, bytearray(b'abc'), 4)
+        self.assert_serialized_like_python(cqltypes.DecimalType, Decimal('1.5'), 4)
+        self.assert_serialized_like_python(cqltypes.IntegerType, 2 ** 100, 4)
+        self.assertIs(type(find_serializer(cqltypes.DecimalType)), Serializer)
+
+    @cythontest
+    def test_invalid_values_raise_like_cqltypes(self):
+        invalid = [
+            (cqltypes.Int32Type, 2 ** 31),
+            (cqltypes.Int32Type, 'string not int'),
+            (cqltypes.LongType, 2 ** 64),
+            (cqltypes.ByteType, 128),
+            (cqltypes.FloatType, 1e39),
+            (cqltypes.UUIDType, 'not a uuid'),
+            (lookup_casstype('ListType(Int32Type)'), 'abc'),
+            (lookup_casstype('ListType(Int32Type)'), [1, 'a']),
+            (lookup_casstype('MapType(Int32Type, Int32Type)'), [(1, 2)]),
+            (lookup_casstype('TupleType(Int32Type)'), (1, 2)),
+            (address_type, object()),
+        ]
+        for cqltype, value in invalid:
+            try:
+                cqltype.serialize(value, 4)
+            except Exception as exc:
+                expected = type(exc)
+            else:
+                self.fail("%s did not raise for %r" % (cqltype, value))
+            self.assertRaises(expected, find_serializer(cqltype).serialize, value, 4)
+
+        # collection element lengths are unsigned shorts before v3
+        self.assertRaises(struct.error, find_serializer(lookup_casstype('ListType(BytesType)')).serialize,
+                          [b'x' * 2 ** 16], 2)
+
+    @cythontest
+    def test_prepared_statement_caches_serializers(self):
+        prepared = PreparedStatement(column_metadata=[ColumnMetadata('ks', 'cf', 'a', cqltypes.Int32Type),
+                                                      ColumnMetadata('ks', 'cf', 'b', address_type)],
+                                     query_id=None, routing_key_indexes=[0], query=None, keyspace='ks',
+                                     protocol_version=4, result_metadata=None)
+        serializers = prepared._get_bind_plan().serializers
+        self.assertIs(prepared._get_bind_plan().serializers, serializers)
+        self.assertTrue(all(isinstance(s, Serializer) for s in serializers))
+
+        bound = prepared.bind((1, Address(u'Main St', 1)))
+        self.assertEqual(bound.values, [cqltypes.Int32Type.serialize(1, 4),
+                                        address_type.serialize(Address(u'Main St', 1), 4)])
+        self.assertRaises(TypeError, prepared.bind, ('not an int', Address(u'Main St', 1)))
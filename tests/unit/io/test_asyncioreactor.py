@@ -0,0 +1,228 @@
+# Copyright 2013-2017 DataStax, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest  # noqa
+
+from concurrent.futures import Future
+from mock import Mock, patch
+import socket
+from threading import Thread
+import time
+
+try:
+    import asyncio
+    from cassandra.io import asyncioreactor
+    from cassandra.io.asyncioreactor import AsyncioConnection, AsyncioLoop, in_loop_thread
+except ImportError:
+    AsyncioConnection = None  # NOQA
+
+from cassandra.cluster import ResultSet, Session
+from cassandra.connection import ConnectionShutdown
+from cassandra.marshal import uint32_pack
+from cassandra.protocol import OptionsMessage, SupportedMessage, write_stringmultimap
+from six import BytesIO
+from tests import is_monkey_patched
+from tests.unit.io.utils import submit_and_wait_for_completion, TimerCallback
+
+
+class AsyncioTestBase(unittest.TestCase):
+
+    def setUp(self):
+        if AsyncioConnection is None:
+            raise unittest.SkipTest("asyncio is not available")
+        if is_monkey_patched():
+            raise unittest.SkipTest("Can't test asyncio with monkey patching")
+        AsyncioConnection.initialize_reactor()
+        AsyncioConnection._reactor.maybe_start()
+
+
+class AsyncioTimerTest(AsyncioTestBase):
+
+    def test_multi_timer_validation(self):
+        """
+        Verify that timer timeouts are honored appropriately
+        """
+        submit_and_wait_for_completion(self, AsyncioConnection, 0, 100, 1, 100)
+        submit_and_wait_for_completion(self, AsyncioConnection, 100, 0, -1, 100)
+        submit_and_wait_for_completion(self, AsyncioConnection, 0, 100, 1, 100, True)
+
+    def test_timer_cancellation(self):
+        """
+        Verify that timer cancellation is honored
+        """
+        timeout = .1
+        callback = TimerCallback(timeout)
+        timer = AsyncioConnection.create_timer(timeout, callback.invoke)
+        timer.cancel()
+        time.sleep(.2)
+        self.assertFalse(callback.was_invoked())
+
+
+class AsyncioConnectionTest(AsyncioTestBase):
+
+    def setUp(self):
+        super(AsyncioConnectionTest, self).setUp()
+        self.client_sock, self.server_sock = socket.socketpair()
+        self.server_sock.settimeout(5)
+        self.addCleanup(self.server_sock.close)
+
+    def make_connection(self, **kwargs):
+        c = AsyncioConnection.__new__(AsyncioConnection)
+
+        def connect_socket():
+            self.connect_state = (c.ssl_options, c._check_hostname)
+            c._socket = self.client_sock
+
+        # connect the instance to our socket pair before __init__ runs
+        c._connect_socket = connect_socket
+        c.__init__('1.2.3.4', cql_version='3.0.1', **kwargs)
+        return c
+
+    def read_frame(self):
+        header = self.server_sock.recv(9)
+        body_len = int.from_bytes(header[5:9], 'big')
+        body = b''
+        while len(body) < body_len:
+            body += self.server_sock.recv(body_len - len(body))
+        return header, body
+
+    def wait_for(self, predicate):
+        deadline = time.time() + 5
+        while not predicate() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(predicate())
+
+    def test_connection_sends_options(self):
+        c = self.make_connection()
+        self.addCleanup(c.close)
+        header, _ = self.read_frame()
+        self.assertEqual(header[4], OptionsMessage.opcode)
+
+    def test_received_frames_are_processed_on_loop(self):
+        c = self.make_connection()
+        self.addCleanup(c.close)
+        header, _ = self.read_frame()
+        c._send_startup_message = Mock()
+
+        options_buf = BytesIO()
+        write_stringmultimap(options_buf, {'CQL_VERSION': ['3.0.1'], 'COMPRESSION': []})
+        body = options_buf.getvalue()
+        response = bytes([0x80 | header[0], 0]) + header[2:4] + bytes([SupportedMessage.opcode]) + uint32_pack(len(body)) + body
+        # split the frame to exercise reassembly across reads
+        self.server_sock.sendall(response[:5])
+        time.sleep(0.05)
+        self.server_sock.sendall(response[5:])
+
+        self.wait_for(lambda: c._send_startup_message.called)
+        self.assertFalse(c._requests)
+
+    def test_ssl_left_to_transport(self):
+        with patch.object(AsyncioConnection, '_make_ssl_context', return_value=None):
+            c = self.make_connection(ssl_options={'check_hostname': True})
+        self.addCleanup(c.close)
+        # the socket is neither wrapped nor hostname-checked before asyncio's own handshake
+        self.assertEqual(self.connect_state, (None, False))
+
+    def test_close_errors_requests(self):
+        c = self.make_connection()
+        callback = Mock()
+        c._requests[10] = (callback, None, None)
+        c.close()
+        self.assertTrue(c.is_closed)
+        self.assertTrue(c.connected_event.is_set())
+        self.assertIsInstance(callback.call_args[0][0], ConnectionShutdown)
+
+    def test_server_close_closes_connection(self):
+        c = self.make_connection()
+        self.read_frame()
+        self.server_sock.close()
+        self.wait_for(lambda: c.is_closed or c.is_defunct)
+
+
+class LoopThreadTest(unittest.TestCase):
+
+    def setUp(self):
+        if AsyncioConnection is None:
+            raise unittest.SkipTest("asyncio is not available")
+
+    def check_loop_set_current_on_other_thread(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        reactor = AsyncioLoop(loop)
+        worker = Thread(target=loop.run_forever)
+        worker.start()
+        results = {}
+
+        def caller():
+            # the application's loop is current for this thread, but run by the worker
+            asyncio.set_event_loop(loop)
+            reactor.maybe_start()
+            in_loop = Future()
+            loop.call_soon_threadsafe(lambda: in_loop.set_result(in_loop_thread(loop)))
+            results['loop'] = in_loop.result(5)
+            results['caller'] = in_loop_thread(loop)
+
+        try:
+            thread = Thread(target=caller)
+            thread.start()
+            thread.join(5)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            worker.join(5)
+
+        self.assertEqual(results, {'loop': True, 'caller': False})
+
+    def test_loop_set_current_on_other_thread(self):
+        self.check_loop_set_current_on_other_thread()
+
+    def test_loop_thread_recorded(self):
+        # without a running loop API, the thread is probed when connecting
+        with patch.object(asyncioreactor, '_running_loop', None):
+            self.check_loop_set_current_on_other_thread()
+
+
+class ExecuteAioTest(unittest.TestCase):
+
+    def setUp(self):
+        if AsyncioConnection is None:
+            raise unittest.SkipTest("asyncio is not available")
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.response_future = Mock()
+        self.session = Mock(spec=Session)
+        self.session.execute_async.return_value = self.response_future
+
+    def test_result_delivered_in_loop(self):
+        aio_future = Session.execute_aio(self.session, "SELECT * FROM t", loop=self.loop)
+        callback = self.response_future.add_callbacks.call_args[1]['callback']
+
+        def deliver():
+            callback(['row'])
+            # set in place since we are already on the target loop
+            self.assertTrue(aio_future.done())
+
+        self.loop.call_soon(deliver)
+        result = self.loop.run_until_complete(aio_future)
+        self.assertIsInstance(result, ResultSet)
+        self.assertEqual(result.current_rows, ['row'])
+
+    def test_error_delivered_from_other_thread(self):
+        aio_future = Session.execute_aio(self.session, "SELECT * FROM t", loop=self.loop)
+        errback = self.response_future.add_callbacks.call_args[1]['errback']
+        errback(ConnectionShutdown("closed"))
+        self.assertFalse(aio_future.done())
+        self.assertRaises(ConnectionShutdown, self.loop.run_until_complete, aio_future)
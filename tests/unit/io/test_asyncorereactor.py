@@ -20,10 +20,10 @@ except ImportError:
     import unittest # noqa
 
 import errno
+import itertools
 import math
 import time
 from mock import patch, Mock
-import os
 from six import BytesIO
 import socket
 from socket import error as socket_error
@@ -34,7 +34,7 @@ from cassandra.protocol import (write_stringmultimap, write_int, write_string,
                                 SupportedMessage, ReadyMessage, ServerError)
 from cassandra.marshal import uint8_pack, uint32_pack, int32_pack
 from tests import is_monkey_patched
-from tests.unit.io.utils import submit_and_wait_for_completion, TimerCallback
+from tests.unit.io.utils import submit_and_wait_for_completion, TimerCallback, recv_into_from_recv
 
 
 class AsyncoreConnectionTest(unittest.TestCase):
@@ -66,6 +66,8 @@ class AsyncoreConnectionTest(unittest.TestCase):
         c = AsyncoreConnection('1.2.3.4', cql_version='3.0.1')
         c.socket = Mock()
         c.socket.send.side_effect = lambda x: len(x)
+        c.socket.sendmsg.side_effect = lambda buffers: sum(len(b) for b in buffers)
+        recv_into_from_recv(c.socket)
         return c
 
     def make_header_prefix(self, message_class, version=2, stream_id=0):
@@ -108,13 +110,27 @@ class AsyncoreConnectionTest(unittest.TestCase):
         # let it write out a StartupMessage
         c.handle_write()
 
-        header = self.make_header_prefix(ReadyMessage, stream_id=1)
+        header = self.make_header_prefix(ReadyMessage)
         c.socket.recv.return_value = self.make_msg(header)
         c.handle_read()
 
         self.assertTrue(c.connected_event.is_set())
         return c
 
+    def test_frames_processed_before_close(self, *args):
+        c = self.make_connection()
+        c.handle_write()
+        c._send_startup_message = Mock()
+
+        # the server closes the connection right after its response
+        msg = self.make_msg(self.make_header_prefix(SupportedMessage), self.make_options_body())
+        c.in_buffer_size = len(msg)
+        c.socket.recv.side_effect = [msg, b'']
+        c.handle_read()
+
+        self.assertTrue(c._send_startup_message.called)
+        self.assertTrue(c.is_closed)
+
     def test_egain_on_buffer_size(self, *args):
         # get a connection that's already fully started
         c = self.test_successful_connection()
@@ -138,13 +154,11 @@ class AsyncoreConnectionTest(unittest.TestCase):
         c.handle_read()
         self.assertEqual(c._current_frame.end_pos, 20000 + len(header))
         # the EAGAIN prevents it from reading the last 100 bytes
-        c._iobuf.seek(0, os.SEEK_END)
         pos = c._iobuf.tell()
         self.assertEqual(pos, 4096 + 4096)
 
         # now tell it to read the last 100 bytes
         c.handle_read()
-        c._iobuf.seek(0, os.SEEK_END)
         pos = c._iobuf.tell()
         self.assertEqual(pos, 4096 + 4096 + 100)
 
@@ -180,7 +194,7 @@ class AsyncoreConnectionTest(unittest.TestCase):
         # let it write out a StartupMessage
         c.handle_write()
 
-        header = self.make_header_prefix(ServerError, stream_id=1)
+        header = self.make_header_prefix(ServerError)
         body = self.make_error_body(ServerError.error_code, ServerError.summary)
         c.socket.recv.return_value = self.make_msg(header, body)
         c.handle_read()
@@ -234,6 +248,79 @@ class AsyncoreConnectionTest(unittest.TestCase):
         self.assertEqual(expected_writes, c.socket.send.call_count)
         self.assertEqual(last_write_size, len(c.socket.send.call_args[0][0]))
 
+    def test_coalesced_write(self, *args):
+        c = self.make_connection()
+        c.push(b'a' * 10)
+        c.push(b'b' * 20)
+
+        # the OptionsMessage and both pushes go out in a single call
+        c.handle_write()
+        self.assertFalse(c.is_defunct)
+        self.assertFalse(c.socket.send.called)
+        self.assertEqual(1, c.socket.sendmsg.call_count)
+        self.assertEqual([9, 10, 20], [len(b) for b in c.socket.sendmsg.call_args[0][0]])
+
+    def test_partial_coalesced_write(self, *args):
+        c = self.make_connection()
+        c.push(b'a' * 10)
+        c.push(b'b' * 20)
+
+        # write the OptionsMessage and part of the first push, then block
+        c.socket.sendmsg.side_effect = [12, socket_error(errno.EAGAIN, "socket busy")]
+        c.handle_write()
+        self.assertFalse(c.is_defunct)
+
+        c.socket.sendmsg.side_effect = lambda buffers: sum(len(b) for b in buffers)
+        c.handle_write()
+        self.assertFalse(c.is_defunct)
+        self.assertEqual(b'a' * 7 + b'b' * 20, b''.join(c.socket.sendmsg.call_args[0][0]))
+
+    def test_ssl_coalesced_write_is_joined(self, *args):
+        c = self.make_connection()
+        c.ssl_options = {'ca_certs': 'ca.pem'}
+        c.push(b'a' * 10)
+
+        # SSL sockets do not support sendmsg
+        c.handle_write()
+        self.assertFalse(c.socket.sendmsg.called)
+        self.assertEqual(1, c.socket.send.call_count)
+        self.assertEqual(19, len(c.socket.send.call_args[0][0]))
+
+    def test_connections_assigned_round_robin(self, *args):
+        loops = [Mock(_dispatcher_map={}) for _ in range(3)]
+        with patch.object(AsyncoreConnection, '_loops', loops):
+            assigned = [self.make_connection()._loop for _ in range(6)]
+
+        for loop in loops:
+            self.assertEqual(2, assigned.count(loop))
+
+    def test_connections_assigned_by_host(self, *args):
+        loops = [Mock(_dispatcher_map={}) for _ in range(3)]
+        with patch.object(AsyncoreConnection, '_loops', loops), \
+                patch.object(AsyncoreConnection, 'assign_loops_by_host', True):
+            for host in ('1.2.3.4', '1.2.3.5', '1.2.3.6'):
+                assigned = set(AsyncoreConnection(host, cql_version='3.0.1')._loop for _ in range(3))
+                self.assertEqual(1, len(assigned))
+
+    def test_create_timer_starts_timer_loop(self, *args):
+        loops = [Mock(_dispatcher_map={}) for _ in range(3)]
+        with patch.object(AsyncoreConnection, '_loops', loops), \
+                patch.object(AsyncoreConnection, '_loop', loops[0]):
+            timer = AsyncoreConnection.create_timer(10, lambda: None)
+
+        loops[0].add_timer.assert_called_once_with(timer)
+        loops[0].maybe_start.assert_called_once_with()
+
+    def test_create_loops_resets_counter(self, *args):
+        counter = itertools.count()
+        next(counter)
+        with patch.object(AsyncoreConnection, '_loops', ()), \
+                patch.object(AsyncoreConnection, '_loop', None), \
+                patch.object(AsyncoreConnection, '_loop_counter', counter), \
+                patch('cassandra.io.asyncorereactor.AsyncoreLoop'):
+            AsyncoreConnection._create_loops()
+            self.assertEqual(0, next(AsyncoreConnection._loop_counter))
+
     def test_socket_error_on_read(self, *args):
         c = self.make_connection()
 
@@ -267,7 +354,7 @@ class AsyncoreConnectionTest(unittest.TestCase):
         # let it write out a StartupMessage
         c.handle_write()
 
-        header = self.make_header_prefix(ReadyMessage, stream_id=1)
+        header = self.make_header_prefix(ReadyMessage)
         c.socket.recv.return_value = self.make_msg(header)
         c.handle_read()
 
@@ -294,7 +381,7 @@ class AsyncoreConnectionTest(unittest.TestCase):
         # let it write out a StartupMessage
         c.handle_write()
 
-        header = self.make_header_prefix(ReadyMessage, stream_id=1)
+        header = self.make_header_prefix(ReadyMessage)
         c.socket.recv.return_value = self.make_msg(header)
         c.handle_read()
 
@@ -328,7 +415,7 @@ class AsyncoreConnectionTest(unittest.TestCase):
         time.sleep(.2)
         timer_manager = connection._loop._timers
         # Assert that the cancellation was honored
-        self.assertFalse(timer_manager._queue)
+        self.assertFalse(any(timer_manager._level_counts))
         self.assertFalse(timer_manager._new_timers)
         self.assertFalse(callback.was_invoked())
 
@@ -17,22 +17,23 @@ except ImportError:
     import unittest # noqa
 
 import errno
+import itertools
 import math
-from mock import patch, Mock
-import os
+from mock import patch, Mock, MagicMock
 import weakref
 import six
 from six import BytesIO
 from socket import error as socket_error
 
 from cassandra.connection import (HEADER_DIRECTION_TO_CLIENT,
-                                  ConnectionException, ProtocolError)
+                                  ConnectionException, ProtocolError, Timer)
 
 from cassandra.protocol import (write_stringmultimap, write_int, write_string,
                                 SupportedMessage, ReadyMessage, ServerError)
 from cassandra.marshal import uint8_pack, uint32_pack, int32_pack
 
 from tests import is_monkey_patched
+from tests.unit.io.utils import recv_into_from_recv
 
 
 try:
@@ -60,6 +61,8 @@ class LibevConnectionTest(unittest.TestCase):
         c = LibevConnection('1.2.3.4', cql_version='3.0.1')
         c._socket = Mock()
         c._socket.send.side_effect = lambda x: len(x)
+        c._socket.sendmsg.side_effect = lambda buffers: sum(len(b) for b in buffers)
+        recv_into_from_recv(c._socket)
         return c
 
     def make_header_prefix(self, message_class, version=2, stream_id=0):
@@ -102,7 +105,7 @@ class LibevConnectionTest(unittest.TestCase):
         # let it write out a StartupMessage
         c.handle_write(None, 0)
 
-        header = self.make_header_prefix(ReadyMessage, stream_id=1)
+        header = self.make_header_prefix(ReadyMessage)
         c._socket.recv.return_value = self.make_msg(header)
         c.handle_read(None, 0)
 
@@ -132,13 +135,11 @@ class LibevConnectionTest(unittest.TestCase):
         c.handle_read(None, 0)
         self.assertEqual(c._current_frame.end_pos, 20000 + len(header))
         # the EAGAIN prevents it from reading the last 100 bytes
-        c._iobuf.seek(0, os.SEEK_END)
         pos = c._iobuf.tell()
         self.assertEqual(pos, 4096 + 4096)
 
         # now tell it to read the last 100 bytes
         c.handle_read(None, 0)
-        c._iobuf.seek(0, os.SEEK_END)
         pos = c._iobuf.tell()
         self.assertEqual(pos, 4096 + 4096 + 100)
 
@@ -174,7 +175,7 @@ class LibevConnectionTest(unittest.TestCase):
         # let it write out a StartupMessage
         c.handle_write(None, 0)
 
-        header = self.make_header_prefix(ServerError, stream_id=1)
+        header = self.make_header_prefix(ServerError)
         body = self.make_error_body(ServerError.error_code, ServerError.summary)
         c._socket.recv.return_value = self.make_msg(header, body)
         c.handle_read(None, 0)
@@ -228,6 +229,98 @@ class LibevConnectionTest(unittest.TestCase):
         self.assertEqual(expected_writes, c._socket.send.call_count)
         self.assertEqual(last_write_size, len(c._socket.send.call_args[0][0]))
 
+    def test_coalesced_write(self, *args):
+        c = self.make_connection()
+        c.push(b'a' * 10)
+        c.push(b'b' * 20)
+
+        # the OptionsMessage and both pushes go out in a single call
+        c.handle_write(None, 0)
+        self.assertFalse(c.is_defunct)
+        self.assertFalse(c._socket.send.called)
+        self.assertEqual(1, c._socket.sendmsg.call_count)
+        self.assertEqual([9, 10, 20], [len(b) for b in c._socket.sendmsg.call_args[0][0]])
+
+    def test_partial_coalesced_write(self, *args):
+        c = self.make_connection()
+        c.push(b'a' * 10)
+        c.push(b'b' * 20)
+
+        # write the OptionsMessage and part of the first push, then block
+        c._socket.sendmsg.side_effect = [12, socket_error(errno.EAGAIN, "socket busy")]
+        c.handle_write(None, 0)
+        self.assertFalse(c.is_defunct)
+
+        c._socket.sendmsg.side_effect = lambda buffers: sum(len(b) for b in buffers)
+        c.handle_write(None, 0)
+        self.assertFalse(c.is_defunct)
+        self.assertEqual(b'a' * 7 + b'b' * 20, b''.join(c._socket.sendmsg.call_args[0][0]))
+
+    def test_ssl_coalesced_write_is_joined(self, *args):
+        c = self.make_connection()
+        c.ssl_options = {'ca_certs': 'ca.pem'}
+        c.push(b'a' * 10)
+
+        # SSL sockets do not support sendmsg
+        c.handle_write(None, 0)
+        self.assertFalse(c._socket.sendmsg.called)
+        self.assertEqual(1, c._socket.send.call_count)
+        self.assertEqual(19, len(c._socket.send.call_args[0][0]))
+
+    def test_connections_assigned_round_robin(self, *args):
+        loops = [MagicMock() for _ in range(3)]
+        with patch.object(LibevConnection, '_libevloops', loops):
+            assigned = [self.make_connection()._libevloop for _ in range(6)]
+
+        for loop in loops:
+            self.assertEqual(2, assigned.count(loop))
+
+    def test_connections_assigned_by_host(self, *args):
+        loops = [MagicMock() for _ in range(3)]
+        with patch.object(LibevConnection, '_libevloops', loops), \
+                patch.object(LibevConnection, 'assign_loops_by_host', True):
+            for host in ('1.2.3.4', '1.2.3.5', '1.2.3.6'):
+                assigned = set(LibevConnection(host, cql_version='3.0.1')._libevloop for _ in range(3))
+                self.assertEqual(1, len(assigned))
+
+    def test_create_timer_starts_timer_loop(self, *args):
+        loops = [MagicMock() for _ in range(3)]
+        with patch.object(LibevConnection, '_libevloops', loops), \
+                patch.object(LibevConnection, '_libevloop', loops[0]):
+            timer = LibevConnection.create_timer(10, lambda: None)
+
+        loops[0].add_timer.assert_called_once_with(timer)
+        loops[0].maybe_start.assert_called_once_with()
+
+    def test_create_loops_resets_counter(self, *args):
+        counter = itertools.count()
+        next(counter)
+        with patch.object(LibevConnection, '_libevloops', ()), \
+                patch.object(LibevConnection, '_libevloop', None), \
+                patch.object(LibevConnection, '_loop_counter', counter), \
+                patch('cassandra.io.libevreactor.LibevLoop'):
+            LibevConnection._create_loops()
+            self.assertEqual(0, next(LibevConnection._loop_counter))
+
+    def test_loop_runs_while_timers_pending(self, *args):
+        loop = LibevLoop()
+        loop._loop = Mock()
+        timer = Timer(10, lambda: None)
+        loop.add_timer(timer)
+
+        def start():
+            if loop._loop.start.call_count == 2:
+                timer.cancel()
+                loop._timers.service_timeouts()
+
+        loop._loop.start.side_effect = start
+        loop._started = True
+        loop._run_loop()
+
+        # no connections, but the first return left a timer pending
+        self.assertEqual(2, loop._loop.start.call_count)
+        self.assertFalse(loop._started)
+
     def test_socket_error_on_read(self, *args):
         c = self.make_connection()
 
@@ -262,7 +355,7 @@ class LibevConnectionTest(unittest.TestCase):
         # let it write out a StartupMessage
         c.handle_write(None, 0)
 
-        header = self.make_header_prefix(ReadyMessage, stream_id=1)
+        header = self.make_header_prefix(ReadyMessage)
         c._socket.recv.return_value = self.make_msg(header)
         c.handle_read(None, 0)
 
@@ -289,7 +382,7 @@ class LibevConnectionTest(unittest.TestCase):
         # let it write out a StartupMessage
         c.handle_write(None, 0)
 
-        header = self.make_header_prefix(ReadyMessage, stream_id=1)
+        header = self.make_header_prefix(ReadyMessage)
         c._socket.recv.return_value = self.make_msg(header)
         c.handle_read(None, 0)
 
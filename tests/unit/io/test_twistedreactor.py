@@ -71,7 +71,7 @@ class TestTwistedTimer(unittest.TestCase):
         time.sleep(.2)
         timer_manager = connection._loop._timers
         # Assert that the cancellation was honored
-        self.assertFalse(timer_manager._queue)
+        self.assertFalse(any(timer_manager._level_counts))
         self.assertFalse(timer_manager._new_timers)
         self.assertFalse(callback.was_invoked())
 
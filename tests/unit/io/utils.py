@@ -20,6 +20,18 @@ except ImportError:
 import time
 
 
+def recv_into_from_recv(mock_socket):
+    """
+    Drives ``recv_into`` on a mock socket from its ``recv`` mock, so tests can keep
+    setting up received data through ``recv.return_value`` and ``recv.side_effect``.
+    """
+    def recv_into(buf, nbytes=0):
+        data = mock_socket.recv(nbytes or len(buf))
+        buf[:len(data)] = data
+        return len(data)
+    mock_socket.recv_into.side_effect = recv_into
+
+
 class TimerCallback(object):
 
     invoked = False
@@ -136,6 +148,6 @@ class TimerConnectionTests(object):
         time.sleep(.2)
         timer_manager = self.connection_class._timers
         # Assert that the cancellation was honored
-        self.assertFalse(timer_manager._queue)
+        self.assertFalse(any(timer_manager._level_counts))
         self.assertFalse(timer_manager._new_timers)
         self.assertFalse(callback.was_invoked())
@@ -16,12 +16,15 @@ try:
 except ImportError:
     import unittest  # noqa
 
-from mock import patch
+from functools import partial
+from mock import patch, Mock
 
 from cassandra import ConsistencyLevel, DriverException, Timeout, Unavailable, RequestExecutionException, ReadTimeout, WriteTimeout, CoordinationFailure, ReadFailure, WriteFailure, FunctionFailure, AlreadyExists,\
     InvalidRequest, Unauthorized, AuthenticationFailed, OperationTimedOut, UnsupportedOperation, RequestValidationException, ConfigurationException
 from cassandra.cluster import _Scheduler, Session, Cluster, _NOT_SET, default_lbp_factory, \
-    ExecutionProfile, _ConfigMode, EXEC_PROFILE_DEFAULT, NoHostAvailable
+    ExecutionProfile, _ConfigMode, EXEC_PROFILE_DEFAULT, NoHostAvailable, _scan_ranges
+from cassandra.metadata import (KeyspaceMetadata, TableMetadata, ColumnMetadata, TokenMap,
+                                Murmur3Token, BytesToken, MIN_LONG, MAX_LONG)
 from cassandra.policies import HostDistance, RetryPolicy, RoundRobinPolicy, \
     DowngradingConsistencyRetryPolicy, SimpleConvictionPolicy
 from cassandra.query import SimpleStatement, named_tuple_factory, tuple_factory
@@ -367,3 +370,109 @@ class ExecutionProfileTest(unittest.TestCase):
 
         # cannot add a profile added dynamically
         self.assertRaises(ValueError, cluster.add_execution_profile, 'two', ExecutionProfile())
+
+
+class ScanTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.hosts = [Host("127.0.0.%d" % i, SimpleConvictionPolicy) for i in range(1, 4)]
+        for host in self.hosts:
+            host.set_up()
+        self.owners = {Murmur3Token(-100): self.hosts[0], Murmur3Token(0): self.hosts[1], Murmur3Token(100): self.hosts[2]}
+
+    def _make_token_map(self, token_class=Murmur3Token):
+        metadata = Mock(keyspaces={'ks': KeyspaceMetadata('ks', True, 'SimpleStrategy', {'replication_factor': '1'})})
+        table = TableMetadata('ks', 'tbl')
+        table.partition_key = [ColumnMetadata(table, 'a', 'int'), ColumnMetadata(table, 'b', 'int')]
+        metadata.keyspaces['ks'].tables['tbl'] = table
+        owners = dict((token_class(t.value), host) for t, host in self.owners.items())
+        metadata.token_map = TokenMap(token_class, owners, sorted(owners), metadata)
+        return metadata.token_map
+
+    def _owner(self, token):
+        # owner of the ring range of a token
+        for ring_token in sorted(t.value for t in self.owners):
+            if token <= ring_token:
+                return self.owners[Murmur3Token(ring_token)]
+        return self.owners[Murmur3Token(-100)]
+
+    def test_scan_ranges(self):
+        token_map = self._make_token_map()
+
+        for splits in (1, 3, 12, 100):
+            ranges = _scan_ranges(token_map, 'ks', splits)
+            self.assertGreaterEqual(len(ranges), min(splits, 4))
+
+            # the ranges cover the ring
+            ordered = sorted(ranges)
+            self.assertEqual(ordered[0][0], MIN_LONG)
+            self.assertEqual(ordered[-1][1], MAX_LONG)
+            for (_, end, _), (start, _, _) in zip(ordered, ordered[1:]):
+                self.assertEqual(end, start)
+
+            for start, end, replicas in ranges:
+                self.assertLess(start, end)
+                self.assertEqual(replicas, [self._owner(end)])
+
+        # consecutive ranges alternate between the ranges of the ring
+        ranges = _scan_ranges(token_map, 'ks', 12)
+        self.assertNotEqual(ranges[0][2], ranges[1][2])
+
+    def test_scan_ranges_unsupported_partitioner(self):
+        token_map = Mock(token_class=BytesToken, ring=[BytesToken(b'a')])
+        self.assertRaises(DriverException, _scan_ranges, token_map, 'ks', 1)
+
+    def _patch_requests(self, session, send_request):
+        # patch each future: ResponseFuture methods are not functions when cluster.py is compiled
+        create_future = session._create_response_future
+
+        def create_response_future(*args, **kwargs):
+            future = create_future(*args, **kwargs)
+            future.send_request = partial(send_request, future)
+            return future
+
+        return patch.object(session, '_create_response_future', side_effect=create_response_future)
+
+    @mock_session_pools
+    def test_scan_table(self):
+        policy = RoundRobinPolicy()
+        policy.populate(None, self.hosts)
+        cluster = Cluster(execution_profiles={EXEC_PROFILE_DEFAULT: ExecutionProfile(policy)})
+        session = Session(cluster, hosts=self.hosts)
+        cluster.metadata = self._make_token_map()._metadata
+
+        queries = []
+
+        def send_request(future, error_no_hosts=True):
+            # two pages per range, the first row of each page being its token range
+            start, end = [int(t) for t in future.message.query.split(' > ')[1].split(' AND token(a, b) <= ')]
+            first_host = next(future.query_plan)
+            queries.append((future.message.query, first_host))
+            self.assertEqual(first_host, self._owner(end))
+            if future.message.paging_state is None:
+                future._paging_state = b'page'
+                future._set_final_result([(start, end, 1)])
+            else:
+                future._paging_state = None
+                future._set_final_result([(start, end, 2), (start, end, 3)])
+
+        with self._patch_requests(session, send_request):
+            rows = list(session.scan_table('ks', 'tbl', ['a', 'c'], splits_per_host=2, concurrency=2, timeout=None))
+
+        self.assertTrue(queries[0][0].startswith('SELECT a, c FROM ks.tbl WHERE token(a, b) > '))
+        ranges = set((start, end) for start, end, _ in rows)
+        self.assertEqual(len(rows), 3 * len(ranges))
+        self.assertEqual(len(queries), 2 * len(ranges))
+        self.assertGreaterEqual(len(ranges), 6)
+        self.assertEqual(sorted(r[2] for r in rows), sorted([1, 2, 3] * len(ranges)))
+
+        def failing_request(future, error_no_hosts=True):
+            future._set_final_exception(Unavailable("no replicas"))
+
+        with self._patch_requests(session, failing_request):
+            self.assertRaises(Unavailable, list, session.scan_table('ks', 'tbl', timeout=None))
+
+        self.assertRaises(ValueError, session.scan_table, 'ks', 'missing')
+        self.assertRaises(ValueError, session.scan_table, 'ks', 'tbl', concurrency=0)
+        cluster.metadata.token_map = None
+        self.assertRaises(DriverException, session.scan_table, 'ks', 'tbl')
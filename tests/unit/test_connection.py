@@ -16,6 +16,7 @@ try:
 except ImportError:
     import unittest  # noqa
 
+from functools import partial
 from mock import Mock, ANY, call, patch
 import six
 from six import BytesIO
@@ -26,7 +27,7 @@ from cassandra import OperationTimedOut
 from cassandra.cluster import Cluster
 from cassandra.connection import (Connection, HEADER_DIRECTION_TO_CLIENT, ProtocolError,
                                   locally_supported_compressions, ConnectionHeartbeat, _Frame, Timer, TimerManager,
-                                  ConnectionException)
+                                  ConnectionException, _ReceiveBuffer, _StreamIdAllocator)
 from cassandra.marshal import uint8_pack, uint32_pack, int32_pack
 from cassandra.protocol import (write_stringmultimap, write_int, write_string,
                                 SupportedMessage, ProtocolHandler)
@@ -84,7 +85,6 @@ class ConnectionTest(unittest.TestCase):
         header = self.make_header_prefix(SupportedMessage, version=0x7f)
         options = self.make_options_body()
         message = self.make_msg(header, options)
-        c._iobuf = BytesIO()
         c._iobuf.write(message)
         c.process_io_buffer()
 
@@ -101,7 +101,6 @@ class ConnectionTest(unittest.TestCase):
         # read in a SupportedMessage response
         header = self.make_header_prefix(SupportedMessage)
         message = header + int32_pack(-13)
-        c._iobuf = BytesIO()
         c._iobuf.write(message)
         c.process_io_buffer()
 
@@ -264,6 +263,155 @@ class ConnectionTest(unittest.TestCase):
         self.assertEqual('test', cluster.connection_class)
 
 
+    def test_pipelined_frames(self):
+        c = self.make_connection()
+        c.process_msg = Mock()
+
+        bodies = [six.b('a') * 10, six.b(''), six.b('b') * 5000]
+        stream = six.binary_type().join(
+            self.make_msg(self.make_header_prefix(SupportedMessage, stream_id=i), body)
+            for i, body in enumerate(bodies))
+        # deliver in odd-sized chunks so frames and headers straddle reads
+        for i in range(0, len(stream), 1000):
+            c._iobuf.write(stream[i:i + 1000])
+            c.process_io_buffer()
+
+        self.assertEqual([args[0].stream for args, _ in c.process_msg.call_args_list], [0, 1, 2])
+        self.assertEqual(c._iobuf.tell(), 0)
+        self.assertIsNone(c._current_frame)
+
+    def test_body_is_buffer_view(self):
+        c = self.make_connection()
+        bodies = []
+        c.process_msg = lambda frame, body: bodies.append((type(body), body.tobytes()))
+
+        c._iobuf.write(self.make_msg(self.make_header_prefix(SupportedMessage), six.b('body')))
+        c.process_io_buffer()
+        self.assertEqual(bodies, [(memoryview, six.b('body'))])
+
+
+class ReceiveBufferTest(unittest.TestCase):
+
+    def test_read_into(self):
+        buf = _ReceiveBuffer(8)
+        recv_into = Mock(side_effect=lambda view, size: view.__setitem__(slice(0, 3), six.b('abc')) or 3)
+        self.assertEqual(buf.read_into(recv_into, 4), 3)
+        self.assertEqual(buf.getvalue(), six.b('abc'))
+        self.assertEqual(buf.tell(), 3)
+
+    def test_consume_and_reuse(self):
+        buf = _ReceiveBuffer(8)
+        buf.write(six.b('12345678'))
+        buf.consume(8)
+        self.assertEqual(buf.tell(), 0)
+        buf.write(six.b('abcdefgh'))
+        self.assertEqual(buf.getvalue(), six.b('abcdefgh'))
+        self.assertEqual(buf.copied, 0)
+
+    def test_compaction_copies_only_remainder(self):
+        buf = _ReceiveBuffer(8)
+        buf.write(six.b('123456'))
+        buf.consume(4)
+        buf.write(six.b('abcd'))
+        self.assertEqual(buf.getvalue(), six.b('56abcd'))
+        self.assertEqual(buf.copied, 2)
+        self.assertEqual(buf.view(1, 3).tobytes(), six.b('6a'))
+
+    def test_growth_with_outstanding_view(self):
+        buf = _ReceiveBuffer(4)
+        buf.write(six.b('abcd'))
+        view = buf.view(0, 2)
+        buf.write(six.b('efgh'))
+        self.assertEqual(buf.getvalue(), six.b('abcdefgh'))
+        self.assertEqual(view.tobytes(), six.b('ab'))
+
+    def test_large_buffer_released(self):
+        buf = _ReceiveBuffer(4)
+        buf.max_retained_size = 16
+        buf.write(six.b('a') * 32)
+        buf.consume(32)
+        self.assertEqual(len(buf._buf), 4)
+
+
+class StreamIdAllocatorTest(unittest.TestCase):
+
+    max_id = 2 ** 15 - 1
+
+    def test_exhaustion(self):
+        ids = _StreamIdAllocator(self.max_id)
+        allocated = [ids.allocate() for _ in range(self.max_id + 1)]
+        self.assertEqual(allocated, list(range(self.max_id + 1)))
+        self.assertEqual(ids.in_flight, self.max_id + 1)
+        self.assertIsNone(ids.allocate())
+        self.assertEqual(ids.in_flight, self.max_id + 1)
+
+    def test_partial_last_word(self):
+        ids = _StreamIdAllocator(127 - 28)
+        self.assertEqual([ids.allocate() for _ in range(100)], list(range(100)))
+        self.assertIsNone(ids.allocate())
+        ids.release(99)
+        self.assertEqual(ids.allocate(), 99)
+
+    def test_reuse_lowest_free(self):
+        ids = _StreamIdAllocator(self.max_id)
+        for _ in range(self.max_id + 1):
+            ids.allocate()
+        for stream_id in (30000, 64, 5, 12345):
+            ids.release(stream_id)
+        self.assertEqual(ids.in_flight, self.max_id + 1 - 4)
+        self.assertEqual([ids.allocate() for _ in range(4)], [5, 64, 12345, 30000])
+        self.assertIsNone(ids.allocate())
+
+    def test_reuse_over_full_range(self):
+        ids = _StreamIdAllocator(self.max_id)
+        for _ in range(self.max_id + 1):
+            ids.allocate()
+        # release and reuse every id, most recent first
+        for stream_id in range(self.max_id, -1, -1):
+            ids.release(stream_id)
+            self.assertEqual(ids.allocate(), stream_id)
+        for stream_id in range(self.max_id + 1):
+            ids.release(stream_id)
+        self.assertEqual(ids.in_flight, 0)
+        self.assertEqual(ids.allocate(), 0)
+
+    def test_max_in_flight(self):
+        ids = _StreamIdAllocator(self.max_id)
+        self.assertEqual(ids.allocate(2), 0)
+        self.assertEqual(ids.allocate(2), 1)
+        self.assertIsNone(ids.allocate(2))
+        self.assertEqual(ids.allocate(), 2)
+        ids.release(0)
+        self.assertEqual(ids.allocate(3), 0)
+
+    def test_release_unused_id(self):
+        ids = _StreamIdAllocator(self.max_id)
+        ids.allocate()
+        ids.release(1)
+        ids.release(self.max_id)
+        self.assertEqual(ids.in_flight, 1)
+        ids.release(0)
+        ids.release(0)
+        self.assertEqual(ids.in_flight, 0)
+
+    def test_connection_releases_id_on_response(self):
+        c = Connection('1.2.3.4')
+        request_id = c.get_request_id()
+        self.assertEqual(c.in_flight, 1)
+        c._requests[request_id] = (Mock(), Mock(), None)
+        c.process_msg(_Frame(c.protocol_version, 0, request_id, 0, 0, 0), None)
+        self.assertEqual(c.in_flight, 0)
+        self.assertEqual(c.get_request_id(), request_id)
+
+    def test_connection_releases_id_on_encode_error(self):
+        c = Connection('1.2.3.4')
+        request_id = c.get_request_id()
+        encoder = Mock(side_effect=ValueError)
+        self.assertRaises(ValueError, c.send_msg, Mock(), request_id, Mock(), encoder=encoder)
+        self.assertEqual(c.in_flight, 0)
+        self.assertNotIn(request_id, c._requests)
+
+
 @patch('cassandra.connection.ConnectionHeartbeat._raise_if_stopped')
 class ConnectionHeartbeatTest(unittest.TestCase):
 
@@ -347,7 +495,8 @@ class ConnectionHeartbeatTest(unittest.TestCase):
         max_connection = Mock(spec=Connection, host='localhost',
                               lock=Lock(),
                               max_request_id=in_flight - 1, in_flight=in_flight,
-                              is_idle=True, is_defunct=False, is_closed=False)
+                              is_idle=True, is_defunct=False, is_closed=False,
+                              get_request_id=lambda: None)
         holder = get_holders.return_value[0]
         holder.get_connections.return_value.append(max_connection)
 
@@ -381,7 +530,6 @@ class ConnectionHeartbeatTest(unittest.TestCase):
 
         self.run_heartbeat(get_holders)
 
-        self.assertEqual(connection.in_flight, get_holders.call_count)
         connection.send_msg.assert_has_calls([call(ANY, request_id, ANY)] * get_holders.call_count)
         connection.defunct.assert_has_calls([call(ANY)] * get_holders.call_count)
         exc = connection.defunct.call_args_list[0][0][0]
@@ -410,7 +558,6 @@ class ConnectionHeartbeatTest(unittest.TestCase):
 
         self.run_heartbeat(get_holders)
 
-        self.assertEqual(connection.in_flight, get_holders.call_count)
         connection.send_msg.assert_has_calls([call(ANY, request_id, ANY)] * get_holders.call_count)
         connection.defunct.assert_has_calls([call(ANY)] * get_holders.call_count)
         exc = connection.defunct.call_args_list[0][0][0]
@@ -435,3 +582,62 @@ class TimerTest(unittest.TestCase):
         tm.add_timer(t2)
         # Prior to #466: "TypeError: unorderable types: Timer() < Timer()"
         tm.service_timeouts()
+
+    @patch('cassandra.connection.time')
+    def test_timers_fire_in_order_across_wheels(self, mock_time):
+        now = [1000000.0]
+        mock_time.time.side_effect = lambda: now[0]
+        tm = TimerManager()
+        fired = []
+        # spread across all levels of the wheel, including past the top one
+        timeouts = [0.005, 0.5, 3, 100, 1000, 100000, 5e7]
+        for timeout in reversed(timeouts):
+            tm.add_timer(Timer(timeout, partial(fired.append, timeout)))
+
+        next_end = tm.service_timeouts()
+        while next_end:
+            self.assertGreater(next_end, now[0])
+            now[0] = next_end
+            already_fired = len(fired)
+            next_end = tm.service_timeouts()
+            # never early, at most a tick late
+            for timeout in fired[already_fired:]:
+                self.assertLessEqual(1000000.0 + timeout, now[0])
+                self.assertLessEqual(now[0], 1000000.0 + timeout + tm.resolution)
+
+        self.assertEqual(timeouts, fired)
+        self.assertFalse(any(tm._level_counts))
+
+    @patch('cassandra.connection.time')
+    def test_cancel_removes_timer(self, mock_time):
+        now = [1000000.0]
+        mock_time.time.side_effect = lambda: now[0]
+        tm = TimerManager()
+        callback = Mock()
+        timers = [Timer(10, callback) for _ in range(1000)]
+        for timer in timers:
+            tm.add_timer(timer)
+        tm.service_timeouts()
+        self.assertEqual(1000, sum(tm._level_counts))
+
+        for timer in timers[1:]:
+            timer.cancel()
+        # canceled timers are dropped at the next service, not when they expire
+        now[0] += tm.resolution
+        tm.service_timeouts()
+        self.assertEqual(1, sum(tm._level_counts))
+
+        now[0] += 11
+        self.assertIsNone(tm.service_timeouts())
+        self.assertEqual(1, callback.call_count)
+
+    @patch('cassandra.connection.time')
+    def test_canceled_before_service(self, mock_time):
+        mock_time.time.return_value = 1000000.0
+        tm = TimerManager()
+        timer = Timer(10, Mock())
+        tm.add_timer(timer)
+        timer.cancel()
+        self.assertIsNone(tm.service_timeouts())
+        self.assertFalse(any(tm._level_counts))
+        self.assertFalse(tm._canceled_timers)
@@ -28,6 +28,25 @@ from cassandra.policies import HostDistance, SimpleConvictionPolicy
 
 class HostConnectionPoolTests(unittest.TestCase):
 
+    def make_connection(self, **kwargs):
+        conn = NonCallableMagicMock(spec=Connection, **kwargs)
+
+        def get_request_id(max_in_flight=None):
+            # request ids count as in flight until their response is processed
+            limit = conn.max_request_id + 1 if max_in_flight is None else max_in_flight
+            if conn.in_flight >= limit:
+                return None
+            conn.in_flight += 1
+            return conn.in_flight - 1
+
+        conn.get_request_id.side_effect = get_request_id
+        return conn
+
+    def respond(self, pool, conn):
+        # processing a response releases its request id before the callback returns the connection
+        conn.in_flight -= 1
+        pool.return_connection(conn)
+
     def make_session(self):
         session = NonCallableMagicMock(spec=Session, keyspace='foobarkeyspace')
         session.cluster.get_core_connections_per_host.return_value = 1
@@ -38,7 +57,7 @@ class HostConnectionPoolTests(unittest.TestCase):
     def test_borrow_and_return(self):
         host = Mock(spec=Host, address='ip1')
         session = self.make_session()
-        conn = NonCallableMagicMock(spec=Connection, in_flight=0, is_defunct=False, is_closed=False, max_request_id=100)
+        conn = self.make_connection(in_flight=0, is_defunct=False, is_closed=False, max_request_id=100)
         session.cluster.connection_factory.return_value = conn
 
         pool = HostConnectionPool(host, HostDistance.LOCAL, session)
@@ -49,14 +68,14 @@ class HostConnectionPoolTests(unittest.TestCase):
         self.assertEqual(1, conn.in_flight)
         conn.set_keyspace_blocking.assert_called_once_with('foobarkeyspace')
 
-        pool.return_connection(conn)
+        self.respond(pool, conn)
         self.assertEqual(0, conn.in_flight)
         self.assertNotIn(conn, pool._trash)
 
     def test_failed_wait_for_connection(self):
         host = Mock(spec=Host, address='ip1')
         session = self.make_session()
-        conn = NonCallableMagicMock(spec=Connection, in_flight=0, is_defunct=False, is_closed=False, max_request_id=100)
+        conn = self.make_connection(in_flight=0, is_defunct=False, is_closed=False, max_request_id=100)
         session.cluster.connection_factory.return_value = conn
 
         pool = HostConnectionPool(host, HostDistance.LOCAL, session)
@@ -74,7 +93,7 @@ class HostConnectionPoolTests(unittest.TestCase):
     def test_successful_wait_for_connection(self):
         host = Mock(spec=Host, address='ip1')
         session = self.make_session()
-        conn = NonCallableMagicMock(spec=Connection, in_flight=0, is_defunct=False, is_closed=False, max_request_id=100, lock=Lock())
+        conn = self.make_connection(in_flight=0, is_defunct=False, is_closed=False, max_request_id=100, lock=Lock())
         session.cluster.connection_factory.return_value = conn
 
         pool = HostConnectionPool(host, HostDistance.LOCAL, session)
@@ -86,19 +105,19 @@ class HostConnectionPoolTests(unittest.TestCase):
         def get_second_conn():
             c, request_id = pool.borrow_connection(1.0)
             self.assertIs(conn, c)
-            pool.return_connection(c)
+            self.respond(pool, c)
 
         t = Thread(target=get_second_conn)
         t.start()
 
-        pool.return_connection(conn)
+        self.respond(pool, conn)
         t.join()
         self.assertEqual(0, conn.in_flight)
 
     def test_all_connections_trashed(self):
         host = Mock(spec=Host, address='ip1')
         session = self.make_session()
-        conn = NonCallableMagicMock(spec=Connection, in_flight=0, is_defunct=False, is_closed=False, max_request_id=100, lock=Lock())
+        conn = self.make_connection(in_flight=0, is_defunct=False, is_closed=False, max_request_id=100, lock=Lock())
         session.cluster.connection_factory.return_value = conn
         session.cluster.get_core_connections_per_host.return_value = 1
 
@@ -122,7 +141,7 @@ class HostConnectionPoolTests(unittest.TestCase):
             self.assertIs(conn, c)
             self.assertEqual(1, conn.in_flight)
             conn.set_keyspace_blocking.assert_called_once_with('foobarkeyspace')
-            pool.return_connection(c)
+            self.respond(pool, c)
 
         t = Thread(target=get_conn)
         t.start()
@@ -140,7 +159,7 @@ class HostConnectionPoolTests(unittest.TestCase):
     def test_spawn_when_at_max(self):
         host = Mock(spec=Host, address='ip1')
         session = self.make_session()
-        conn = NonCallableMagicMock(spec=Connection, in_flight=0, is_defunct=False, is_closed=False, max_request_id=100)
+        conn = self.make_connection(in_flight=0, is_defunct=False, is_closed=False, max_request_id=100)
         conn.max_request_id = 100
         session.cluster.connection_factory.return_value = conn
 
@@ -165,7 +184,7 @@ class HostConnectionPoolTests(unittest.TestCase):
     def test_return_defunct_connection(self):
         host = Mock(spec=Host, address='ip1')
         session = self.make_session()
-        conn = NonCallableMagicMock(spec=Connection, in_flight=0, is_defunct=False, is_closed=False,
+        conn = self.make_connection(in_flight=0, is_defunct=False, is_closed=False,
                                     max_request_id=100, signaled_error=False)
         session.cluster.connection_factory.return_value = conn
 
@@ -184,7 +203,7 @@ class HostConnectionPoolTests(unittest.TestCase):
     def test_return_defunct_connection_on_down_host(self):
         host = Mock(spec=Host, address='ip1')
         session = self.make_session()
-        conn = NonCallableMagicMock(spec=Connection, in_flight=0, is_defunct=False, is_closed=False,
+        conn = self.make_connection(in_flight=0, is_defunct=False, is_closed=False,
                                     max_request_id=100, signaled_error=False)
         session.cluster.connection_factory.return_value = conn
 
@@ -205,7 +224,7 @@ class HostConnectionPoolTests(unittest.TestCase):
     def test_return_closed_connection(self):
         host = Mock(spec=Host, address='ip1')
         session = self.make_session()
-        conn = NonCallableMagicMock(spec=Connection, in_flight=0, is_defunct=False, is_closed=True, max_request_id=100, signaled_error=False)
+        conn = self.make_connection(in_flight=0, is_defunct=False, is_closed=True, max_request_id=100, signaled_error=False)
         session.cluster.connection_factory.return_value = conn
 
         pool = HostConnectionPool(host, HostDistance.LOCAL, session)
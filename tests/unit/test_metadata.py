@@ -17,8 +17,9 @@ try:
 except ImportError:
     import unittest  # noqa
 
+from array import array
 from binascii import unhexlify
-from mock import Mock
+from mock import Mock, patch
 import os
 import six
 import timeit
@@ -33,9 +34,10 @@ from cassandra.metadata import (Murmur3Token, MD5Token,
                                 UserType, KeyspaceMetadata, get_schema_parser,
                                 _UnknownStrategy, ColumnMetadata, TableMetadata,
                                 IndexMetadata, Function, Aggregate,
-                                Metadata)
+                                Metadata, TokenMap)
 from cassandra.policies import SimpleConvictionPolicy
 from cassandra.pool import Host
+from cassandra.util import int64_typecode
 
 
 class StrategiesTest(unittest.TestCase):
@@ -197,6 +199,32 @@ class StrategiesTest(unittest.TestCase):
         token_replicas = replica_map[MD5Token(0)]
         self.assertItemsEqual(token_replicas, (dc1_1, dc1_2, dc1_3, dc2_1, dc2_3))
 
+    def test_nts_make_token_replica_map_vnodes(self):
+        hosts = [Host('dc1.%d' % i, SimpleConvictionPolicy) for i in range(1, 5)]
+        for host, rack in zip(hosts, ('rack1', 'rack1', 'rack2', 'rack1')):
+            host.set_location_info('dc1', rack)
+        dc1_1, dc1_2, dc1_3, dc1_4 = hosts
+
+        # the tokens of dc1.2 are skipped twice before rack2 gets a replica
+        owners = [dc1_1, dc1_2, dc1_2, dc1_3, dc1_4, dc1_1]
+        ring = [MD5Token(i * 100) for i in range(len(owners))]
+        token_to_host_owner = dict(zip(ring, owners))
+
+        nts = NetworkTopologyStrategy({'dc1': 4})
+        replica_map = nts.make_token_replica_map(token_to_host_owner, ring)
+
+        self.assertEqual(replica_map[MD5Token(0)], [dc1_1, dc1_3, dc1_2, dc1_4])
+        self.assertEqual(replica_map[MD5Token(200)], [dc1_2, dc1_3, dc1_4, dc1_1])
+        self.assertEqual(replica_map[MD5Token(300)], [dc1_3, dc1_4, dc1_1, dc1_2])
+        self.assertEqual(replica_map[MD5Token(500)], [dc1_1, dc1_3, dc1_2, dc1_4])
+
+        nts = NetworkTopologyStrategy({'dc1': 2})
+        replica_map = nts.make_token_replica_map(token_to_host_owner, ring)
+        for token in ring:
+            replicas = replica_map[token]
+            self.assertEqual(replicas[0], token_to_host_owner[token])
+            self.assertEqual(set(host.rack for host in replicas), set(('rack1', 'rack2')))
+
     def test_nts_make_token_replica_map_empty_dc(self):
         host = Host('1', SimpleConvictionPolicy)
         host.set_location_info('dc1', 'rack1')
@@ -333,6 +361,55 @@ class Murmur3TokensTest(unittest.TestCase):
         except ImportError:
             raise unittest.SkipTest('The cmurmur3 extension is not available')
 
+    def test_murmur3_many_python(self):
+        from cassandra.murmur3 import _murmur3, _murmur3_many, _murmur3_many_fixed
+        self._verify_hash_many(_murmur3, _murmur3_many, _murmur3_many_fixed)
+
+    def test_murmur3_many_c(self):
+        try:
+            from cassandra.cmurmur3 import murmur3, murmur3_many, murmur3_many_fixed
+        except ImportError:
+            raise unittest.SkipTest('The cmurmur3 extension is not available')
+        self._verify_hash_many(murmur3, murmur3_many, murmur3_many_fixed)
+
+        self.assertEqual(list(murmur3_many([bytearray(b'123'), memoryview(b'123')])), [murmur3(b'123')] * 2)
+        self.assertRaises(TypeError, murmur3_many, [123])
+        self.assertRaises(TypeError, murmur3_many, None)
+
+        try:
+            import numpy as np
+        except ImportError:
+            return
+        data = os.urandom(8 * 50)
+        keys = np.frombuffer(data, dtype='>i8')
+        self.assertEqual(list(murmur3_many_fixed(keys, 8)), [murmur3(data[i:i + 8]) for i in range(0, len(data), 8)])
+        self.assertRaises((BufferError, ValueError), murmur3_many_fixed, keys[::2], 8)
+
+    def _verify_hash_many(self, fn, many_fn, fixed_fn):
+        keys = [os.urandom(size) for size in range(0, 40)]
+        hashes = [fn(key) for key in keys]
+        self.assertEqual(many_fn(keys), array(int64_typecode, hashes) if int64_typecode else hashes)
+        self.assertEqual(list(many_fn([])), [])
+
+        data = b''.join(os.urandom(4) for _ in range(20))
+        self.assertEqual(list(fixed_fn(data, 4)), [fn(data[i:i + 4]) for i in range(0, len(data), 4)])
+        self.assertEqual(list(fixed_fn(bytearray(data), 20)), [fn(data[i:i + 20]) for i in range(0, len(data), 20)])
+        self.assertEqual(list(fixed_fn(b'', 4)), [])
+        self.assertRaises(ValueError, fixed_fn, data, 3)
+        self.assertRaises(ValueError, fixed_fn, data, 0)
+
+    def test_hash_many(self):
+        keys = [six.b(str(i)) for i in range(100)]
+        try:
+            self.assertEqual(list(Murmur3Token.hash_many(keys)), [Murmur3Token.hash_fn(k) for k in keys])
+        except cassandra.metadata.NoMurmur3:
+            raise unittest.SkipTest('No murmur3 implementation')
+
+        # the minimum value is not a valid token
+        with patch('cassandra.metadata.murmur3_many', return_value=[1, cassandra.metadata.MIN_LONG, 2, cassandra.metadata.MIN_LONG]):
+            self.assertEqual(list(Murmur3Token.hash_many(keys[:4])),
+                             [1, cassandra.metadata.MAX_LONG, 2, cassandra.metadata.MAX_LONG])
+
     def _verify_hash(self, fn):
         self.assertEqual(fn(six.b('123')), -7468325962851647638)
         self.assertEqual(fn(b'\x00\xff\x10\xfa\x99' * 10), 5837342703291459765)
@@ -381,6 +458,96 @@ class BytesTokensTest(unittest.TestCase):
         self.assertFalse(t0 < t1)
 
 
+class TokenMapTest(unittest.TestCase):
+
+    def _make_token_map(self, token_class, tokens):
+        hosts = [Host("127.0.0.%d" % i, SimpleConvictionPolicy) for i in range(1, 4)]
+        token_to_host_owner = dict((token, hosts[i % len(hosts)]) for i, token in enumerate(tokens))
+        metadata = Mock(keyspaces={
+            'ks': KeyspaceMetadata('ks', True, 'SimpleStrategy', {'replication_factor': '2'}),
+            'local': KeyspaceMetadata('local', True, 'LocalStrategy', {})})
+        return TokenMap(token_class, token_to_host_owner, sorted(tokens), metadata)
+
+    def _expected_replicas(self, token_map, value):
+        for token in token_map.ring:
+            if value < token.value:
+                return token_map.tokens_to_hosts_by_ks['ks'][token]
+        return token_map.tokens_to_hosts_by_ks['ks'][token_map.ring[0]]
+
+    def test_get_replicas(self):
+        for token_class, values in ((Murmur3Token, [-9000, -10, 0, 10, 9000]),
+                                    (MD5Token, [1, 100, 2 ** 100]),
+                                    (BytesToken, [b'b', b'd', b'f'])):
+            token_map = self._make_token_map(token_class, [token_class(v) for v in values])
+            for value in values + [values[0], values[-1]]:
+                for probe in (value, token_class(value).value):
+                    self.assertEqual(token_map.get_replicas('ks', token_class(probe)),
+                                     token_map.get_replicas_for_value('ks', probe))
+                    self.assertEqual(token_map.get_replicas_for_value('ks', probe),
+                                     self._expected_replicas(token_map, probe))
+                    self.assertEqual(len(token_map.get_replicas_for_value('ks', probe)), 2)
+            self.assertEqual(token_map.get_replicas('local', token_class(values[0])), [])
+            self.assertEqual(token_map.get_replicas('unknown', token_class(values[0])), [])
+
+    def test_shared_replica_maps(self):
+        token_map = self._make_token_map(MD5Token, [MD5Token(v) for v in range(0, 1000, 100)])
+        keyspaces = token_map._metadata.keyspaces
+        keyspaces['ks2'] = KeyspaceMetadata('ks2', True, 'SimpleStrategy', {'replication_factor': '2'})
+        keyspaces['ks3'] = KeyspaceMetadata('ks3', True, 'SimpleStrategy', {'replication_factor': '3'})
+
+        strategies = [keyspaces[keyspace].replication_strategy for keyspace in ('ks', 'ks2', 'ks3')]
+        for strategy in strategies:
+            strategy.make_token_replica_map = Mock(wraps=strategy.make_token_replica_map)
+        for keyspace in ('ks', 'ks2', 'ks3'):
+            token_map.rebuild_keyspace(keyspace, build_if_absent=True)
+        self.assertEqual(sum(strategy.make_token_replica_map.call_count for strategy in strategies), 2)
+
+        by_ks = token_map.tokens_to_hosts_by_ks
+        self.assertIs(by_ks['ks'], by_ks['ks2'])
+        self.assertIsNot(by_ks['ks'], by_ks['ks3'])
+        self.assertEqual(len(by_ks['ks3'][MD5Token(0)]), 3)
+        self.assertEqual(token_map.get_replicas('ks2', MD5Token(50)), token_map.get_replicas('ks', MD5Token(50)))
+
+        # a keyspace changing replication stops sharing, without affecting the others
+        ks_map = by_ks['ks']
+        keyspaces['ks'] = KeyspaceMetadata('ks', True, 'SimpleStrategy', {'replication_factor': '3'})
+        token_map.rebuild_keyspace('ks')
+        self.assertIs(by_ks['ks'], by_ks['ks3'])
+        self.assertIs(by_ks['ks2'], ks_map)
+        self.assertEqual(len(token_map.get_replicas('ks', MD5Token(50))), 3)
+        self.assertEqual(len(token_map.get_replicas('ks2', MD5Token(50))), 2)
+
+        # unused maps are released, but left intact
+        token_map.remove_keyspace('ks2')
+        self.assertEqual([shared[1] for shared in token_map._shared_replica_maps], [by_ks['ks3']])
+        self.assertEqual(len(ks_map[MD5Token(0)]), 2)
+
+        token_map.remove_keyspace('ks')
+        token_map.remove_keyspace('ks3')
+        self.assertEqual(token_map._shared_replica_maps, [])
+
+    def test_get_replicas_bulk(self):
+        token_map = self._make_token_map(BytesToken, [BytesToken(b'b'), BytesToken(b'd'), BytesToken(b'f')])
+        keys = [b'a', b'b', b'c', b'e', b'f', b'g']
+        self.assertEqual(token_map.get_replicas_bulk('ks', keys),
+                         [token_map.get_replicas('ks', BytesToken.from_key(k)) for k in keys])
+        self.assertEqual(token_map.get_replicas_bulk('unknown', keys), [[]] * len(keys))
+
+        keys = [six.b(str(i)) for i in range(100)]
+        token_map = self._make_token_map(Murmur3Token, [Murmur3Token(2 ** 56 * i) for i in range(-100, 100)])
+        self.assertEqual(token_map.get_replicas_bulk('ks', keys),
+                         [token_map.get_replicas('ks', Murmur3Token.from_key(k)) for k in keys])
+
+        token_map = self._make_token_map(MD5Token, [MD5Token(2 ** 60 * i) for i in range(1, 100)])
+        self.assertEqual(token_map.get_replicas_bulk('ks', keys),
+                         [token_map.get_replicas('ks', MD5Token.from_key(k)) for k in keys])
+
+        metadata = Metadata()
+        metadata.token_map = token_map
+        self.assertEqual(metadata.get_replicas_bulk('ks', keys), token_map.get_replicas_bulk('ks', keys))
+        self.assertEqual(metadata.get_replicas('ks', keys[0]), token_map.get_replicas_bulk('ks', keys)[0])
+
+
 class KeyspaceMetadataTest(unittest.TestCase):
 
     def test_export_as_string_user_types(self):
@@ -17,11 +17,14 @@ try:
 except ImportError:
     import unittest # noqa
 
+from datetime import datetime
+
+from cassandra.cython_deps import HAVE_NUMPY
 from cassandra.encoder import Encoder
 from cassandra.protocol import ColumnMetadata
 from cassandra.query import (bind_params, ValueSequence, PreparedStatement,
-                             BoundStatement, UNSET_VALUE)
-from cassandra.cqltypes import Int32Type
+                             BoundStatement, SimpleStatement, UNSET_VALUE)
+from cassandra.cqltypes import DateType, DoubleType, Int32Type, UTF8Type
 from cassandra.util import OrderedDict
 
 from six.moves import xrange
@@ -182,6 +185,28 @@ class BoundStatementTestV1(unittest.TestCase):
         self.assertRaises(ValueError, self.bound.bind, {'rk0': 0, 'rk1': 0, 'ck0': 0, 'v0': UNSET_VALUE})
         self.assertRaises(ValueError, self.bound.bind, (0, 0, 0, UNSET_VALUE))
 
+    def test_routing_key(self):
+        bound = self.prepared.bind((1, 2, 3, 4))
+        statement = SimpleStatement('')
+        statement.routing_key = [Int32Type.serialize(2, 3), Int32Type.serialize(1, 3)]
+        self.assertEqual(bound.routing_key, statement.routing_key)
+
+        prepared = PreparedStatement(column_metadata=[ColumnMetadata('keyspace', 'cf', 'rk0', Int32Type)],
+                                     query_id=None, routing_key_indexes=[0], query=None, keyspace='keyspace',
+                                     protocol_version=self.protocol_version, result_metadata=None)
+        self.assertEqual(prepared.bind((1,)).routing_key, Int32Type.serialize(1, 3))
+
+    def test_dict_repeated_name(self):
+        # e.g. "SELECT * FROM cf WHERE rk0 = ? AND ck0 > ? AND ck0 < ?"
+        prepared = PreparedStatement(column_metadata=[ColumnMetadata('keyspace', 'cf', 'rk0', Int32Type),
+                                                      ColumnMetadata('keyspace', 'cf', 'ck0', Int32Type),
+                                                      ColumnMetadata('keyspace', 'cf', 'ck0', Int32Type)],
+                                     query_id=None, routing_key_indexes=[0], query=None, keyspace='keyspace',
+                                     protocol_version=self.protocol_version, result_metadata=None)
+        bound = prepared.bind({'rk0': 1, 'ck0': 2})
+        self.assertEqual(bound.values, [Int32Type.serialize(v, 3) for v in (1, 2, 2)])
+        self.assertIs(prepared._get_bind_plan(), prepared._get_bind_plan())
+
 
 class BoundStatementTestV2(BoundStatementTestV1):
     protocol_version=2
@@ -217,3 +242,64 @@ class BoundStatementTestV4(BoundStatementTestV1):
         old_values = self.bound.values
         self.bound.bind((0, 0, 0, UNSET_VALUE))
         self.assertEqual(self.bound.values[-1], UNSET_VALUE)
+
+
+class BindColumnsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.prepared = PreparedStatement(column_metadata=[
+                                              ColumnMetadata('keyspace', 'cf', 'rk0', Int32Type),
+                                              ColumnMetadata('keyspace', 'cf', 'ts', DateType),
+                                              ColumnMetadata('keyspace', 'cf', 'v0', DoubleType),
+                                              ColumnMetadata('keyspace', 'cf', 'v1', UTF8Type)
+                                          ],
+                                          query_id=None,
+                                          routing_key_indexes=[0],
+                                          query=None,
+                                          keyspace='keyspace',
+                                          protocol_version=4, result_metadata=None)
+        self.rows = [(1, datetime(2017, 1, 1, 12), 1.5, u'a'),
+                     (-2, datetime(1969, 12, 31, 23, 59, 59, 999000), None, u'b'),
+                     (2 ** 31 - 1, None, -0.25, None)]
+
+    def assert_bound_like_rows(self, bound_statements, rows):
+        bound_statements = list(bound_statements)
+        self.assertEqual(len(bound_statements), len(rows))
+        for bound, row in zip(bound_statements, rows):
+            self.assertEqual(bound.values, self.prepared.bind(row).values)
+            self.assertEqual(bound.routing_key, self.prepared.bind(row).routing_key)
+
+    def test_bind_columns(self):
+        columns = list(zip(*self.rows))
+        self.assert_bound_like_rows(self.prepared.bind_columns(columns), self.rows)
+        by_name = dict(zip(('rk0', 'ts', 'v0', 'v1', 'extra'), columns + [(0, 0, 0)]))
+        self.assert_bound_like_rows(self.prepared.bind_columns(by_name), self.rows)
+
+    def test_missing_columns(self):
+        columns = list(zip(*self.rows))
+        bound = list(self.prepared.bind_columns(columns[:2]))
+        self.assertEqual([b.values[2:] for b in bound], [[UNSET_VALUE, UNSET_VALUE]] * 3)
+        bound = list(self.prepared.bind_columns({'rk0': columns[0], 'v1': columns[3]}))
+        self.assertEqual([b.values[1] for b in bound], [UNSET_VALUE] * 3)
+        self.assertRaises(ValueError, list, self.prepared.bind_columns({'v0': columns[2]}))
+
+    def test_invalid_columns(self):
+        self.assertRaises(ValueError, list, self.prepared.bind_columns([(1, 2), (None,)]))
+        self.assertRaises(ValueError, list, self.prepared.bind_columns([()] * 5))
+        with self.assertRaises(TypeError) as cm:
+            list(self.prepared.bind_columns([(1, 'not an int')]))
+        self.assertIn('rk0', str(cm.exception))
+
+    @unittest.skipUnless(HAVE_NUMPY, 'NumPy is not available')
+    def test_numpy_columns(self):
+        import numpy as np
+        columns = [np.array([1, -2, 2 ** 31 - 1], dtype=np.int64),
+                   np.array(['2017-01-01T12:00', '1969-12-31T23:59:59.999', 'NaT'], dtype='datetime64[ns]'),
+                   np.ma.masked_array([1.5, 0, -0.25], mask=[False, True, False]),
+                   [u'a', u'b', None]]
+        self.assert_bound_like_rows(self.prepared.bind_columns(columns), self.rows)
+        self.assertEqual(list(self.prepared.bind_columns(columns))[0].raw_values, self.rows[0])
+
+        # out of range values are rejected as by bind
+        columns[0] = np.array([2 ** 31, 0, 0])
+        self.assertRaises(TypeError, list, self.prepared.bind_columns(columns))
@@ -17,9 +17,12 @@ try:
 except ImportError:
     import unittest  # noqa
 
+from array import array
+
 import six
 
-from cassandra.query import BatchStatement, SimpleStatement
+from cassandra.query import (BatchStatement, SimpleStatement, RowClassCache, row_class_cache,
+                             named_tuple_factory, columnar_factory, int64_typecode)
 
 
 class BatchStatementTest(unittest.TestCase):
@@ -73,3 +76,62 @@ class BatchStatementTest(unittest.TestCase):
             batch.add_all(statements=['%s'] * n,
                           parameters=[(i,) for i in range(n)])
             self.assertEqual(len(batch), n)
+
+
+class RowClassCacheTest(unittest.TestCase):
+
+    def test_reuses_row_classes(self):
+        cache = RowClassCache(maxsize=2)
+        Row = cache.get(['a', 'b'])
+        self.assertIs(cache.get(('a', 'b')), Row)
+        self.assertEqual(Row._fields, ('a', 'b'))
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 1, 1))
+
+    def test_evicts_least_recently_used(self):
+        cache = RowClassCache(maxsize=2)
+        first = cache.get(['a'])
+        cache.get(['b'])
+        self.assertIs(cache.get(['a']), first)
+        cache.get(['c'])  # evicts 'b'
+        self.assertEqual(cache.evictions, 1)
+        self.assertIs(cache.get(['a']), first)
+        cache.get(['b'])
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (2, 4, 2))
+
+        cache.clear()
+        self.assertEqual((cache.hits, cache.misses, cache.evictions, len(cache)), (0, 0, 0, 0))
+
+    def test_invalid_names(self):
+        cache = RowClassCache()
+        Row = cache.get(['a', 'a', '1b'])
+        self.assertEqual(Row._fields, ('a', 'a_', 'field_2_'))
+        self.assertIs(cache.get(['a', 'a', '1b']), Row)
+
+    def test_named_tuple_factory(self):
+        row_class_cache.clear()
+        first = named_tuple_factory(['k', 'v'], [(1, 2)])
+        second = named_tuple_factory(['k', 'v'], [(3, 4)])
+        self.assertIs(type(first[0]), type(second[0]))
+        self.assertEqual(second[0].v, 4)
+        self.assertEqual((row_class_cache.hits, row_class_cache.misses), (1, 1))
+
+
+class ColumnarFactoryTest(unittest.TestCase):
+
+    def test_columns(self):
+        rows = [(1, 1.5, u'a', True, 2 ** 70, 4, None),
+                (-2 ** 63, -2.0, None, False, 1, 5, None),
+                (3, 0.0, u'c', True, 2, None, None)]
+        columns = columnar_factory(['i', 'd', 't', 'b', 'v', 'n', 'e'], rows)
+
+        self.assertEqual(columns['i'], array(int64_typecode, [1, -2 ** 63, 3]))
+        self.assertEqual(columns['d'], array('d', [1.5, -2.0, 0.0]))
+        self.assertEqual(columns['t'], [u'a', None, u'c'])
+        self.assertEqual(columns['b'], [True, False, True])
+        # values out of range and nulls leave numbers in lists
+        self.assertEqual(columns['v'], [2 ** 70, 1, 2])
+        self.assertEqual(columns['n'], [4, 5, None])
+        self.assertEqual(columns['e'], [None, None, None])
+
+    def test_no_rows(self):
+        self.assertEqual(columnar_factory(['i'], []), {'i': []})
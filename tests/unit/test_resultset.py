@@ -20,9 +20,68 @@ except ImportError:
 
 from mock import Mock, PropertyMock
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # NOQA
+
+from cassandra import DriverException
 from cassandra.cluster import ResultSet
 
 
+class PagedResponseFuture(object):
+    """ Serves result pages to a ResultSet, as a ResponseFuture does """
+
+    def __init__(self, col_names, pages):
+        self._col_names = col_names
+        self._col_types = None
+        self.pages = list(pages)
+        self.page = None
+
+    @property
+    def has_more_pages(self):
+        return bool(self.pages)
+
+    def start_fetching_next_page(self):
+        self.page = self.pages.pop(0)
+
+    def result(self):
+        return ResultSet(self, self.page)
+
+
+class CallbackPagedResponseFuture(object):
+    """ Delivers each requested page to callbacks right away, as a ResponseFuture does when done """
+
+    _col_names = None
+    _col_types = None
+
+    def __init__(self, pages):
+        # pages following the current one; Exceptions fail the request
+        self.pages = list(pages)
+        self._paging_state = 'page 1' if self.pages else None
+        self.requested = 0
+        self.callbacks = []
+
+    @property
+    def has_more_pages(self):
+        return bool(self._paging_state)
+
+    def add_callbacks(self, callback, errback):
+        self.callbacks.append((callback, errback))
+        callback('current page')
+
+    def start_fetching_next_page(self):
+        self.requested += 1
+        page = self.pages.pop(0)
+        if isinstance(page, Exception):
+            for _, errback in self.callbacks:
+                errback(page)
+            return
+        self._paging_state = 'page %d' % (self.requested + 1) if self.pages else None
+        for callback, _ in self.callbacks:
+            callback(page)
+
+
 class ResultSetTests(unittest.TestCase):
 
     def test_iter_non_paged(self):
@@ -187,3 +246,80 @@ class ResultSetTests(unittest.TestCase):
         for applied in (True, False):
             rs = ResultSet(Mock(row_factory=row_factory), [{'[applied]': applied}])
             self.assertEqual(rs.was_applied, applied)
+
+    @unittest.skipIf(np is None, "NumPy is not available")
+    def test_all_columns(self):
+        def page(ints, objects):
+            # as decoded by NumpyProtocolHandler
+            column = np.empty(len(objects), dtype=object)
+            column[:] = objects
+            return {'i': np.ma.masked_array([v or 0 for v in ints], mask=[v is None for v in ints], dtype='i4'),
+                    't': column}
+
+        pages = [page([1, None], [u'a', None]),
+                 page([3], [[1, 2]]),
+                 page([], []),
+                 page([4, 5, None, 7], [u'b', u'c', u'd', u'e'])]
+        response_future = PagedResponseFuture(['i', 't'], pages[1:])
+        columns = ResultSet(response_future, pages[0]).all_columns()
+
+        self.assertEqual(sorted(columns), ['i', 't'])
+        self.assertEqual(columns['i'].dtype, np.dtype('i4'))
+        self.assertEqual(columns['i'].tolist(), [1, None, 3, 4, 5, None, 7])
+        self.assertTrue(columns['i'].flags['C_CONTIGUOUS'])
+        self.assertEqual(columns['t'].dtype, np.dtype('O'))
+        self.assertEqual(columns['t'].tolist(), [u'a', None, [1, 2], u'b', u'c', u'd', u'e'])
+        self.assertFalse(response_future.has_more_pages)
+
+    @unittest.skipIf(np is None, "NumPy is not available")
+    def test_all_columns_empty(self):
+        rs = ResultSet(PagedResponseFuture(['i'], []), {'i': np.ma.masked_array([], dtype='i8')})
+        columns = rs.all_columns()
+        self.assertEqual(len(columns['i']), 0)
+        self.assertEqual(ResultSet(PagedResponseFuture(None, []), []).all_columns(), {})
+
+    def test_all_columns_requires_column_pages(self):
+        rs = ResultSet(Mock(has_more_pages=False), [(1, 2)])
+        self.assertRaises(DriverException, rs.all_columns)
+
+        rs = ResultSet(Mock(has_more_pages=False), [(1, 2)])
+        list(rs)
+        self.assertRaises(RuntimeError, rs.all_columns)
+
+    def test_prefetch_pages(self):
+        pages = [list(range(i * 3, i * 3 + 3)) for i in range(1, 6)]
+        response_future = CallbackPagedResponseFuture(pages)
+        rs = ResultSet(response_future, [0, 1, 2], prefetch_pages=2)
+        itr = iter(rs)
+        # pages are fetched ahead as soon as iteration starts, up to the depth
+        self.assertEqual(response_future.requested, 2)
+        self.assertEqual(next(itr), 0)
+        self.assertEqual(rs.paging_state, 'page 1')
+        self.assertTrue(rs.has_more_pages)
+
+        self.assertEqual([next(itr) for _ in range(3)], [1, 2, 3])
+        self.assertEqual(response_future.requested, 3)
+        self.assertEqual(rs.paging_state, 'page 2')
+        self.assertEqual(len(rs._prefetcher._pages), 2)
+
+        # (iter restarts the current page)
+        self.assertEqual(list(itr), list(range(3, 18)))
+        self.assertEqual(response_future.requested, 5)
+        self.assertFalse(rs.has_more_pages)
+        self.assertIsNone(rs.paging_state)
+
+    def test_prefetch_pages_error(self):
+        response_future = CallbackPagedResponseFuture([[3], RuntimeError('page failed'), [5]])
+        rs = ResultSet(response_future, [1, 2], prefetch_pages=3)
+        itr = iter(rs)
+        # nothing is requested past a failed page
+        self.assertEqual(response_future.requested, 2)
+        self.assertEqual([next(itr) for _ in range(3)], [1, 2, 3])
+        self.assertRaises(RuntimeError, next, itr)
+
+    def test_no_prefetch(self):
+        response_future = CallbackPagedResponseFuture([[3]])
+        rs = ResultSet(response_future, [1, 2])
+        iter(rs)
+        self.assertEqual(response_future.requested, 0)
+        self.assertIsNone(rs._prefetcher)